@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+'''Write a simulated band full of RTTY and PSK31 signals to a file.
+
+The output is raw complex64 samples, readable with `file_source`. The signals
+in the band (frequency, mode, level, text) are written as JSON alongside, so
+decoders can be scored against them. The same seed always produces the same
+band:
+
+    radioteletype_band.py --signals 40 --seconds 60 --doppler 1 band.cfile
+'''
+
+from __future__ import division, print_function
+
+import argparse
+import json
+import sys
+
+from radioteletype import simulation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('filename')
+    parser.add_argument('--signals', type=int, default=30,
+                        help='number of signals in the band')
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--samp-rate', type=int, default=48000)
+    parser.add_argument('--channel-rate', type=int, default=2000,
+                        help='rate at which each signal is modulated')
+    parser.add_argument('--modes', nargs='+', default=['rtty', 'psk31'],
+                        choices=['rtty', 'psk31'])
+    parser.add_argument('--min-level', type=float, default=-40,
+                        help='minimum signal level, dB full scale')
+    parser.add_argument('--max-level', type=float, default=-10,
+                        help='maximum signal level, dB full scale')
+    parser.add_argument('--noise', type=float, default=-60,
+                        help='white noise level, dB full scale')
+    parser.add_argument('--doppler', type=float, default=0,
+                        help='Watterson fading Doppler spread in Hz')
+    parser.add_argument('--path-delay', type=float, default=0.001,
+                        help='Watterson fading path delay in seconds')
+    parser.add_argument('--qrn-rate', type=float, default=0,
+                        help='average QRN crashes per second')
+    parser.add_argument('--qrn-level', type=float, default=-20,
+                        help='QRN peak level, dB full scale')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--signals-json', metavar='FILE',
+                        help='where to describe the signals; '
+                             'default is the output filename plus .json')
+    args = parser.parse_args(argv)
+
+    signals = simulation.random_signals(
+        args.signals,
+        samp_rate=args.samp_rate,
+        seed=args.seed,
+        modes=args.modes,
+        min_level_db=args.min_level,
+        max_level_db=args.max_level,
+    )
+
+    simulation.write_band(
+        args.filename,
+        args.seconds,
+        signals,
+        samp_rate=args.samp_rate,
+        channel_rate=args.channel_rate,
+        noise_voltage=10 ** (args.noise / 20),
+        doppler_spread=args.doppler,
+        path_delay=args.path_delay,
+        qrn_rate=args.qrn_rate,
+        qrn_voltage=10 ** (args.qrn_level / 20),
+        seed=args.seed,
+    )
+
+    with open(args.signals_json or args.filename + '.json', 'w') as f:
+        json.dump({
+            'samp_rate': args.samp_rate,
+            'seed': args.seed,
+            'signals': signals,
+        }, f, indent=2, sort_keys=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,458 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+'''Measure the throughput of each radioteletype block.
+
+Every configuration below pushes a large synthetic input through
+
+    vector_source -> head -> block under test -> null_sink
+
+and reports the input rate achieved in items per second, and how many times
+faster than real time that is for the sample rate the block would see in
+practice. Results can be written as JSON, and compared against a previous run
+to catch performance regressions:
+
+    radioteletype_benchmark.py --output before.json
+    ... make changes ...
+    radioteletype_benchmark.py --baseline before.json --tolerance 0.1
+'''
+
+from __future__ import division, print_function
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+from cmath import exp
+from math import pi
+
+from gnuradio import blocks, gr
+
+from radioteletype import demodulators, modulators
+
+
+PSK31_BAUD = 31.25
+RTTY_BAUD = 45.45
+AUDIO_RATE = 48000
+
+# process_time() is new in Python 3.3; clock() measures CPU time before that.
+_cpu_time = getattr(time, 'process_time', None) or time.clock
+
+
+def _random_bits(rng, n):
+    return [rng.randint(0, 1) for _ in range(n)]
+
+
+def _random_text(rng, n):
+    return [rng.randint(0x20, 0x7e) for _ in range(n)]
+
+
+def _random_baudot(rng, n):
+    return [rng.randint(0, 0x1f) for _ in range(n)]
+
+
+def _noise(rng, n):
+    return [complex(rng.gauss(0, 1), rng.gauss(0, 1)) for _ in range(n)]
+
+
+def _fsk_tones(rng, n, samp_rate, baud, mark_freq, space_freq):
+    '''Phase continuous FSK with random bits, by brute force.'''
+    samples = []
+    phase = 0.0
+    samples_left = 0
+    freq = mark_freq
+    for _ in range(n):
+        if samples_left <= 0:
+            freq = mark_freq if rng.randint(0, 1) else space_freq
+            samples_left += samp_rate / baud
+        samples_left -= 1
+        phase += 2 * pi * freq / samp_rate
+        samples.append(exp(1j * phase))
+    return samples
+
+
+def _async_words(rng, n, samples_per_bit, bits_per_word=5, stop_bits=1.5):
+    '''Random words framed with start and stop bits, one item per sample.'''
+    samples = []
+    bits_needed = 0
+    while len(samples) < n:
+        word = rng.randint(0, (1 << bits_per_word) - 1)
+        bits = [0] + [(word >> i) & 1 for i in range(bits_per_word)]
+        for bit in bits:
+            bits_needed += 1
+            while bits_needed > 0:
+                samples.append(bit)
+                bits_needed -= 1 / samples_per_bit
+        bits_needed += stop_bits
+        while bits_needed > 0:
+            samples.append(1)
+            bits_needed -= 1 / samples_per_bit
+    return samples[:n]
+
+
+class benchmark(object):
+    '''One block configuration to be measured.
+
+    `make_block` is called with no arguments to build a fresh block for each
+    run. `make_input` is called with a seeded `random.Random` and a length, and
+    returns one period of input, which is repeated as needed. `realtime_rate`
+    is the input rate, in items per second, the block sees when running live.
+    '''
+    def __init__(
+        self,
+        name,
+        config,
+        make_block,
+        make_input,
+        input_type,
+        realtime_rate,
+    ):
+        self.name = name
+        self.config = config
+        self.make_block = make_block
+        self.make_input = make_input
+        self.input_type = input_type
+        self.realtime_rate = realtime_rate
+
+    def key(self):
+        return '%s(%s)' % (
+            self.name,
+            ', '.join('%s=%r' % i for i in sorted(self.config.items())),
+        )
+
+    def run(self, seconds, min_items, rng):
+        nitems = max(int(seconds * self.realtime_rate), min_items)
+        period = min(nitems, max(int(self.realtime_rate), 4096))
+        data = self.make_input(rng, period)
+
+        if self.input_type == 'b':
+            source = blocks.vector_source_b(data, True)
+            itemsize = gr.sizeof_char
+        else:
+            source = blocks.vector_source_c(data, True)
+            itemsize = gr.sizeof_gr_complex
+
+        tb = gr.top_block()
+        block = self.make_block()
+        tb.connect(source, blocks.head(itemsize, nitems), block)
+
+        output_signature = block.output_signature()
+        for port in range(output_signature.max_streams()):
+            sink = blocks.null_sink(output_signature.sizeof_stream_item(port))
+            tb.connect((block, port), sink)
+
+        cpu_start = _cpu_time()
+        wall_start = time.time()
+        tb.run()
+        wall = time.time() - wall_start
+        cpu = _cpu_time() - cpu_start
+
+        items_per_second = nitems / wall
+        return {
+            'name': self.name,
+            'key': self.key(),
+            'config': self.config,
+            'items': nitems,
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'items_per_second': items_per_second,
+            'realtime_rate': self.realtime_rate,
+            'x_realtime': items_per_second / self.realtime_rate,
+        }
+
+
+def benchmarks():
+    '''Yield every configuration to be measured.'''
+
+    rtty_samples_per_bit = AUDIO_RATE / RTTY_BAUD
+
+    # ~7.5 bits per Baudot character with 1.5 stop bits
+    rtty_char_rate = RTTY_BAUD / 7.5
+
+    # On average a varicode character, with its separator, is about 9 bits.
+    psk31_char_rate = PSK31_BAUD / 9
+
+    yield benchmark(
+        'async_word_extractor_bb',
+        {'bits_per_word': 5, 'sample_rate': AUDIO_RATE, 'bit_rate': RTTY_BAUD},
+        lambda: demodulators.async_word_extractor_bb(
+            5, AUDIO_RATE, RTTY_BAUD),
+        lambda rng, n: _async_words(rng, n, rtty_samples_per_bit),
+        'b',
+        AUDIO_RATE,
+    )
+
+    yield benchmark(
+        'baudot_decode_bb', {},
+        demodulators.baudot_decode_bb,
+        _random_baudot,
+        'b',
+        rtty_char_rate,
+    )
+
+    yield benchmark(
+        'baudot_encode_bb', {},
+        modulators.baudot_encode_bb,
+        _random_text,
+        'b',
+        rtty_char_rate,
+    )
+
+    yield benchmark(
+        'varicode_decode_bb', {},
+        demodulators.varicode_decode_bb,
+        _random_bits,
+        'b',
+        PSK31_BAUD,
+    )
+
+    yield benchmark(
+        'varicode_encode_bb', {},
+        modulators.varicode_encode_bb,
+        _random_text,
+        'b',
+        psk31_char_rate,
+    )
+
+    for decim in (1, 8):
+        yield benchmark(
+            'tone_detector_cf',
+            {'decim': decim, 'sample_rate': AUDIO_RATE, 'baud': RTTY_BAUD},
+            lambda decim=decim: demodulators.tone_detector_cf(
+                decim, 2125, AUDIO_RATE, RTTY_BAUD),
+            _noise,
+            'c',
+            AUDIO_RATE,
+        )
+
+        yield benchmark(
+            'tone_detector_cf',
+            {'decim': decim, 'sample_rate': AUDIO_RATE, 'baud': RTTY_BAUD,
+             'multistage': True},
+            lambda decim=decim: demodulators.tone_detector_cf(
+                decim, 2125, AUDIO_RATE, RTTY_BAUD, multistage=True),
+            _noise,
+            'c',
+            AUDIO_RATE,
+        )
+
+        for tone_filter in ('boxcar', 'sliding_dft'):
+            yield benchmark(
+                'tone_detector_cf',
+                {'decim': decim, 'sample_rate': AUDIO_RATE, 'baud': RTTY_BAUD,
+                 'tone_filter': tone_filter},
+                lambda decim=decim, tone_filter=tone_filter:
+                    demodulators.tone_detector_cf(
+                        decim, 2125, AUDIO_RATE, RTTY_BAUD,
+                        tone_filter=tone_filter),
+                _noise,
+                'c',
+                AUDIO_RATE,
+            )
+
+    yield benchmark(
+        'rms_agc_cc', {'alpha': 0.01},
+        lambda: demodulators.rms_agc_cc(0.01),
+        _noise,
+        'c',
+        AUDIO_RATE,
+    )
+
+    for samp_per_sym in (4, 16):
+        psk31_rate = samp_per_sym * PSK31_BAUD
+
+        yield benchmark(
+            'psk31_coherent_demodulator_cc',
+            {'samp_per_sym': samp_per_sym},
+            lambda samp_per_sym=samp_per_sym:
+                demodulators.psk31_coherent_demodulator_cc(samp_per_sym),
+            _noise,
+            'c',
+            psk31_rate,
+        )
+
+        yield benchmark(
+            'psk31_incoherent_demodulator_cc',
+            {'samp_per_sym': samp_per_sym},
+            lambda samp_per_sym=samp_per_sym:
+                demodulators.psk31_incoherent_demodulator_cc(samp_per_sym),
+            _noise,
+            'c',
+            psk31_rate,
+        )
+
+        yield benchmark(
+            'psk31_modulator_bc',
+            {'samp_per_sym': samp_per_sym},
+            lambda samp_per_sym=samp_per_sym:
+                modulators.psk31_modulator_bc(samp_per_sym),
+            _random_bits,
+            'b',
+            PSK31_BAUD,
+        )
+
+    yield benchmark(
+        'psk31_constellation_decoder_cb', {},
+        demodulators.psk31_constellation_decoder_cb,
+        _noise,
+        'c',
+        PSK31_BAUD,
+    )
+
+    samp_per_bit = int(rtty_samples_per_bit)
+    yield benchmark(
+        'fm_fsk_mod_bc',
+        {'samp_per_bit': samp_per_bit, 'samp_rate': AUDIO_RATE},
+        lambda: modulators.fm_fsk_mod_bc(samp_per_bit, AUDIO_RATE, 170),
+        _random_bits,
+        'b',
+        RTTY_BAUD,
+    )
+
+    yield benchmark(
+        'cpfsk_mod_bc',
+        {'samp_per_bit': samp_per_bit, 'samp_rate': AUDIO_RATE},
+        lambda: modulators.cpfsk_mod_bc(samp_per_bit, AUDIO_RATE, 170),
+        _random_bits,
+        'b',
+        RTTY_BAUD,
+    )
+
+    yield benchmark(
+        'am_fsk_mod_bc',
+        {'samp_per_bit': samp_per_bit, 'samp_rate': AUDIO_RATE},
+        lambda: modulators.am_fsk_mod_bc(samp_per_bit, AUDIO_RATE, 170),
+        _random_bits,
+        'b',
+        RTTY_BAUD,
+    )
+
+    for decimation in (1, 4, 16):
+        yield benchmark(
+            'rtty_demod_cb',
+            {'decimation': decimation, 'samp_rate': AUDIO_RATE},
+            lambda decimation=decimation: demodulators.rtty_demod_cb(
+                decimation=decimation,
+                samp_rate=AUDIO_RATE,
+            ),
+            lambda rng, n: _fsk_tones(
+                rng, n, AUDIO_RATE, RTTY_BAUD, 2295, 2125),
+            'c',
+            AUDIO_RATE,
+        )
+
+
+def compare(results, baseline, tolerance):
+    '''Return a list of descriptions of results slower than the baseline.'''
+    previous = dict((r['key'], r) for r in baseline['results'])
+    regressions = []
+    for result in results:
+        old = previous.get(result['key'])
+        if old is None:
+            continue
+        ratio = result['items_per_second'] / old['items_per_second']
+        if ratio < 1 - tolerance:
+            regressions.append('%s: %.3g items/s, was %.3g (%+.1f%%)' % (
+                result['key'],
+                result['items_per_second'],
+                old['items_per_second'],
+                (ratio - 1) * 100,
+            ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--seconds', type=float, default=60,
+        help='seconds of real time signal to process for each configuration')
+    parser.add_argument(
+        '--min-items', type=int, default=1 << 20,
+        help='process at least this many input items, for low rate blocks')
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='run each configuration this many times and keep the fastest')
+    parser.add_argument(
+        '--filter', default='',
+        help='only run configurations matching this regular expression')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='random seed for the synthetic inputs')
+    parser.add_argument(
+        '--output', metavar='FILE',
+        help='write results as JSON to FILE')
+    parser.add_argument(
+        '--baseline', metavar='FILE',
+        help='compare against results previously written with --output')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='fractional slowdown relative to the baseline that is tolerated')
+    args = parser.parse_args(argv)
+
+    pattern = re.compile(args.filter)
+    results = []
+
+    for bench in benchmarks():
+        if not pattern.search(bench.key()):
+            continue
+
+        runs = [bench.run(
+                    args.seconds, args.min_items, random.Random(args.seed))
+                for _ in range(args.repeat)]
+        best = max(runs, key=lambda r: r['items_per_second'])
+        results.append(best)
+
+        print('%-72s %12.4g items/s %10.1fx realtime' % (
+            best['key'], best['items_per_second'], best['x_realtime']))
+        sys.stdout.flush()
+
+    report = {
+        'timestamp': time.time(),
+        'gnuradio_version': gr.version(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'seconds': args.seconds,
+        'min_items': args.min_items,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+'''Measure character error rate against Eb/N0, and the CPU cost of receiving.
+
+Known text is modulated, passed through a simulated channel with white noise
+and optional fading, and decoded with every combination of receiver settings
+given on the command line. For each combination the character error rate and
+the CPU time needed to decode one second of signal (that is, the cost of one
+channel running live) are reported.
+
+Given a copy quality target, the cheapest receiver meeting it is recommended:
+
+    radioteletype_cer.py --mode rtty-fm --order 1 2 3 --decimation 1 8 \\
+        --ebn0 4 6 8 10 --target-cer 0.02 --target-ebn0 8
+'''
+
+from __future__ import division, print_function
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from math import pi
+
+from gnuradio import blocks, gr
+
+from radioteletype import demodulators, modulators, simulation
+
+
+TEXT = (
+    'THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789 '
+    'SPHINX OF BLACK QUARTZ, JUDGE MY VOW. '
+)
+
+PSK31_BAUD = 31.25
+RTTY_SHIFT = 170
+
+_cpu_time = getattr(time, 'process_time', None) or time.clock
+
+
+def _run_bytes(block, data):
+    '''Run `data` through a byte to byte block and return the output.'''
+    tb = gr.top_block()
+    sink = blocks.vector_sink_b()
+    tb.connect(blocks.vector_source_b(data), block, sink)
+    tb.run()
+    return list(sink.data())
+
+
+def _mean_power(filename):
+    samples = array('f')
+    with open(filename, 'rb') as f:
+        samples.fromfile(f, os.path.getsize(filename) // samples.itemsize)
+    return sum(x * x for x in samples) / (len(samples) // 2)
+
+
+class rtty_mode(object):
+    '''RTTY, received with rtty_demod_cb.'''
+
+    def __init__(self, modulation, args):
+        self.name = 'rtty-' + modulation
+        self.modulation = modulation
+        self.baud = args.baud
+        self.samp_rate = args.samp_rate
+        self.mark_freq = args.mark_freq
+        self.space_freq = args.mark_freq - RTTY_SHIFT
+
+        # Half bits, so 1.5 stop bits can be represented.
+        self.samp_per_item = int(round(self.samp_rate / self.baud / 2))
+        self.samples_per_bit = self.samp_per_item * 2
+
+        self.receivers = [
+            dict(alpha=alpha, order=order, decimation=decimation)
+            for alpha, order, decimation in itertools.product(
+                args.alpha, args.order, args.decimation)
+        ]
+
+    def reference(self, text):
+        return text.upper()
+
+    def transmitter(self, text):
+        idle = [0x1f] * 8
+        codes = _run_bytes(
+            modulators.baudot_encode_bb(),
+            [ord(c) for c in text])
+        bits = simulation.async_frame(idle + codes + idle, items_per_bit=2)
+
+        if self.modulation == 'fm':
+            modulator = modulators.fm_fsk_mod_bc(
+                self.samp_per_item, self.samp_rate, RTTY_SHIFT)
+        else:
+            modulator = modulators.am_fsk_mod_bc(
+                self.samp_per_item, self.samp_rate, RTTY_SHIFT)
+
+        # The modulators put mark at 0 Hz and space below it.
+        return [
+            blocks.vector_source_b(bits),
+            modulator,
+            blocks.rotator_cc(2 * pi * self.mark_freq / self.samp_rate),
+        ]
+
+    def receiver(self, alpha, order, decimation):
+        demod = demodulators.rtty_demod_cb(
+            alpha=alpha,
+            baud=self.baud,
+            decimation=decimation,
+            mark_freq=self.mark_freq,
+            samp_rate=self.samp_rate,
+            space_freq=self.space_freq,
+            order=order,
+        )
+        return demod, [(demod, 1), (demod, 2), (demod, 3)]
+
+
+class psk31_mode(object):
+    '''PSK31 at complex baseband.'''
+
+    name = 'psk31'
+
+    def __init__(self, args):
+        self.samp_per_sym = args.samp_per_sym
+        self.samp_rate = PSK31_BAUD * self.samp_per_sym
+        self.samples_per_bit = self.samp_per_sym
+
+        self.receivers = [
+            dict(coherent=coherent, sync_filter=sync_filter)
+            for coherent, sync_filter in itertools.product(
+                args.coherent, args.sync_filter)
+        ]
+
+    def reference(self, text):
+        return text
+
+    def transmitter(self, text):
+        bits = _run_bytes(
+            modulators.varicode_encode_bb(),
+            [ord(c) for c in text] + [0])
+        idle = [0] * 32
+
+        return [
+            blocks.vector_source_b(idle + bits + idle),
+            modulators.psk31_modulator_bc(self.samp_per_sym),
+        ]
+
+    def receiver(self, coherent, sync_filter):
+        if coherent:
+            demod = demodulators.psk31_coherent_demodulator_cc(
+                self.samp_per_sym, sync_filter=sync_filter)
+        else:
+            demod = demodulators.psk31_incoherent_demodulator_cc(
+                self.samp_per_sym, sync_filter=sync_filter)
+
+        decoder = demodulators.psk31_constellation_decoder_cb(
+            varicode_decode=True,
+            differential_decode=bool(coherent),
+        )
+
+        rx = gr.hier_block2(
+            'PSK31 receiver',
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+            gr.io_signature(1, 1, gr.sizeof_char),
+        )
+        rx.connect(rx, demod, decoder, rx)
+        return rx, []
+
+
+def transmit(mode, text, filename):
+    tb = gr.top_block()
+    tb.connect(*(mode.transmitter(text) + [
+        blocks.file_sink(gr.sizeof_gr_complex, filename)]))
+    tb.run()
+
+
+def add_channel(mode, clean, noisy, noise_voltage, doppler_freq, seed):
+    tb = gr.top_block()
+    tb.connect(
+        blocks.file_source(gr.sizeof_gr_complex, clean),
+        simulation.awgn_fading_channel_cc(
+            noise_voltage=noise_voltage,
+            doppler_freq=doppler_freq,
+            samp_rate=mode.samp_rate,
+            seed=seed,
+        ),
+        blocks.file_sink(gr.sizeof_gr_complex, noisy),
+    )
+    tb.run()
+
+
+def receive(mode, filename, settings):
+    '''Return decoded text, and CPU seconds spent decoding.'''
+    tb = gr.top_block()
+    rx, unused_ports = mode.receiver(**settings)
+    sink = blocks.vector_sink_b()
+    tb.connect(blocks.file_source(gr.sizeof_gr_complex, filename), rx, sink)
+    for port in unused_ports:
+        tb.connect(port, blocks.null_sink(gr.sizeof_float))
+
+    start = _cpu_time()
+    tb.run()
+    cpu = _cpu_time() - start
+
+    return ''.join(chr(c) for c in sink.data()), cpu
+
+
+def recommend(results, target_cer, target_ebn0):
+    '''Return the cheapest result meeting the target, per mode and fading.'''
+    best = {}
+    for result in results:
+        if result['ebn0_db'] != target_ebn0:
+            continue
+        if result['cer'] > target_cer:
+            continue
+        key = (result['mode'], result['doppler_freq'])
+        if (key not in best or
+                result['cpu_per_channel'] < best[key]['cpu_per_channel']):
+            best[key] = result
+    return [best[k] for k in sorted(best)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--mode', nargs='+', default=['rtty-fm', 'rtty-am', 'psk31'],
+        choices=['rtty-fm', 'rtty-am', 'psk31'])
+    parser.add_argument(
+        '--ebn0', nargs='+', type=float, default=[2, 4, 6, 8, 10, 12],
+        help='Eb/N0 values to test, in dB')
+    parser.add_argument(
+        '--doppler', nargs='+', type=float, default=[0],
+        help='fading Doppler spreads to test, in Hz; 0 is no fading')
+    parser.add_argument(
+        '--repeat', type=int, default=10,
+        help='number of times the test text is sent')
+    parser.add_argument('--seed', type=int, default=0)
+
+    rtty = parser.add_argument_group('RTTY')
+    rtty.add_argument('--baud', type=float, default=45.45)
+    rtty.add_argument('--samp-rate', type=float, default=48000)
+    rtty.add_argument('--mark-freq', type=float, default=2295)
+    rtty.add_argument('--alpha', nargs='+', type=float, default=[0.35])
+    rtty.add_argument('--order', nargs='+', type=int, default=[1, 2, 3])
+    rtty.add_argument('--decimation', nargs='+', type=int, default=[1])
+
+    psk31 = parser.add_argument_group('PSK31')
+    psk31.add_argument('--samp-per-sym', type=int, default=4)
+    psk31.add_argument(
+        '--sync-filter', nargs='+',
+        default=['compromise', 'matched', 'pskcore'],
+        choices=['compromise', 'matched', 'pskcore'])
+    psk31.add_argument(
+        '--coherent', nargs='+', type=int, default=[1, 0],
+        help='1 for the coherent demodulator, 0 for incoherent')
+
+    parser.add_argument(
+        '--target-cer', type=float,
+        help='recommend the cheapest receiver with at most this CER...')
+    parser.add_argument(
+        '--target-ebn0', type=float,
+        help='...at this Eb/N0')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write results as JSON to FILE')
+    args = parser.parse_args(argv)
+
+    modes = []
+    for name in args.mode:
+        if name == 'psk31':
+            modes.append(psk31_mode(args))
+        else:
+            modes.append(rtty_mode(name.split('-')[1], args))
+
+    text = TEXT * args.repeat
+    tmpdir = tempfile.mkdtemp(prefix='radioteletype_cer')
+    clean = os.path.join(tmpdir, 'clean')
+    noisy = os.path.join(tmpdir, 'noisy')
+    results = []
+
+    print('%-8s %-50s %6s %7s %8s %12s' % (
+        'mode', 'receiver', 'Eb/N0', 'Doppler', 'CER', 'CPU/channel'))
+
+    try:
+        for mode in modes:
+            transmit(mode, text, clean)
+            power = _mean_power(clean)
+            signal_seconds = (
+                os.path.getsize(clean) / gr.sizeof_gr_complex /
+                mode.samp_rate)
+            reference = mode.reference(text)
+
+            for doppler, ebn0 in itertools.product(args.doppler, args.ebn0):
+                add_channel(
+                    mode, clean, noisy,
+                    simulation.noise_voltage(
+                        power, mode.samples_per_bit, ebn0),
+                    doppler,
+                    args.seed,
+                )
+
+                for settings in mode.receivers:
+                    received, cpu = receive(mode, noisy, settings)
+                    result = {
+                        'mode': mode.name,
+                        'receiver': settings,
+                        'ebn0_db': ebn0,
+                        'doppler_freq': doppler,
+                        'cer': simulation.character_error_rate(
+                            reference, received),
+                        'cpu_seconds': cpu,
+                        'signal_seconds': signal_seconds,
+                        'cpu_per_channel': cpu / signal_seconds,
+                    }
+                    results.append(result)
+
+                    print('%-8s %-50s %6.1f %7.2f %8.4f %12.4g' % (
+                        mode.name,
+                        ' '.join('%s=%s' % i for i in sorted(settings.items())),
+                        ebn0,
+                        doppler,
+                        result['cer'],
+                        result['cpu_per_channel'],
+                    ))
+                    sys.stdout.flush()
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if args.target_cer is not None and args.target_ebn0 is not None:
+        print()
+        chosen = recommend(results, args.target_cer, args.target_ebn0)
+        if not chosen:
+            print('No receiver has CER <= %g at %g dB Eb/N0' % (
+                args.target_cer, args.target_ebn0))
+        for result in chosen:
+            print('Cheapest %s, Doppler %g Hz: %s (CER %.4f, %.4g CPU s/s)' % (
+                result['mode'],
+                result['doppler_freq'],
+                ' '.join('%s=%s' % i for i in sorted(result['receiver'].items())),
+                result['cer'],
+                result['cpu_per_channel'],
+            ))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'text': text,
+                'seed': args.seed,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+'''Measure how long it takes to import each radioteletype module.
+
+Each module is imported in a fresh interpreter, several times, and the
+fastest import is reported along with the GNU Radio components that were
+loaded as a result. This is the cost paid by every short lived process
+which uses the module. Results can be written as JSON and compared against a
+previous run, like radioteletype_benchmark.py:
+
+    radioteletype_import_time.py --output before.json
+    ... make changes ...
+    radioteletype_import_time.py --baseline before.json --tolerance 0.2
+'''
+
+from __future__ import division, print_function
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+
+
+MODULES = (
+    'gnuradio.gr',
+    'radioteletype',
+    'radioteletype.filters',
+    'radioteletype.offline',
+    'radioteletype.bulk',
+    'radioteletype.latency',
+    'radioteletype.metrics',
+    'radioteletype.modulators',
+    'radioteletype.demodulators',
+    'radioteletype.simulation',
+    'radioteletype.aio',
+)
+
+# Run in the child interpreter: import one module and report the time taken
+# and the GNU Radio modules it caused to be loaded.
+_CHILD = '''
+import json, sys, time
+timer = getattr(time, 'perf_counter', time.time)
+before = set(sys.modules)
+start = timer()
+import %s
+seconds = timer() - start
+loaded = sorted(
+    m for m in set(sys.modules) - before
+    if m.startswith('gnuradio.') and m.count('.') == 1)
+print(json.dumps({'seconds': seconds, 'gnuradio_modules': loaded}))
+'''
+
+
+def measure(module, repeat, python=sys.executable):
+    '''Return the fastest of `repeat` imports of module, in fresh processes.'''
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([python, '-c', _CHILD % module])
+        runs.append(json.loads(output.decode('utf-8').splitlines()[-1]))
+    best = min(runs, key=lambda r: r['seconds'])
+    best['module'] = module
+    best['median_seconds'] = sorted(r['seconds'] for r in runs)[len(runs) // 2]
+    return best
+
+
+def compare(results, baseline, tolerance):
+    '''Return a list of descriptions of imports slower than the baseline.'''
+    previous = dict((r['module'], r) for r in baseline['results'])
+    regressions = []
+    for result in results:
+        old = previous.get(result['module'])
+        if old is None:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append('%s: %.1f ms, was %.1f ms (%+.1f%%)' % (
+                result['module'],
+                result['seconds'] * 1e3,
+                old['seconds'] * 1e3,
+                (ratio - 1) * 100,
+            ))
+        added = set(result['gnuradio_modules']) - set(old['gnuradio_modules'])
+        if added:
+            regressions.append('%s: now loads %s' % (
+                result['module'], ', '.join(sorted(added))))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='import each module this many times and keep the fastest')
+    parser.add_argument(
+        '--filter', default='',
+        help='only measure modules matching this regular expression')
+    parser.add_argument(
+        '--output', metavar='FILE',
+        help='write results as JSON to FILE')
+    parser.add_argument(
+        '--baseline', metavar='FILE',
+        help='compare against results previously written with --output')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='fractional slowdown relative to the baseline that is tolerated')
+    args = parser.parse_args(argv)
+
+    pattern = re.compile(args.filter)
+    results = []
+
+    for module in MODULES:
+        if not pattern.search(module):
+            continue
+
+        try:
+            result = measure(module, args.repeat)
+        except subprocess.CalledProcessError:
+            # for example radioteletype.aio, on Python 2
+            print('%-28s   import failed' % module)
+            continue
+        results.append(result)
+
+        print('%-28s %8.1f ms  %s' % (
+            module,
+            result['seconds'] * 1e3,
+            ' '.join(m.split('.', 1)[1] for m in result['gnuradio_modules']),
+        ))
+        sys.stdout.flush()
+
+    report = {
+        'timestamp': time.time(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
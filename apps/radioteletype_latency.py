@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+
+'''Measure how long after its first bit each character is decoded.
+
+Known text is modulated and fed to a receiver through a throttle, so it
+arrives at the rate a real radio would deliver it. The receiver is run in
+its normal mode and in low latency mode, and the latency of each decoded
+character, from its first bit being received to the character leaving the
+receiver, is reported as percentiles:
+
+    radioteletype_latency.py --mode rtty psk31 --percentiles 50 90 99
+'''
+
+from __future__ import division, print_function
+
+import argparse
+from math import pi
+
+from gnuradio import blocks, gr
+
+from radioteletype import demodulators, latency, modulators, simulation
+
+
+TEXT = 'CQ CQ CQ DE N0CALL N0CALL K\n'
+
+PSK31_BAUD = 31.25
+RTTY_SHIFT = 170
+
+
+def _run_bytes(block, data):
+    '''Run `data` through a byte to byte block and return the output.'''
+    tb = gr.top_block()
+    sink = blocks.vector_sink_b()
+    tb.connect(blocks.vector_source_b(data), block, sink)
+    tb.run()
+    return list(sink.data())
+
+
+def rtty_chain(args, text, low_latency):
+    samp_per_item = int(round(args.samp_rate / args.baud / 2))
+    codes = _run_bytes(modulators.baudot_encode_bb(), [ord(c) for c in text])
+    idle = [0x1f] * 4
+    bits = simulation.async_frame(idle + codes + idle, items_per_bit=2)
+
+    transmitter = [
+        blocks.vector_source_b(bits),
+        modulators.fm_fsk_mod_bc(samp_per_item, args.samp_rate, RTTY_SHIFT),
+        blocks.rotator_cc(2 * pi * args.mark_freq / args.samp_rate),
+    ]
+    receiver = demodulators.rtty_demod_cb(
+        baud=args.baud,
+        mark_freq=args.mark_freq,
+        space_freq=args.mark_freq - RTTY_SHIFT,
+        samp_rate=args.samp_rate,
+        low_latency=low_latency,
+        instrument=True,
+    )
+    return transmitter, receiver, args.samp_rate
+
+
+def psk31_chain(args, text, low_latency):
+    bits = _run_bytes(
+        modulators.varicode_encode_bb(), [ord(c) for c in text] + [0])
+    idle = [0] * 32
+
+    transmitter = [
+        blocks.vector_source_b(idle + bits + idle),
+        modulators.psk31_modulator_bc(args.samp_per_sym),
+    ]
+    receiver = latency.instrumented_receiver_cb(
+        demodulators.psk31_coherent_demodulator_cc(args.samp_per_sym),
+        demodulators.psk31_constellation_decoder_cb(low_latency=low_latency),
+        samp_rate=PSK31_BAUD * args.samp_per_sym,
+    )
+    return transmitter, receiver, PSK31_BAUD * args.samp_per_sym
+
+
+MODES = {
+    'rtty': rtty_chain,
+    'psk31': psk31_chain,
+}
+
+
+def measure(chain, args, low_latency):
+    transmitter, receiver, samp_rate = chain(args, TEXT, low_latency)
+
+    tb = gr.top_block()
+    tb.connect(*(transmitter + [
+        blocks.throttle(gr.sizeof_gr_complex, samp_rate),
+        receiver,
+        blocks.null_sink(gr.sizeof_char),
+    ]))
+    # rtty_demod_cb also outputs its detector levels
+    signature = receiver.output_signature()
+    for port in range(1, signature.max_streams()):
+        tb.connect(
+            (receiver, port),
+            blocks.null_sink(signature.sizeof_stream_item(port)))
+    tb.run()
+    return receiver.latency_percentiles(args.percentiles)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--mode', nargs='+', choices=sorted(MODES), default=sorted(MODES))
+    parser.add_argument('--samp-rate', type=float, default=8000)
+    parser.add_argument('--baud', type=float, default=45.45)
+    parser.add_argument('--mark-freq', type=float, default=1000)
+    parser.add_argument('--samp-per-sym', type=int, default=64)
+    parser.add_argument(
+        '--percentiles', nargs='+', type=float, default=[50, 90, 99, 100])
+    args = parser.parse_args(argv)
+
+    print('%-6s %-11s' % ('mode', 'low latency') + ''.join(
+        '%9s' % ('p%g (s)' % p) for p in args.percentiles))
+    for name in args.mode:
+        for low_latency in (False, True):
+            result = measure(MODES[name], args, low_latency)
+            print('%-6s %-11s' % (name, low_latency) + ''.join(
+                '%9.3f' % result[p] if p in result else '%9s' % '-'
+                for p in args.percentiles))
+
+
+if __name__ == '__main__':
+    main()
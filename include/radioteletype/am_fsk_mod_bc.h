@@ -0,0 +1,76 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_H
+#define INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_H
+
+#include <radioteletype/api.h>
+#include <gnuradio/sync_interpolator.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief FSK modulator which keys the envelopes of two tones
+     * \ingroup radioteletype
+     *
+     * Each input item is a bit, and produces samp_per_bit output samples.
+     * The mark envelope is the bits filtered by taps, and the space envelope
+     * is the inverted bits filtered by the same taps. Mark is at 0 Hz and
+     * space at -spacing Hz.
+     *
+     * Since filtering is linear, the space envelope is the sum of the taps
+     * which overlap each sample minus the mark envelope, so only the mark
+     * envelope is filtered. The input is only bits, so filtering it is
+     * only a sum of the taps where the bit is set. The space tone comes
+     * from GNU Radio's sine table.
+     */
+    class RADIOTELETYPE_API am_fsk_mod_bc : virtual public gr::sync_interpolator
+    {
+     public:
+      typedef boost::shared_ptr<am_fsk_mod_bc> sptr;
+
+      /*!
+       * \brief Return a shared_ptr to a new instance of radioteletype::am_fsk_mod_bc.
+       *
+       * \param samp_per_bit Output samples for each input bit.
+       * \param samp_rate Output sample rate, in samples per second.
+       * \param spacing Distance from mark to space, in Hz.
+       * \param taps Envelope of one bit, at the output sample rate. If
+       *        empty, samp_per_bit ones.
+       */
+      static sptr make(int samp_per_bit, double samp_rate, double spacing,
+                       const std::vector<gr_complex> &taps=std::vector<gr_complex>());
+
+      virtual double samp_rate() const = 0;
+      virtual void set_samp_rate(double samp_rate) = 0;
+
+      virtual double spacing() const = 0;
+      virtual void set_spacing(double spacing) = 0;
+
+      virtual std::vector<gr_complex> taps() const = 0;
+      virtual void set_taps(const std::vector<gr_complex> &taps) = 0;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_H */
@@ -0,0 +1,69 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_H
+#define INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_H
+
+#include <radioteletype/api.h>
+#include <gnuradio/block.h>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief Frame words with start and stop bits for asynchronous transmission
+     * \ingroup radioteletype
+     *
+     * The inverse of async_word_extractor_bb. Each input item is a word of
+     * bits_per_word bits, which is sent as a 0 start bit, the data bits
+     * least significant first, and stop_bits 1 stop bits. The output is
+     * one item per sample at sample_rate, with bits at bit_rate. The bit
+     * length need not be a whole number of samples; the error is carried
+     * from one bit to the next, so the timing doesn't drift.
+     *
+     * With sample_rate equal to bit_rate the output is one item per bit,
+     * which can represent only whole stop bits. Twice the bit rate is
+     * enough for 1.5 stop bits.
+     */
+    class RADIOTELETYPE_API async_framer_bb : virtual public gr::block
+    {
+     public:
+      typedef boost::shared_ptr<async_framer_bb> sptr;
+
+      /*!
+       * \brief Return a shared_ptr to a new instance of radioteletype::async_framer_bb.
+       *
+       * \param bits_per_word Data bits in each word, 5 for Baudot.
+       * \param sample_rate Output samples per second.
+       * \param bit_rate Bits per second.
+       * \param stop_bits Length of the stop bit, in bits: usually 1, 1.5
+       *        or 2.
+       */
+      static sptr make(int bits_per_word, float sample_rate, float bit_rate,
+                       float stop_bits=1.5);
+
+      virtual float stop_bits() const = 0;
+      virtual void set_stop_bits(float stop_bits) = 0;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_H */
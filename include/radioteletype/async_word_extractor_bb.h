@@ -33,6 +33,14 @@ namespace gr {
      * \ingroup radioteletype
      *
      * You know, for RS232, RTTY, etc.
+     *
+     * Stream tags on the input are moved to the next word extracted after
+     * them. Once an "rx_time" tag has been seen, every word is tagged with
+     * an "rx_time" for its start bit, computed from sample_rate.
+     *
+     * A word where a space was found in place of the stop bit is still
+     * output, once a mark ends it, and tagged "framing_error" with a value
+     * of true. baudot_decode_bb counts these in its PDUs' "errors".
      */
     class RADIOTELETYPE_API async_word_extractor_bb : virtual public gr::block
     {
@@ -48,6 +56,34 @@ namespace gr {
        * creating new instances.
        */
       static sptr make(int bits_per_word, float sample_rate, float bit_rate);
+
+      /*!
+       * \brief Number of words extracted since the block was created, or
+       * since reset_counters().
+       */
+      virtual int words_extracted() const = 0;
+
+      /*!
+       * \brief Number of words where a space was found in place of the stop
+       * bit.
+       */
+      virtual int framing_errors() const = 0;
+
+      //! Set all counters to zero.
+      virtual void reset_counters() = 0;
+
+      /*!
+       * \brief Trade throughput for latency.
+       *
+       * In low latency mode the block runs as soon as any input is available,
+       * instead of waiting for enough to complete a whole word, and returns
+       * after each word so it reaches the next block immediately. Its output
+       * buffer is also kept small, so less can queue up behind a slow
+       * downstream block. The buffer size only changes when the flowgraph
+       * is started.
+       */
+      virtual void set_low_latency(bool low_latency) = 0;
+      virtual bool low_latency() const = 0;
     };
 
   } // namespace radioteletype
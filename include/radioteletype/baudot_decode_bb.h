@@ -32,6 +32,20 @@ namespace gr {
      * \brief Decode Baudot code to ASCII
      * \ingroup radioteletype
      *
+     * Decoded characters are written to the output stream, if it is
+     * connected, and collected into PDUs published on the "pdus" message
+     * port. A PDU is published at the end of each line, when 128 characters
+     * have accumulated, after set_idle_timeout() input items without a
+     * character, or when any message arrives on the "flush" port. The PDU
+     * metadata holds "offset", the input item number of the first
+     * character, "errors", the number of characters decoded from codes
+     * tagged "framing_error" by async_word_extractor_bb, "freq" if
+     * set_center_freq() was called, and "rx_time" if the first character
+     * was tagged with one. A framing error on a shift code is counted
+     * against the next character.
+     *
+     * Stream tags on the input are moved to the next decoded character, so
+     * tags on shift codes are not lost.
      */
     class RADIOTELETYPE_API baudot_decode_bb : virtual public gr::block
     {
@@ -47,6 +61,43 @@ namespace gr {
        * creating new instances.
        */
       static sptr make();
+
+      /*!
+       * \brief Number of characters decoded since the block was created, or
+       * since reset_counters(). Shift codes are not counted.
+       */
+      virtual int chars_decoded() const = 0;
+
+      //! Set all counters to zero.
+      virtual void reset_counters() = 0;
+
+      /*!
+       * \brief Set the frequency reported as "freq" in the metadata of each
+       * PDU. Until this is called, PDUs have no frequency.
+       */
+      virtual void set_center_freq(double freq) = 0;
+      virtual double center_freq() const = 0;
+
+      /*!
+       * \brief Publish a partial line after this many input codes without a
+       * character. 0 waits for the end of the line. Shift codes count, so
+       * the idle diddle of most transmitters will flush the last line.
+       */
+      virtual void set_idle_timeout(int items) = 0;
+      virtual int idle_timeout() const = 0;
+
+      /*!
+       * \brief Trade throughput for latency.
+       *
+       * In low latency mode the block returns after each character so it
+       * reaches the next block immediately, and publishes each character as
+       * a PDU as soon as it is decoded, instead of waiting for the end of
+       * the line. Its output buffer is also kept small, so less can queue
+       * up behind a slow downstream block. The buffer size only changes when
+       * the flowgraph is started.
+       */
+      virtual void set_low_latency(bool low_latency) = 0;
+      virtual bool low_latency() const = 0;
     };
 
   } // namespace radioteletype
@@ -29,9 +29,23 @@ namespace gr {
   namespace radioteletype {
 
     /*!
-     * \brief Decode Baudot code to ASCII
+     * \brief Encode ASCII to Baudot code
      * \ingroup radioteletype
      *
+     * Text comes from the input stream, if it is connected, and from
+     * messages on the "text" port: PDUs of ASCII like the decoders publish,
+     * u8vectors, or symbols. Each message is encoded as a whole when it
+     * arrives, beginning with a shift code so a receiver which missed the
+     * last one recovers, and is sent as soon as the current code is
+     * finished, ahead of any text waiting on the input stream.
+     *
+     * Spaces are always sent in the letters case, so a figure following a
+     * space gets a new FIGURES shift, as receivers which unshift on space
+     * expect.
+     *
+     * With idle enabled, LETTERS codes are sent whenever there is no text,
+     * so a transmitter runs continuously without a filler source upstream.
+     * Without an input stream, enable idle.
      */
     class RADIOTELETYPE_API baudot_encode_bb : virtual public gr::block
     {
@@ -46,7 +60,26 @@ namespace gr {
        * class. radioteletype::baudot_encode_bb::make is the public interface for
        * creating new instances.
        */
-      static sptr make();
+      static sptr make(bool idle=false);
+
+      //! True if LETTERS codes are sent when there is no text.
+      virtual bool idle() const = 0;
+      virtual void set_idle(bool idle) = 0;
+
+      /*!
+       * \brief Number of characters encoded since the block was created, or
+       * since reset_counters(). Shift codes are not counted.
+       */
+      virtual int chars_encoded() const = 0;
+
+      /*!
+       * \brief Number of input characters dropped because they have no
+       * Baudot equivalent.
+       */
+      virtual int chars_dropped() const = 0;
+
+      //! Set all counters to zero.
+      virtual void reset_counters() = 0;
     };
 
   } // namespace radioteletype
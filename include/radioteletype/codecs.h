@@ -0,0 +1,167 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_CODECS_H
+#define INCLUDED_RADIOTELETYPE_CODECS_H
+
+#include <radioteletype/api.h>
+#include <cstddef>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief Decode Baudot codes to ASCII, without a flowgraph.
+     * \ingroup radioteletype
+     *
+     * The letters or figures case is kept between calls, so a long input can
+     * be decoded in pieces. state() and set_state() save and restore it.
+     */
+    class RADIOTELETYPE_API baudot_decoder
+    {
+     public:
+      static const int LETTERS = 0x1f;
+      static const int FIGURES = 0x1b;
+
+      baudot_decoder();
+
+      /*!
+       * \brief Decode one code. Returns the character, or -1 for a shift
+       * code.
+       */
+      int decode_one(unsigned char code);
+
+      /*!
+       * \brief Decode in_len codes into out, which must have room for
+       * in_len characters. Returns the number of characters written.
+       */
+      size_t decode(const char *in, size_t in_len, char *out, size_t out_len);
+
+      //! The current case: LETTERS or FIGURES.
+      int state() const;
+      void set_state(int state);
+      void reset();
+
+     private:
+      bool figures_case;
+    };
+
+    /*!
+     * \brief Encode ASCII as Baudot codes, without a flowgraph.
+     * \ingroup radioteletype
+     *
+     * Shift codes are inserted as needed. Characters with no Baudot code
+     * are dropped.
+     */
+    class RADIOTELETYPE_API baudot_encoder
+    {
+     public:
+      baudot_encoder();
+
+      //! The code for c in the letters case, or -1 if there is none.
+      static int letters_code(unsigned char c);
+      //! The code for c in the figures case, or -1 if there is none.
+      static int figures_code(unsigned char c);
+
+      /*!
+       * \brief Encode in_len characters into out, which must have room for
+       * 2 * in_len codes. Returns the number of codes written.
+       */
+      size_t encode(const char *in, size_t in_len, char *out, size_t out_len);
+
+      //! The current case: baudot_decoder::LETTERS or FIGURES.
+      int state() const;
+      void set_state(int state);
+      void reset();
+
+     private:
+      int character_set;
+    };
+
+    /*!
+     * \brief Decode varicode bits to ASCII, without a flowgraph.
+     * \ingroup radioteletype
+     *
+     * The bits of a partly received character are kept between calls.
+     * state() and set_state() save and restore them.
+     */
+    class RADIOTELETYPE_API varicode_decoder
+    {
+     public:
+      //! Returned by decode_bit() when no character is complete.
+      static const int NONE = -1;
+      //! Returned by decode_bit() when an invalid code is complete.
+      static const int INVALID = -2;
+
+      varicode_decoder();
+
+      /*!
+       * \brief Take one bit. Returns a character when one is complete,
+       * otherwise NONE or INVALID.
+       */
+      int decode_bit(unsigned char bit);
+
+      /*!
+       * \brief Decode in_len bits, one per byte, into out, which must have
+       * room for in_len / 3 + 1 characters. Returns the number of
+       * characters written. Invalid codes are dropped.
+       */
+      size_t decode(const char *in, size_t in_len, char *out, size_t out_len);
+
+      unsigned int state() const;
+      void set_state(unsigned int state);
+      void reset();
+
+     private:
+      unsigned int bits;
+    };
+
+    /*!
+     * \brief Encode ASCII as varicode bits, without a flowgraph.
+     * \ingroup radioteletype
+     *
+     * Each character is followed by two 0 bits, so every call ends on a
+     * character boundary and no state is needed.
+     */
+    class RADIOTELETYPE_API varicode_encoder
+    {
+     public:
+      //! The longest code, including the two 0 bits which follow it.
+      static const size_t MAX_BITS = 12;
+
+      /*!
+       * \brief The varicode for c with its bits reversed, so they can be
+       * shifted out from the least significant end. 0 if there is none.
+       */
+      static unsigned int code(unsigned char c);
+
+      /*!
+       * \brief Encode in_len characters into out as bits, one per byte.
+       * out must have room for MAX_BITS * in_len bits. Returns the number
+       * of bits written.
+       */
+      static size_t encode(
+        const char *in, size_t in_len, char *out, size_t out_len);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_CODECS_H */
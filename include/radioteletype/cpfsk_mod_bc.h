@@ -0,0 +1,77 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+
+#ifndef INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_H
+#define INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_H
+
+#include <radioteletype/api.h>
+#include <gnuradio/sync_interpolator.h>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief Continuous phase FSK modulator
+     * \ingroup radioteletype
+     *
+     * Each input item is a bit, and produces samp_per_bit output samples.
+     * A 1 (mark) is at 0 Hz and a 0 (space) at -spacing Hz, like
+     * fm_fsk_mod_bc.
+     *
+     * The frequency of each bit follows one of four trajectories, chosen by
+     * the previous bit and this one, which are computed in advance. With a
+     * nonzero transition, the frequency changes from one tone to the other
+     * along a raised cosine over the first transition bits of the new bit,
+     * which narrows the spectrum much like filtering the keying would. The
+     * phase is accumulated in fixed point and converted to a sample with
+     * GNU Radio's sine table, so there are no calls to sin() or cos().
+     */
+    class RADIOTELETYPE_API cpfsk_mod_bc : virtual public gr::sync_interpolator
+    {
+     public:
+      typedef boost::shared_ptr<cpfsk_mod_bc> sptr;
+
+      /*!
+       * \brief Return a shared_ptr to a new instance of radioteletype::cpfsk_mod_bc.
+       *
+       * \param samp_per_bit Output samples for each input bit.
+       * \param samp_rate Output sample rate, in samples per second.
+       * \param spacing Distance from mark to space, in Hz.
+       * \param transition Length of each change in frequency, as a
+       *        fraction of a bit, from 0 (instantaneous) to 1.
+       */
+      static sptr make(int samp_per_bit, double samp_rate, double spacing,
+                       double transition=0.0);
+
+      virtual double samp_rate() const = 0;
+      virtual void set_samp_rate(double samp_rate) = 0;
+
+      virtual double spacing() const = 0;
+      virtual void set_spacing(double spacing) = 0;
+
+      virtual double transition() const = 0;
+      virtual void set_transition(double transition) = 0;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_H */
@@ -0,0 +1,67 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_H
+#define INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_H
+
+#include <radioteletype/api.h>
+#include <gnuradio/sync_interpolator.h>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief PSK31 modulator
+     * \ingroup radioteletype
+     *
+     * Each input item is a varicoded bit, and produces samp_per_sym output
+     * samples. A 0 reverses the phase, and a 1 keeps it. Each reversal is
+     * shaped by a raised cosine, so the output is the bits differentially
+     * encoded and filtered by a Hann window two symbols long.
+     *
+     * That filter spans only the previous symbol and this one, so each
+     * symbol is one of three waveforms, or its negation: steady carrier, a
+     * reversal, or, for the first symbol, a rise from nothing. Those are
+     * computed in advance and copied to the output.
+     *
+     * With a nonzero phase_inc, the output is mixed up to that frequency,
+     * in radians per sample, using GNU Radio's sine table.
+     */
+    class RADIOTELETYPE_API psk31_modulator_bc : virtual public gr::sync_interpolator
+    {
+     public:
+      typedef boost::shared_ptr<psk31_modulator_bc> sptr;
+
+      /*!
+       * \brief Return a shared_ptr to a new instance of radioteletype::psk31_modulator_bc.
+       *
+       * \param samp_per_sym Output samples for each input bit.
+       * \param phase_inc Carrier frequency, in radians per sample.
+       */
+      static sptr make(int samp_per_sym, double phase_inc=0.0);
+
+      virtual double phase_inc() const = 0;
+      virtual void set_phase_inc(double phase_inc) = 0;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_H */
@@ -0,0 +1,75 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_H
+#define INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_H
+
+#include <radioteletype/api.h>
+#include <gnuradio/sync_decimator.h>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*!
+     * \brief Power of one tone by sliding DFT
+     * \ingroup radioteletype
+     *
+     * Each input sample is mixed down so center_freq is at 0 Hz and added to
+     * a sum of the last length mixed samples, which is the DFT of the input
+     * at center_freq over that window. Each new sample costs a complex
+     * multiply and a few adds, however long the window. The sum is restarted
+     * from the samples in the window every length samples, so rounding
+     * errors don't accumulate.
+     *
+     * Every decim input samples the mean of the window is taken, and its
+     * power is written to the first output. If the second output is
+     * connected, the mean itself is written there. With length equal to
+     * the samples per symbol, this is a moving average matched filter for
+     * RTTY.
+     */
+    class RADIOTELETYPE_API sliding_dft_cf : virtual public gr::sync_decimator
+    {
+     public:
+      typedef boost::shared_ptr<sliding_dft_cf> sptr;
+
+      /*!
+       * \brief Return a shared_ptr to a new instance of radioteletype::sliding_dft_cf.
+       *
+       * \param decim Input samples for each output sample.
+       * \param center_freq Frequency of the tone, in Hz.
+       * \param sample_rate Input sample rate, in samples per second.
+       * \param length Samples in the window.
+       */
+      static sptr make(int decim, double center_freq, double sample_rate,
+                       int length);
+
+      virtual double center_freq() const = 0;
+      virtual void set_center_freq(double center_freq) = 0;
+
+      virtual double sample_rate() const = 0;
+      virtual void set_sample_rate(double sample_rate) = 0;
+
+      virtual int length() const = 0;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_H */
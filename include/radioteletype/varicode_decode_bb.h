@@ -32,6 +32,19 @@ namespace gr {
      * \brief Decode varicode to ASCII
      * \ingroup radioteletype
      *
+     * Decoded characters are written to the output stream, if it is
+     * connected, and collected into PDUs published on the "pdus" message
+     * port. A PDU is published at the end of each line, when 128 characters
+     * have accumulated, after set_idle_timeout() input items without a
+     * character, or when any message arrives on the "flush" port. The PDU
+     * metadata holds "offset", the input item number of the first
+     * character, "errors", the number of invalid varicodes received while
+     * the line was collected, "freq" if set_center_freq() was called, and
+     * "rx_time" if the first character was tagged with one.
+     *
+     * Stream tags on the input are moved to the next decoded character. Once
+     * an "rx_time" tag has been seen, every character is tagged with an
+     * "rx_time" for its first bit, computed from set_bit_rate().
      */
     class RADIOTELETYPE_API varicode_decode_bb : virtual public gr::block
     {
@@ -47,6 +60,55 @@ namespace gr {
         * creating new instances.
         */
        static sptr make();
+
+      /*!
+       * \brief Number of characters decoded since the block was created, or
+       * since reset_counters().
+       */
+      virtual int chars_decoded() const = 0;
+
+      /*!
+       * \brief Number of bit sequences discarded because they are not valid
+       * varicodes.
+       */
+      virtual int invalid_codes() const = 0;
+
+      //! Set all counters to zero.
+      virtual void reset_counters() = 0;
+
+      /*!
+       * \brief Set the frequency reported as "freq" in the metadata of each
+       * PDU. Until this is called, PDUs have no frequency.
+       */
+      virtual void set_center_freq(double freq) = 0;
+      virtual double center_freq() const = 0;
+
+      /*!
+       * \brief Publish a partial line after this many input bits without a
+       * character. 0 waits for the end of the line.
+       */
+      virtual void set_idle_timeout(int items) = 0;
+      virtual int idle_timeout() const = 0;
+
+      /*!
+       * \brief Set the bit rate used to compute "rx_time" tags. The
+       * default is 31.25, for PSK31. 0 forwards "rx_time" tags unchanged.
+       */
+      virtual void set_bit_rate(double bit_rate) = 0;
+      virtual double bit_rate() const = 0;
+
+      /*!
+       * \brief Trade throughput for latency.
+       *
+       * In low latency mode the block returns after each character so it
+       * reaches the next block immediately, and publishes each character as
+       * a PDU as soon as it is decoded, instead of waiting for the end of
+       * the line. Its output buffer is also kept small, so less can queue
+       * up behind a slow downstream block. The buffer size only changes when
+       * the flowgraph is started.
+       */
+      virtual void set_low_latency(bool low_latency) = 0;
+      virtual bool low_latency() const = 0;
     };
 
   } // namespace radioteletype
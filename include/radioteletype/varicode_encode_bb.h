@@ -29,9 +29,18 @@ namespace gr {
   namespace radioteletype {
 
     /*!
-     * \brief Decode Varicode to ASCII
+     * \brief Encode ASCII to Varicode
      * \ingroup radioteletype
      *
+     * Text comes from the input stream, if it is connected, and from
+     * messages on the "text" port: PDUs of ASCII like the decoders publish,
+     * u8vectors, or symbols. Text from messages is sent as soon as the
+     * current character is finished, ahead of any waiting on the input
+     * stream.
+     *
+     * With idle enabled, zeros (PSK31 idle) are sent whenever there is no
+     * text, so a transmitter runs continuously without a filler source
+     * upstream. Without an input stream, enable idle.
      */
     class RADIOTELETYPE_API varicode_encode_bb : virtual public gr::block
     {
@@ -46,7 +55,26 @@ namespace gr {
        * class. radioteletype::varicode_encode_bb::make is the public interface for
        * creating new instances.
        */
-      static sptr make();
+      static sptr make(bool idle=false);
+
+      //! True if zeros are sent when there is no text.
+      virtual bool idle() const = 0;
+      virtual void set_idle(bool idle) = 0;
+
+      /*!
+       * \brief Number of characters encoded since the block was created, or
+       * since reset_counters().
+       */
+      virtual int chars_encoded() const = 0;
+
+      /*!
+       * \brief Number of input characters dropped because they are not
+       * 7-bit ASCII.
+       */
+      virtual int chars_dropped() const = 0;
+
+      //! Set all counters to zero.
+      virtual void reset_counters() = 0;
     };
 
   } // namespace radioteletype
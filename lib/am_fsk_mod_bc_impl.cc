@@ -0,0 +1,174 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/io_signature.h>
+#include <gnuradio/fxpt.h>
+#include <gnuradio/math.h>
+#include <algorithm>
+#include <stdexcept>
+#include "am_fsk_mod_bc_impl.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    am_fsk_mod_bc::sptr am_fsk_mod_bc::make(
+        int samp_per_bit, double samp_rate, double spacing,
+        const std::vector<gr_complex> &taps)
+    {
+      return gnuradio::get_initial_sptr
+        (new am_fsk_mod_bc_impl(samp_per_bit, samp_rate, spacing, taps));
+    }
+
+    am_fsk_mod_bc_impl::am_fsk_mod_bc_impl(
+        int samp_per_bit, double samp_rate, double spacing,
+        const std::vector<gr_complex> &taps)
+      : gr::sync_interpolator("am_fsk_mod_bc",
+              gr::io_signature::make(1, 1, sizeof(char)),
+              gr::io_signature::make(1, 1, sizeof(gr_complex)),
+              samp_per_bit),
+        samp_per_bit(samp_per_bit),
+        sample_rate(samp_rate),
+        shift(spacing),
+        envelope(taps),
+        updated(false),
+        phase(0)
+    {
+      if (samp_per_bit < 1) {
+        throw std::invalid_argument(
+          "am_fsk_mod_bc: samp_per_bit must be positive");
+      }
+      compute_taps();
+      compute_phase_increment();
+      set_history(depth);
+    }
+
+    am_fsk_mod_bc_impl::~am_fsk_mod_bc_impl() {}
+
+    void am_fsk_mod_bc_impl::compute_taps()
+    {
+      std::vector<gr_complex> h(envelope);
+      if (h.empty()) {
+        h.assign(samp_per_bit, gr_complex(1, 0));
+      }
+
+      depth = (h.size() + samp_per_bit - 1) / samp_per_bit;
+      h.resize(depth * samp_per_bit, gr_complex(0, 0));
+
+      polyphase.resize(h.size());
+      overlap.assign(samp_per_bit, gr_complex(0, 0));
+      for (int j = 0; j < samp_per_bit; j++) {
+        for (int d = 0; d < depth; d++) {
+          polyphase[j * depth + d] = h[j + d * samp_per_bit];
+          overlap[j] += h[j + d * samp_per_bit];
+        }
+      }
+    }
+
+    void am_fsk_mod_bc_impl::compute_phase_increment()
+    {
+      // fxpt represents -pi to pi as the full range of an int32
+      phase_increment = static_cast<uint32_t>(
+        gr::fxpt::float_to_fixed(2 * GR_M_PI * -shift / sample_rate));
+    }
+
+    void am_fsk_mod_bc_impl::set_samp_rate(double samp_rate)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      sample_rate = samp_rate;
+      compute_phase_increment();
+    }
+
+    void am_fsk_mod_bc_impl::set_spacing(double spacing)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      shift = spacing;
+      compute_phase_increment();
+    }
+
+    void am_fsk_mod_bc_impl::set_taps(const std::vector<gr_complex> &taps)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      envelope = taps;
+      compute_taps();
+      updated = true;
+    }
+
+    int am_fsk_mod_bc_impl::work(
+        int noutput_items,
+        gr_vector_const_void_star &input_items,
+        gr_vector_void_star &output_items)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+
+      if (updated) {
+        // the taps may span a different number of bits
+        set_history(depth);
+        updated = false;
+        return 0;
+      }
+
+      const char *in = (const char *) input_items[0];
+      gr_complex *out = (gr_complex *) output_items[0];
+
+      const int nbits = noutput_items / samp_per_bit;
+      const uint64_t first = nitems_read(0);
+      float s, c;
+
+      for (int i = 0; i < nbits; i++) {
+        // bit[-d] is the bit d bits ago
+        const char *bit = &in[i + depth - 1];
+
+        // Before the first bit there's neither mark nor space, so the
+        // overlapping taps are only those of bits received so far.
+        const int n = static_cast<int>(
+          std::min<uint64_t>(depth, first + i + 1));
+
+        for (int j = 0; j < samp_per_bit; j++) {
+          const gr_complex *h = &polyphase[j * depth];
+          gr_complex mark(0, 0);
+          gr_complex total(overlap[j]);
+
+          for (int d = 0; d < n; d++) {
+            if (bit[-d]) {
+              mark += h[d];
+            }
+          }
+          if (n < depth) {
+            total = gr_complex(0, 0);
+            for (int d = 0; d < n; d++) {
+              total += h[d];
+            }
+          }
+
+          gr::fxpt::sincos(static_cast<gr_int32>(phase), &s, &c);
+          phase += phase_increment;
+          *out++ = mark + (total - mark) * gr_complex(c, s);
+        }
+      }
+
+      return nbits * samp_per_bit;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
@@ -0,0 +1,76 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_IMPL_H
+#define INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_IMPL_H
+
+#include <radioteletype/am_fsk_mod_bc.h>
+#include <stdint.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    class am_fsk_mod_bc_impl : public am_fsk_mod_bc
+    {
+     private:
+      int samp_per_bit;
+      double sample_rate;
+      double shift;
+      std::vector<gr_complex> envelope;
+
+      // The taps by output phase: the tap for output sample j of a bit, d
+      // bits after the bit that produced it, is at j * depth + d.
+      std::vector<gr_complex> polyphase;
+      // The sum of the taps for each output phase.
+      std::vector<gr_complex> overlap;
+      int depth;
+      bool updated;
+
+      // Phase of the space tone, in units of 2^-32 cycles.
+      uint32_t phase;
+      uint32_t phase_increment;
+
+      void compute_taps();
+      void compute_phase_increment();
+
+     public:
+      am_fsk_mod_bc_impl(int samp_per_bit, double samp_rate, double spacing,
+                         const std::vector<gr_complex> &taps);
+      ~am_fsk_mod_bc_impl();
+
+      double samp_rate() const { return sample_rate; }
+      void set_samp_rate(double samp_rate);
+
+      double spacing() const { return shift; }
+      void set_spacing(double spacing);
+
+      std::vector<gr_complex> taps() const { return envelope; }
+      void set_taps(const std::vector<gr_complex> &taps);
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_AM_FSK_MOD_BC_IMPL_H */
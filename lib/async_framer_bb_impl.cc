@@ -0,0 +1,159 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/io_signature.h>
+#include <stdexcept>
+#include "async_framer_bb_impl.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    static const int NO_WORD = -2;
+
+    async_framer_bb::sptr async_framer_bb::make(
+        int bits_per_word, float sample_rate, float bit_rate, float stop_bits)
+    {
+      return gnuradio::get_initial_sptr
+        (new async_framer_bb_impl(
+          bits_per_word, sample_rate, bit_rate, stop_bits));
+    }
+
+    async_framer_bb_impl::async_framer_bb_impl(
+        int bits_per_word, float sample_rate, float bit_rate, float stop_bits)
+      : gr::block("async_framer_bb",
+              gr::io_signature::make(1, 1, sizeof(char)),
+              gr::io_signature::make(1, 1, sizeof(char))),
+        bits_per_word(bits_per_word),
+        samples_per_bit(sample_rate / bit_rate),
+        stop_length(stop_bits),
+        word(0),
+        bit(NO_WORD),
+        remaining(0)
+    {
+      if (bits_per_word < 1 || bits_per_word > 8) {
+        throw std::invalid_argument(
+          "async_framer_bb: bits_per_word must be from 1 to 8");
+      }
+      if (samples_per_bit < 1) {
+        throw std::invalid_argument(
+          "async_framer_bb: sample_rate must be at least bit_rate");
+      }
+      update_rate();
+    }
+
+    async_framer_bb_impl::~async_framer_bb_impl() {}
+
+    void async_framer_bb_impl::update_rate()
+    {
+      set_relative_rate((1 + bits_per_word + stop_length) * samples_per_bit);
+    }
+
+    void async_framer_bb_impl::set_stop_bits(float stop_bits)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      stop_length = stop_bits;
+      update_rate();
+    }
+
+    void async_framer_bb_impl::forecast(
+        int noutput_items, gr_vector_int &ninput_items_required)
+    {
+      // The rest of a word in progress needs no input, and must still be
+      // sent when the input has ended.
+      if (bit != NO_WORD && !(bit == bits_per_word && remaining <= 0))
+      {
+        ninput_items_required[0] = 0;
+        return;
+      }
+
+      const double samples_per_word =
+        (1 + bits_per_word + stop_length) * samples_per_bit;
+      ninput_items_required[0] = noutput_items / samples_per_word + 1;
+    }
+
+    int async_framer_bb_impl::general_work(
+        int noutput_items,
+        gr_vector_int &ninput_items,
+        gr_vector_const_void_star &input_items,
+        gr_vector_void_star &output_items)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+
+      const unsigned char *in = (const unsigned char *) input_items[0];
+      char *out = (char *) output_items[0];
+
+      const unsigned char *const in_start = in;
+      const char *const out_start = out;
+      const double sample_length = 1 / samples_per_bit;
+
+      while (out - out_start < noutput_items)
+      {
+        if (remaining <= 0)
+        {
+          // on to the next bit
+          if (bit == NO_WORD || bit == bits_per_word)
+          {
+            if (in - in_start == ninput_items[0])
+            {
+              bit = NO_WORD;
+              break;
+            }
+            word = *in++;
+            bit = -1;
+            remaining += 1;
+          }
+          else
+          {
+            bit += 1;
+            remaining += bit == bits_per_word ? stop_length : 1;
+          }
+        }
+
+        char value;
+        if (bit < 0)
+        {
+          value = 0;
+        }
+        else if (bit == bits_per_word)
+        {
+          value = 1;
+        }
+        else
+        {
+          value = (word >> bit) & 1;
+        }
+
+        while (remaining > 0 && out - out_start < noutput_items)
+        {
+          *out++ = value;
+          remaining -= sample_length;
+        }
+      }
+
+      consume_each(in - in_start);
+      return out - out_start;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
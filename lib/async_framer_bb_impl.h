@@ -0,0 +1,66 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_IMPL_H
+#define INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_IMPL_H
+
+#include <radioteletype/async_framer_bb.h>
+
+namespace gr {
+  namespace radioteletype {
+
+    class async_framer_bb_impl : public async_framer_bb
+    {
+     private:
+      const int bits_per_word;
+      const double samples_per_bit;
+      float stop_length;
+
+      // The word being sent, and the bit of it: -1 for the start bit,
+      // bits_per_word for the stop bits. No word when bit is below -1.
+      unsigned char word;
+      int bit;
+
+      // Samples left to send of the current bit. Fractional, and carried
+      // into the next bit.
+      double remaining;
+
+      void update_rate();
+
+     public:
+      async_framer_bb_impl(int bits_per_word, float sample_rate,
+                           float bit_rate, float stop_bits);
+      ~async_framer_bb_impl();
+
+      float stop_bits() const { return stop_length; }
+      void set_stop_bits(float stop_bits);
+
+      void forecast(int noutput_items, gr_vector_int &ninput_items_required);
+
+      int general_work(int noutput_items,
+                       gr_vector_int &ninput_items,
+                       gr_vector_const_void_star &input_items,
+                       gr_vector_void_star &output_items);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_ASYNC_FRAMER_BB_IMPL_H */
@@ -23,10 +23,19 @@
 #endif
 
 #include <gnuradio/io_signature.h>
+#ifdef GR_CTRLPORT
+#include <gnuradio/rpcregisterhelpers.h>
+#endif
 #include "async_word_extractor_bb_impl.h"
 
 namespace gr {
   namespace radioteletype {
+    // Output buffer limit in low latency mode, in items. GNU Radio rounds
+    // it up to a whole page.
+    static const long LOW_LATENCY_BUFFER = 256;
+
+    // Tags a word received without its stop bit.
+    static const pmt::pmt_t FRAMING_ERROR = pmt::mp("framing_error");
 
     async_word_extractor_bb::sptr
     async_word_extractor_bb::make(int bits_per_word, float sample_rate, float bit_rate)
@@ -42,27 +51,84 @@ namespace gr {
       : gr::block("async_word_extractor_bb",
               gr::io_signature::make(1, 1, sizeof(unsigned char)),
               gr::io_signature::make(1, 1, sizeof(unsigned char))),
-      bits_per_word(bits_per_word)
+      bits_per_word(bits_per_word),
+      missed_stop_bit(false),
+      word_start(0),
+      tags(sample_rate)
     {
       bits_per_sample = bit_rate / sample_rate;
       waiting_for_start = true;
+      low_latency_mode = false;
+      reset_counters();
+      set_tag_propagation_policy(TPP_DONT);
     }
 
     async_word_extractor_bb_impl::~async_word_extractor_bb_impl()
     {
     }
 
+    void async_word_extractor_bb_impl::reset_counters()
+    {
+      words_extracted_count = 0;
+      framing_error_count = 0;
+    }
+
+    void async_word_extractor_bb_impl::set_low_latency(bool low_latency)
+    {
+      low_latency_mode = low_latency;
+      if (low_latency)
+      {
+        set_max_noutput_items(1);
+        set_max_output_buffer(LOW_LATENCY_BUFFER);
+      }
+      else
+      {
+        unset_max_noutput_items();
+        // GNU Radio's default, no limit
+        set_max_output_buffer(-1);
+      }
+    }
+
+    void async_word_extractor_bb_impl::setup_rpc()
+    {
+#ifdef GR_CTRLPORT
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<async_word_extractor_bb, int>(
+          alias(), "words_extracted",
+          &async_word_extractor_bb::words_extracted,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "words", "Words extracted", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<async_word_extractor_bb, int>(
+          alias(), "framing_errors",
+          &async_word_extractor_bb::framing_errors,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "words", "Missing stop bits", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+#endif /* GR_CTRLPORT */
+    }
+
     void async_word_extractor_bb_impl::reset()
     {
       waiting_for_start = false;
       position = -0.5;
       bits_eaten = 0;
       current_word = 0;
+      missed_stop_bit = false;
     }
 
     void
     async_word_extractor_bb_impl::forecast (int noutput_items, gr_vector_int &ninput_items_required)
     {
+      if (low_latency_mode)
+      {
+        // whatever input there is may finish a word already under way
+        ninput_items_required[0] = 1;
+        return;
+      }
+
       int required_samples = noutput_items * (bits_per_word+2) / bits_per_sample;
       ninput_items_required[0] = required_samples;
     }
@@ -72,10 +138,18 @@ namespace gr {
       if (bits_eaten >= bits_per_word and sample)
       {
         *out++ = current_word;
+        words_extracted_count += 1;
         waiting_for_start = true;
       }
       else
       {
+        if (bits_eaten == bits_per_word)
+        {
+          // there should be a stop bit here
+          framing_error_count += 1;
+          missed_stop_bit = true;
+        }
+
         // shift the bit in at the most significant position
         current_word >>= 1;
         if (sample)
@@ -124,12 +198,35 @@ namespace gr {
 
       unsigned char byte;
 
+      const uint64_t in_offset = nitems_read(0);
+      const uint64_t out_offset = nitems_written(0);
+      tags.begin(this, in_offset, in_offset + ninput_items[0]);
+
       while( (out - out_start < noutput_items) &&
              (in - in_start < ninput_items[0]))
       {
+        const uint64_t sample = in_offset + (in - in_start);
+        const bool was_waiting = waiting_for_start;
+        unsigned char *const word = out;
+
         out = eat_sample(*in++, out);
+
+        if (was_waiting && !waiting_for_start)
+        {
+          word_start = sample;
+        }
+        if (out != word)
+        {
+          tags.emit(this, out_offset + (word - out_start), sample, word_start);
+          if (missed_stop_bit)
+          {
+            add_item_tag(0, out_offset + (word - out_start),
+                FRAMING_ERROR, pmt::PMT_T);
+          }
+        }
       }
 
+      tags.finish(in_offset + (in - in_start));
       consume_each (in - in_start);
       return out - out_start;
     }
@@ -22,6 +22,7 @@
 #define INCLUDED_RADIOTELETYPE_ASYNC_WORD_EXTRACTOR_BB_IMPL_H
 
 #include <radioteletype/async_word_extractor_bb.h>
+#include "tag_forwarder.h"
 
 namespace gr {
   namespace radioteletype {
@@ -33,8 +34,14 @@ namespace gr {
         float bits_per_sample;
         float position;
         bool waiting_for_start;
+        bool low_latency_mode;
         unsigned char current_word;
         unsigned char bits_eaten;
+        bool missed_stop_bit;
+        int words_extracted_count;
+        int framing_error_count;
+        uint64_t word_start;
+        tag_forwarder tags;
         void reset();
         unsigned char *eat_sample(bool sample, unsigned char *out);
         unsigned char *eat_bit(bool bit, unsigned char *out);
@@ -43,6 +50,14 @@ namespace gr {
         async_word_extractor_bb_impl(int bits_per_word, float sample_rate, float bit_rate);
         ~async_word_extractor_bb_impl();
 
+        int words_extracted() const { return words_extracted_count; }
+        int framing_errors() const { return framing_error_count; }
+        void reset_counters();
+        void setup_rpc();
+
+        void set_low_latency(bool low_latency);
+        bool low_latency() const { return low_latency_mode; }
+
         // Where all the action really happens
         void forecast (int noutput_items, gr_vector_int &ninput_items_required);
 
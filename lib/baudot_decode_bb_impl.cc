@@ -23,10 +23,26 @@
 #endif
 
 #include <gnuradio/io_signature.h>
+#ifdef GR_CTRLPORT
+#include <gnuradio/rpcregisterhelpers.h>
+#endif
 #include "baudot_decode_bb_impl.h"
 
 namespace gr {
   namespace radioteletype {
+    // Longest line published as one PDU.
+    static const unsigned int MAX_PDU_LENGTH = 128;
+
+    // Tag on a code from a word received without its stop bit.
+    static const pmt::pmt_t FRAMING_ERROR = pmt::mp("framing_error");
+
+    // About two seconds at 45.45 baud.
+    static const int DEFAULT_IDLE_TIMEOUT = 12;
+
+    // Output buffer limit in low latency mode, in items. GNU Radio rounds
+    // it up to a whole page.
+    static const long LOW_LATENCY_BUFFER = 256;
+
     baudot_decode_bb::sptr baudot_decode_bb::make()
     {
       return gnuradio::get_initial_sptr
@@ -36,14 +52,57 @@ namespace gr {
     baudot_decode_bb_impl::baudot_decode_bb_impl()
       : gr::block("baudot_decode_bb",
               gr::io_signature::make(1, 1, sizeof(char)),
-              gr::io_signature::make(1, 1, sizeof(char)))
+              gr::io_signature::make(0, 1, sizeof(char))),
+        batcher(MAX_PDU_LENGTH, DEFAULT_IDLE_TIMEOUT),
+        tags(0)
     {
-      char_set = letters;
+      low_latency_mode = false;
+      reset_counters();
+      set_tag_propagation_policy(TPP_DONT);
+
+      message_port_register_out(pmt::mp("pdus"));
+      message_port_register_in(pmt::mp("flush"));
+      set_msg_handler(pmt::mp("flush"),
+        boost::bind(&baudot_decode_bb_impl::handle_flush, this, _1));
     }
 
     baudot_decode_bb_impl::~baudot_decode_bb_impl()
     {}
 
+    void baudot_decode_bb_impl::reset_counters()
+    {
+      chars_decoded_count = 0;
+    }
+
+    void baudot_decode_bb_impl::set_low_latency(bool low_latency)
+    {
+      low_latency_mode = low_latency;
+      if (low_latency)
+      {
+        set_max_noutput_items(1);
+        set_max_output_buffer(LOW_LATENCY_BUFFER);
+      }
+      else
+      {
+        unset_max_noutput_items();
+        // GNU Radio's default, no limit
+        set_max_output_buffer(-1);
+      }
+    }
+
+    void baudot_decode_bb_impl::setup_rpc()
+    {
+#ifdef GR_CTRLPORT
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<baudot_decode_bb, int>(
+          alias(), "chars_decoded",
+          &baudot_decode_bb::chars_decoded,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "chars", "Characters decoded", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+#endif /* GR_CTRLPORT */
+    }
+
     void baudot_decode_bb_impl::forecast (int noutput_items, gr_vector_int &ninput_items_required)
     {
       ninput_items_required[0] = noutput_items;
@@ -55,31 +114,66 @@ namespace gr {
                        gr_vector_void_star &output_items)
     {
       const char *in = (const char *) input_items[0];
-      char *out = (char *) output_items[0];
+      // the output stream is optional when only PDUs are wanted
+      char *out = output_items.empty() ? NULL : (char *) output_items[0];
 
       const char *const in_start = in;
-      const char *const out_start = out;
+      const uint64_t offset = nitems_read(0);
+      const uint64_t out_offset = out ? nitems_written(0) : 0;
+      int produced = 0;
 
-      while( (out - out_start < noutput_items) &&
+      tags.begin(this, offset, offset + ninput_items[0]);
+
+      while( (produced < noutput_items) &&
              (in - in_start < ninput_items[0]))
       {
-        if (*in == 0x1b)
-        {
-          char_set = figures;
-        }
-        else if (*in == 0x1f)
-        {
-          char_set = letters;
-        }
-        else
+        // shift codes decode to nothing
+        const int decoded = decoder.decode_one(*in);
+        if (decoded != -1)
         {
-          *out++ = char_set[*in & 0x1f];
+          const uint64_t code = offset + (in - in_start);
+          tags.emit(out ? this : NULL, out_offset + produced, code, code);
+          if (out)
+          {
+            out[produced++] = decoded;
+          }
+          chars_decoded_count += 1;
+
+          if (tags.placed(FRAMING_ERROR))
+          {
+            batcher.add_error();
+          }
+          if (batcher.add_char(decoded, code, code, tags.last_time()) ||
+              low_latency_mode)
+          {
+            publish();
+          }
         }
         in += 1;
       }
 
+      tags.finish(offset + (in - in_start));
+
+      if (batcher.idle(offset + (in - in_start)))
+      {
+        publish();
+      }
+
       consume_each (in - in_start);
-      return out - out_start;
+      return produced;
+    }
+
+    void baudot_decode_bb_impl::publish()
+    {
+      message_port_pub(pmt::mp("pdus"), batcher.make_pdu());
+    }
+
+    void baudot_decode_bb_impl::handle_flush(pmt::pmt_t msg)
+    {
+      if (!batcher.empty())
+      {
+        publish();
+      }
     }
 
   } /* namespace radioteletype */
@@ -22,35 +22,40 @@
 #define INCLUDED_RADIOTELETYPE_BAUDOT_DECODE_BB_IMPL_H
 
 #include <radioteletype/baudot_decode_bb.h>
+#include <radioteletype/codecs.h>
+#include "tag_forwarder.h"
+#include "text_pdu_batcher.h"
 
 namespace gr {
   namespace radioteletype {
-    static const char letters[32] = {
-      '\0',   'E',    '\n',   'A',    ' ',    'S',    'I',    'U',
-      '\r',   'D',    'R',    'J',    'N',    'F',    'C',    'K',
-      'T',    'Z',    'L',    'W',    'H',    'Y',    'P',    'Q',
-      'O',    'B',    'G',    ' ',    'M',    'X',    'V',    ' '
-    };
-
-    /*
-     * U.S. version of the figures case.
-     */
-    static const char figures[32] = {
-      '\0',   '3',    '\n',   '-',    ' ',    '\a',   '8',    '7',
-      '\r',   '$',    '4',    '\'',   ',',    '!',    ':',    '(',
-      '5',    '"',    ')',    '2',    '#',    '6',    '0',    '1',
-      '9',    '?',    '&',    ' ',    '.',    '/',    ';',    ' '
-    };
 
     class baudot_decode_bb_impl : public baudot_decode_bb
     {
       private:
-        const char *char_set;
+        baudot_decoder decoder;
+        bool low_latency_mode;
+        int chars_decoded_count;
+        text_pdu_batcher batcher;
+        tag_forwarder tags;
+        void publish();
+        void handle_flush(pmt::pmt_t msg);
 
       public:
         baudot_decode_bb_impl();
         ~baudot_decode_bb_impl();
 
+        int chars_decoded() const { return chars_decoded_count; }
+        void reset_counters();
+        void setup_rpc();
+
+        void set_center_freq(double freq) { batcher.set_center_freq(freq); }
+        double center_freq() const { return batcher.center_freq(); }
+        void set_idle_timeout(int items) { batcher.set_idle_timeout(items); }
+        int idle_timeout() const { return batcher.idle_timeout(); }
+
+        void set_low_latency(bool low_latency);
+        bool low_latency() const { return low_latency_mode; }
+
         // Where all the action really happens
         void forecast (int noutput_items, gr_vector_int &ninput_items_required);
 
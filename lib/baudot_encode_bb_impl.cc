@@ -23,30 +23,99 @@
 #endif
 
 #include <gnuradio/io_signature.h>
+#ifdef GR_CTRLPORT
+#include <gnuradio/rpcregisterhelpers.h>
+#endif
 #include "baudot_encode_bb_impl.h"
+#include "message_text.h"
 
 namespace gr {
   namespace radioteletype {
 
-    baudot_encode_bb::sptr baudot_encode_bb::make()
+    baudot_encode_bb::sptr baudot_encode_bb::make(bool idle)
     {
       return gnuradio::get_initial_sptr
-        (new baudot_encode_bb_impl());
+        (new baudot_encode_bb_impl(idle));
     }
 
-    baudot_encode_bb_impl::baudot_encode_bb_impl()
+    baudot_encode_bb_impl::baudot_encode_bb_impl(bool idle)
       : gr::block("baudot_encode_bb",
-              gr::io_signature::make(1, 1, sizeof(char)),
-              gr::io_signature::make(1, 1, sizeof(char)))
+              gr::io_signature::make(0, 1, sizeof(char)),
+              gr::io_signature::make(1, 1, sizeof(char))),
+        idle_fill(idle)
     {
-      character_set = LETTERS;
+      reset_counters();
+
+      message_port_register_in(pmt::mp("text"));
+      set_msg_handler(pmt::mp("text"),
+        boost::bind(&baudot_encode_bb_impl::handle_text, this, _1));
     }
 
     baudot_encode_bb_impl::~baudot_encode_bb_impl() {}
 
+    void baudot_encode_bb_impl::reset_counters()
+    {
+      chars_encoded_count = 0;
+      chars_dropped_count = 0;
+    }
+
+    void baudot_encode_bb_impl::setup_rpc()
+    {
+#ifdef GR_CTRLPORT
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<baudot_encode_bb, int>(
+          alias(), "chars_encoded",
+          &baudot_encode_bb::chars_encoded,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "chars", "Characters encoded", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<baudot_encode_bb, int>(
+          alias(), "chars_dropped",
+          &baudot_encode_bb::chars_dropped,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "chars", "Characters without a Baudot code", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+#endif /* GR_CTRLPORT */
+    }
+
+    void baudot_encode_bb_impl::count(size_t ncodes)
+    {
+      if (ncodes) {
+        chars_encoded_count += 1;
+      }
+      else {
+        chars_dropped_count += 1;
+      }
+    }
+
+    void baudot_encode_bb_impl::handle_text(pmt::pmt_t msg)
+    {
+      std::string text;
+      if (!message_text(msg, text) || text.empty()) {
+        return;
+      }
+
+      // Start in neither case, so the first character is shifted.
+      baudot_encoder text_encoder;
+      text_encoder.set_state(0);
+
+      char codes[2];
+      for (size_t i = 0; i < text.size(); i++) {
+        const size_t n = text_encoder.encode(&text[i], 1, codes, 2);
+        pending.insert(pending.end(), codes, codes + n);
+        count(n);
+      }
+    }
+
     void baudot_encode_bb_impl::forecast (int noutput_items, gr_vector_int &ninput_items_required)
     {
-      ninput_items_required[0] = noutput_items;
+      // Idle and queued text can be sent without any input.
+      const bool need_input = !idle_fill && pending.empty();
+      for (unsigned int i = 0; i < ninput_items_required.size(); i++) {
+        ninput_items_required[i] = need_input ? noutput_items : 0;
+      }
     }
 
 
@@ -56,60 +125,61 @@ namespace gr {
         gr_vector_const_void_star &input_items,
         gr_vector_void_star &output_items)
     {
-      const char *in = (const char *) input_items[0];
+      // the input stream is optional when text comes from messages
+      const char *in = input_items.empty() ? NULL : (const char *) input_items[0];
+      const int ninput = input_items.empty() ? 0 : ninput_items[0];
       char *out = (char *) output_items[0];
 
       const char *const in_start = in;
       const char *const out_start = out;
 
-      char code;
+      char codes[2];
 
-      while( (out - out_start < noutput_items) &&
-             (in - in_start < ninput_items[0]))
+      while (out - out_start < noutput_items)
       {
-        if (*in & ~0x7f)
+        if (!pending.empty())
         {
-          in += 1;
+          const char code = pending.front();
+          pending.pop_front();
+          if (code == LETTERS || code == FIGURES)
+          {
+            encoder.set_state(code);
+          }
+          *out++ = code;
           continue;
         }
 
-        code = ascii_to_letters[*in];
-        if (code != -1)
+        if (in - in_start == ninput)
         {
-          if (character_set == LETTERS)
+          if (!idle_fill)
           {
-            *out++ = code;
-            in += 1;
-            continue;
-          }
-          else
-          {
-            *out++ = character_set = LETTERS;
-            continue;
+            break;
           }
+          *out++ = LETTERS;
+          encoder.set_state(LETTERS);
+          continue;
         }
 
-        code = ascii_to_figures[*in];
-        if (code != -1)
+        // A shift and a character. What doesn't fit waits in pending.
+        const size_t n = encoder.encode(in, 1, codes, 2);
+        count(n);
+        in += 1;
+        for (size_t i = 0; i < n; i++)
         {
-          if (character_set == FIGURES)
+          if (out - out_start < noutput_items)
           {
-            *out++ = code;
-            in += 1;
-            continue;
+            *out++ = codes[i];
           }
           else
           {
-            *out++ = character_set = FIGURES;
-            continue;
+            pending.push_back(codes[i]);
           }
         }
-
-        // No Baudot equivalent. Just eat it.
-        in += 1;
       }
 
-      consume_each (in - in_start);
+      if (in) {
+        consume_each (in - in_start);
+      }
       return out - out_start;
     }
 
@@ -0,0 +1,406 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <radioteletype/codecs.h>
+#include <stdexcept>
+
+namespace gr {
+  namespace radioteletype {
+    static const char letters[32] = {
+      '\0',   'E',    '\n',   'A',    ' ',    'S',    'I',    'U',
+      '\r',   'D',    'R',    'J',    'N',    'F',    'C',    'K',
+      'T',    'Z',    'L',    'W',    'H',    'Y',    'P',    'Q',
+      'O',    'B',    'G',    ' ',    'M',    'X',    'V',    ' '
+    };
+
+    /*
+     * U.S. version of the figures case.
+     */
+    static const char figures[32] = {
+      '\0',   '3',    '\n',   '-',    ' ',    '\a',   '8',    '7',
+      '\r',   '$',    '4',    '\'',   ',',    '!',    ':',    '(',
+      '5',    '"',    ')',    '2',    '#',    '6',    '0',    '1',
+      '9',    '?',    '&',    ' ',    '.',    '/',    ';',    ' '
+    };
+
+    static const signed char ascii_to_letters[128] = {
+//    '\x00'   '\x01'   '\x02'   '\x03'   '\x04'   '\x05'   '\x06'   '\x07'
+      0x00,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '\x08'   '\t'     '\n'     '\x0b'   '\x0c'   '\r'     '\x0e'   '\x0f'
+      -1  ,    -1  ,    0x02,    -1  ,    -1  ,    0x08,    -1  ,    -1  ,
+//    '\x10'   '\x11'   '\x12'   '\x13'   '\x14'   '\x15'   '\x16'   '\x17'
+      -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '\x18'   '\x19'   '\x1a'   '\x1b'   '\x1c'   '\x1d'   '\x1e'   '\x1f'
+      -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    ' '      '!'      '"'      '#'      '$'      '%'      '&'      "'"
+      0x04,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '('      ')'      '*'      '+'      ','      '-'      '.'      '/'
+      -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '0'      '1'      '2'      '3'      '4'      '5'      '6'      '7'
+      -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '8'      '9'      ':'      ';'      '<'      '='      '>'      '?'
+      -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '@'      'A'      'B'      'C'      'D'      'E'      'F'      'G'
+      -1  ,    0x03,    0x19,    0x0e,    0x09,    0x01,    0x0d,    0x1a,
+//    'H'      'I'      'J'      'K'      'L'      'M'      'N'      'O'
+      0x14,    0x06,    0x0b,    0x0f,    0x12,    0x1c,    0x0c,    0x18,
+//    'P'      'Q'      'R'      'S'      'T'      'U'      'V'      'W'
+      0x16,    0x17,    0x0a,    0x05,    0x10,    0x07,    0x1e,    0x13,
+//    'X'      'Y'      'Z'      '['      '\\'     ']'      '^'      '_'
+      0x1d,    0x15,    0x11,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//    '`'      'a'      'b'      'c'      'd'      'e'      'f'      'g'
+      -1  ,    0x03,    0x19,    0x0e,    0x09,    0x01,    0x0d,    0x1a,
+//    'h'      'i'      'j'      'k'      'l'      'm'      'n'      'o'
+      0x14,    0x06,    0x0b,    0x0f,    0x12,    0x1c,    0x0c,    0x18,
+//    'p'      'q'      'r'      's'      't'      'u'      'v'      'w'
+      0x16,    0x17,    0x0a,    0x05,    0x10,    0x07,    0x1e,    0x13,
+//    'x'      'y'      'z'      '{'      '|'      '}'      '~'      '\x7f'
+      0x1d,    0x15,    0x11,    -1  ,    -1  ,    -1  ,    -1  ,    -1
+    };
+
+    static const signed char ascii_to_figures[128] = {
+//   '\x00'   '\x01'   '\x02'   '\x03'   '\x04'   '\x05'   '\x06'   '\x07'
+     0x00,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    0x05,
+//   '\x08'   '\t'     '\n'     '\x0b'   '\x0c'   '\r'     '\x0e'   '\x0f'
+     -1  ,    -1  ,    0x02,    -1  ,    -1  ,    0x08,    -1  ,    -1  ,
+//   '\x10'   '\x11'   '\x12'   '\x13'   '\x14'   '\x15'   '\x16'   '\x17'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   '\x18'   '\x19'   '\x1a'   '\x1b'   '\x1c'   '\x1d'   '\x1e'   '\x1f'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   ' '      '!'      '"'      '#'      '$'      '%'      '&'      "'"
+     0x04,    0x0d,    0x11,    0x14,    0x09,    -1  ,    0x1a,    -1  ,
+//   '('      ')'      '*'      '+'      ','      '-'      '.'      '/'
+     0x0f,    0x12,    -1  ,    -1  ,    0x0c,    0x03,    0x1c,    0x1d,
+//   '0'      '1'      '2'      '3'      '4'      '5'      '6'      '7'
+     0x16,    0x17,    0x13,    0x01,    0x0a,    0x10,    0x15,    0x07,
+//   '8'      '9'      ':'      ';'      '<'      '='      '>'      '?'
+     0x06,    0x18,    0x0e,    0x1e,    -1  ,    -1  ,    -1  ,    0x19,
+//   '@'      'A'      'B'      'C'      'D'      'E'      'F'      'G'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'H'      'I'      'J'      'K'      'L'      'M'      'N'      'O'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'P'      'Q'      'R'      'S'      'T'      'U'      'V'      'W'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'X'      'Y'      'Z'      '['      '\\'     ']'      '^'      '_'
+     -1  ,    -1  ,    -1  ,    -1  ,    0x0b,    -1  ,    -1  ,    -1  ,
+//   '`'      'a'      'b'      'c'      'd'      'e'      'f'      'g'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'h'      'i'      'j'      'k'      'l'      'm'      'n'      'o'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'p'      'q'      'r'      's'      't'      'u'      'v'      'w'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,
+//   'x'      'y'      'z'      '{'      '|'      '}'      '~'      '\x7f'
+     -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1  ,    -1
+    };
+
+    /*
+     * Indexed by varicode, as received, without its last bit: all
+     * varicodes end with 1, so this table omits that.
+     */
+    static const char varicodes[512] = {
+      ' ', 'e', 't', 'o', '\xff', 'a', 'i', 'n', '\xff', '\xff', 'r', 's',
+      '\xff', 'l', '\n', '\r', '\xff', '\xff', '\xff', '\xff', '\xff', 'h', 'd',
+      'c', '\xff', '\xff', '-', 'u', '\xff', 'm', 'f', 'p', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '=', '.',
+      '\xff', 'g', 'y', 'b', '\xff', '\xff', '\xff', '\xff', '\xff', 'w', 'T',
+      'S', '\xff', '\xff', ',', 'E', '\xff', 'v', 'A', 'I', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', 'O', 'C', 'R', '\xff', '\xff', 'D', '0', '\xff', 'M', '1', 'k',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', 'P', 'L', '\xff', 'F', 'N', 'x', '\xff', '\xff', '\xff', '\xff',
+      '\xff', 'B', '2', '\t', '\xff', '\xff', ':', ')', '\xff', '(', 'G', '3',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', 'H', 'U', '\xff', '5',
+      'W', '"', '\xff', '\xff', '\xff', '\xff', '\xff', '6', '_', '*', '\xff',
+      '\xff', 'X', '4', '\xff', 'Y', 'K', '\'', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '8', '7',
+      '/', '\xff', '\xff', 'V', '9', '\xff', '|', ';', 'q', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', 'z', '>',
+      '\xff', '$', 'Q', '+', '\xff', '\xff', '\xff', '\xff', '\xff', 'j', '<',
+      '\\', '\xff', '\xff', '#', '[', '\xff', ']', 'J', '!', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\x00', 'Z', '?', '\xff', '\xff', '}', '{', '\xff', '&',
+      '@', '^', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '%', '~', '\xff', '\x01', '\x0c', '`', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\x04', '\x02', '\x06', '\xff', '\xff', '\x11',
+      '\x10', '\xff', '\x1e', '\x07', '\x08', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\x1b', '\x17', '\xff', '\x14', '\x1c', '\x05', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\x15', '\x16', '\x0b', '\xff', '\xff',
+      '\x0e', '\x03', '\xff', '\x18', '\x19', '\x1f', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\x0f', '\x12', '\x13', '\xff', '\xff', '\x7f', '\x1a', '\xff', '\x1d',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
+      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff'};
+
+    /* These codes have their bits reversed. That means we can shift out the
+     * least significant bit and end up with the bits in the order they are
+     * sent. Two consecutive zero bits indicates the end of the varicode. */
+    static const unsigned int ascii_to_varicode[128] = {
+      0x355, 0x36d, 0x2dd, 0x3bb, 0x35d, 0x3eb, 0x3dd, 0x2fd, 0x3fd, 0xf7,
+      0x17, 0x3db, 0x2ed, 0x1f, 0x2bb, 0x357, 0x3bd, 0x2bd, 0x2d7, 0x3d7,
+      0x36b, 0x35b, 0x2db, 0x3ab, 0x37b, 0x2fb, 0x3b7, 0x2ab, 0x2eb, 0x377,
+      0x37d, 0x3fb, 0x1, 0x1ff, 0x1f5, 0x15f, 0x1b7, 0x2ad, 0x375, 0x1fd, 0xdf,
+      0xef, 0x1ed, 0x1f7, 0x57, 0x2b, 0x75, 0x1eb, 0xed, 0xbd, 0xb7, 0xff,
+      0x1dd, 0x1b5, 0x1ad, 0x16b, 0x1ab, 0x1db, 0xaf, 0x17b, 0x16f, 0x55,
+      0x1d7, 0x3d5, 0x2f5, 0x5f, 0xd7, 0xb5, 0xad, 0x77, 0xdb, 0xbf, 0x155,
+      0x7f, 0x17f, 0x17d, 0xeb, 0xdd, 0xbb, 0xd5, 0xab, 0x177, 0xf5, 0x7b,
+      0x5b, 0x1d5, 0x15b, 0x175, 0x15d, 0x1bd, 0x2d5, 0x1df, 0x1ef, 0x1bf,
+      0x3f5, 0x16d, 0x3ed, 0xd, 0x7d, 0x3d, 0x2d, 0x3, 0x2f, 0x6d, 0x35, 0xb,
+      0x1af, 0xfd, 0x1b, 0x37, 0xf, 0x7, 0x3f, 0x1fb, 0x15, 0x1d, 0x5, 0x3b,
+      0x6f, 0x6b, 0xfb, 0x5d, 0x157, 0x3b5, 0x1bb, 0x2b5, 0x3ad, 0x2b7
+    };
+
+    static void check_room(size_t out_len, size_t required)
+    {
+      if (out_len < required) {
+        throw std::invalid_argument("output buffer too small");
+      }
+    }
+
+    const int baudot_decoder::LETTERS;
+    const int baudot_decoder::FIGURES;
+
+    baudot_decoder::baudot_decoder()
+    {
+      reset();
+    }
+
+    int baudot_decoder::decode_one(unsigned char code)
+    {
+      code &= 0x1f;
+      if (code == FIGURES) {
+        figures_case = true;
+        return -1;
+      }
+      if (code == LETTERS) {
+        figures_case = false;
+        return -1;
+      }
+      return figures_case ? figures[code] : letters[code];
+    }
+
+    size_t baudot_decoder::decode(
+      const char *in, size_t in_len, char *out, size_t out_len)
+    {
+      check_room(out_len, in_len);
+
+      char *const out_start = out;
+      for (size_t i = 0; i < in_len; i++) {
+        const int decoded = decode_one(in[i]);
+        if (decoded != -1) {
+          *out++ = decoded;
+        }
+      }
+      return out - out_start;
+    }
+
+    int baudot_decoder::state() const
+    {
+      return figures_case ? FIGURES : LETTERS;
+    }
+
+    void baudot_decoder::set_state(int state)
+    {
+      figures_case = (state == FIGURES);
+    }
+
+    void baudot_decoder::reset()
+    {
+      figures_case = false;
+    }
+
+    baudot_encoder::baudot_encoder()
+    {
+      reset();
+    }
+
+    int baudot_encoder::letters_code(unsigned char c)
+    {
+      return c & ~0x7f ? -1 : ascii_to_letters[c];
+    }
+
+    int baudot_encoder::figures_code(unsigned char c)
+    {
+      return c & ~0x7f ? -1 : ascii_to_figures[c];
+    }
+
+    size_t baudot_encoder::encode(
+      const char *in, size_t in_len, char *out, size_t out_len)
+    {
+      check_room(out_len, 2 * in_len);
+
+      char *const out_start = out;
+      for (size_t i = 0; i < in_len; i++) {
+        int code = letters_code(in[i]);
+        int shift = baudot_decoder::LETTERS;
+        if (code == -1) {
+          code = figures_code(in[i]);
+          shift = baudot_decoder::FIGURES;
+        }
+        if (code == -1) {
+          // no Baudot equivalent
+          continue;
+        }
+
+        if (character_set != shift) {
+          *out++ = character_set = shift;
+        }
+        *out++ = code;
+      }
+      return out - out_start;
+    }
+
+    int baudot_encoder::state() const
+    {
+      return character_set;
+    }
+
+    void baudot_encoder::set_state(int state)
+    {
+      character_set = state;
+    }
+
+    void baudot_encoder::reset()
+    {
+      character_set = baudot_decoder::LETTERS;
+    }
+
+    const int varicode_decoder::NONE;
+    const int varicode_decoder::INVALID;
+
+    varicode_decoder::varicode_decoder()
+    {
+      reset();
+    }
+
+    int varicode_decoder::decode_bit(unsigned char bit)
+    {
+      /* shift the bit into state */
+      bits <<= 1;
+      bits += (bit & 1);
+
+      if (bits == 0)
+      {
+        /* can't be done with a character if there are no 1 bits. */
+        return NONE;
+      }
+
+      if ((bits >> 3) >= sizeof(varicodes) / sizeof(varicodes[0]))
+      {
+        // garbage character -- no valid varicodes this big.
+        reset();
+        return INVALID;
+      }
+
+      if (bits & 3)
+      {
+        /* can't be done with a character if the last two bits weren't zeros */
+        return NONE;
+      }
+
+      const char result = varicodes[bits >> 3];
+      reset();
+      return result == '\xff' ? INVALID : result;
+    }
+
+    size_t varicode_decoder::decode(
+      const char *in, size_t in_len, char *out, size_t out_len)
+    {
+      check_room(out_len, in_len / 3 + 1);
+
+      char *const out_start = out;
+      for (size_t i = 0; i < in_len; i++) {
+        const int decoded = decode_bit(in[i]);
+        if (decoded >= 0) {
+          *out++ = decoded;
+        }
+      }
+      return out - out_start;
+    }
+
+    unsigned int varicode_decoder::state() const
+    {
+      return bits;
+    }
+
+    void varicode_decoder::set_state(unsigned int state)
+    {
+      bits = state;
+    }
+
+    void varicode_decoder::reset()
+    {
+      bits = 0;
+    }
+
+    const size_t varicode_encoder::MAX_BITS;
+
+    unsigned int varicode_encoder::code(unsigned char c)
+    {
+      if (c < sizeof(ascii_to_varicode) / sizeof(ascii_to_varicode[0])) {
+        return ascii_to_varicode[c];
+      }
+      return 0;
+    }
+
+    size_t varicode_encoder::encode(
+      const char *in, size_t in_len, char *out, size_t out_len)
+    {
+      check_room(out_len, MAX_BITS * in_len);
+
+      char *const out_start = out;
+      for (size_t i = 0; i < in_len; i++) {
+        for (unsigned int bits = code(in[i]); bits; bits >>= 1) {
+          *out++ = bits & 1;
+        }
+        if (code(in[i])) {
+          *out++ = 0;
+          *out++ = 0;
+        }
+      }
+      return out - out_start;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
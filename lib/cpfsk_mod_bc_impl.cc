@@ -0,0 +1,150 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/io_signature.h>
+#include <gnuradio/fxpt.h>
+#include <gnuradio/math.h>
+#include <cmath>
+#include <stdexcept>
+#include "cpfsk_mod_bc_impl.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    static void check_transition(double transition)
+    {
+      if (transition < 0 || transition > 1) {
+        throw std::invalid_argument(
+          "cpfsk_mod_bc: transition must be between 0 and 1");
+      }
+    }
+
+    cpfsk_mod_bc::sptr cpfsk_mod_bc::make(
+        int samp_per_bit, double samp_rate, double spacing, double transition)
+    {
+      return gnuradio::get_initial_sptr
+        (new cpfsk_mod_bc_impl(samp_per_bit, samp_rate, spacing, transition));
+    }
+
+    cpfsk_mod_bc_impl::cpfsk_mod_bc_impl(
+        int samp_per_bit, double samp_rate, double spacing, double transition)
+      : gr::sync_interpolator("cpfsk_mod_bc",
+              gr::io_signature::make(1, 1, sizeof(char)),
+              gr::io_signature::make(1, 1, sizeof(gr_complex)),
+              samp_per_bit),
+        samp_per_bit(samp_per_bit),
+        sample_rate(samp_rate),
+        shift(spacing),
+        transition_bits(transition),
+        phase(0),
+        last_bit(1)
+    {
+      if (samp_per_bit < 1) {
+        throw std::invalid_argument(
+          "cpfsk_mod_bc: samp_per_bit must be positive");
+      }
+      check_transition(transition);
+      compute_trajectories();
+    }
+
+    cpfsk_mod_bc_impl::~cpfsk_mod_bc_impl() {}
+
+    void cpfsk_mod_bc_impl::compute_trajectories()
+    {
+      const double freq[2] = {-shift, 0};
+      const double transition_samples = transition_bits * samp_per_bit;
+
+      for (int previous = 0; previous < 2; previous++) {
+        for (int bit = 0; bit < 2; bit++) {
+          std::vector<uint32_t> &trajectory = trajectories[previous * 2 + bit];
+          trajectory.resize(samp_per_bit);
+
+          for (int i = 0; i < samp_per_bit; i++) {
+            double f = freq[bit];
+            if (i + 1 < transition_samples) {
+              double x = (i + 1) / transition_samples;
+              f = freq[previous] +
+                  (freq[bit] - freq[previous]) * (1 - std::cos(GR_M_PI * x)) / 2;
+            }
+            // fxpt represents -pi to pi as the full range of an int32
+            trajectory[i] = static_cast<uint32_t>(
+              gr::fxpt::float_to_fixed(2 * GR_M_PI * f / sample_rate));
+          }
+        }
+      }
+    }
+
+    void cpfsk_mod_bc_impl::set_samp_rate(double samp_rate)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      sample_rate = samp_rate;
+      compute_trajectories();
+    }
+
+    void cpfsk_mod_bc_impl::set_spacing(double spacing)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      shift = spacing;
+      compute_trajectories();
+    }
+
+    void cpfsk_mod_bc_impl::set_transition(double transition)
+    {
+      check_transition(transition);
+      gr::thread::scoped_lock guard(d_setlock);
+      transition_bits = transition;
+      compute_trajectories();
+    }
+
+    int cpfsk_mod_bc_impl::work(
+        int noutput_items,
+        gr_vector_const_void_star &input_items,
+        gr_vector_void_star &output_items)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+
+      const char *in = (const char *) input_items[0];
+      gr_complex *out = (gr_complex *) output_items[0];
+
+      const int nbits = noutput_items / samp_per_bit;
+      float s, c;
+
+      for (int i = 0; i < nbits; i++) {
+        const int bit = in[i] ? 1 : 0;
+        const uint32_t *increment = &trajectories[last_bit * 2 + bit][0];
+
+        for (int j = 0; j < samp_per_bit; j++) {
+          phase += increment[j];
+          gr::fxpt::sincos(static_cast<gr_int32>(phase), &s, &c);
+          *out++ = gr_complex(c, s);
+        }
+
+        last_bit = bit;
+      }
+
+      return nbits * samp_per_bit;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
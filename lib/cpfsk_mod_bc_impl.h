@@ -0,0 +1,71 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+
+#ifndef INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_IMPL_H
+#define INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_IMPL_H
+
+#include <radioteletype/cpfsk_mod_bc.h>
+#include <stdint.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    class cpfsk_mod_bc_impl : public cpfsk_mod_bc
+    {
+     private:
+      int samp_per_bit;
+      double sample_rate;
+      double shift;
+      double transition_bits;
+
+      // Phase increment for each sample of a bit, indexed by the previous
+      // bit times two plus this bit. Phase is in units of 2^-32 cycles.
+      std::vector<uint32_t> trajectories[4];
+
+      uint32_t phase;
+      int last_bit;
+
+      void compute_trajectories();
+
+     public:
+      cpfsk_mod_bc_impl(int samp_per_bit, double samp_rate, double spacing,
+                        double transition);
+      ~cpfsk_mod_bc_impl();
+
+      double samp_rate() const { return sample_rate; }
+      void set_samp_rate(double samp_rate);
+
+      double spacing() const { return shift; }
+      void set_spacing(double spacing);
+
+      double transition() const { return transition_bits; }
+      void set_transition(double transition);
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_CPFSK_MOD_BC_IMPL_H */
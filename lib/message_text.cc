@@ -0,0 +1,51 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "message_text.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    bool message_text(const pmt::pmt_t &msg, std::string &text)
+    {
+      text.clear();
+
+      pmt::pmt_t data = pmt::is_pair(msg) ? pmt::cdr(msg) : msg;
+      if (pmt::is_u8vector(data))
+      {
+        size_t len;
+        const uint8_t *bytes = pmt::u8vector_elements(data, len);
+        text.assign(bytes, bytes + len);
+        return true;
+      }
+      if (pmt::is_symbol(data))
+      {
+        text = pmt::symbol_to_string(data);
+        return true;
+      }
+      return false;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
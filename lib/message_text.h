@@ -0,0 +1,42 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_MESSAGE_TEXT_H
+#define INCLUDED_RADIOTELETYPE_MESSAGE_TEXT_H
+
+#include <pmt/pmt.h>
+#include <string>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*
+     * Extract the text from a message sent to an encoder's "text" port.
+     *
+     * The message may be a PDU with a u8vector of ASCII, like those the
+     * decoders publish, a bare u8vector, or a symbol. Returns false for
+     * anything else, leaving text empty.
+     */
+    bool message_text(const pmt::pmt_t &msg, std::string &text);
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_MESSAGE_TEXT_H */
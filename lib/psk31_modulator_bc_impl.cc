@@ -0,0 +1,129 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/io_signature.h>
+#include <gnuradio/fxpt.h>
+#include <gnuradio/math.h>
+#include <cmath>
+#include <stdexcept>
+#include "psk31_modulator_bc_impl.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    psk31_modulator_bc::sptr psk31_modulator_bc::make(
+        int samp_per_sym, double phase_inc)
+    {
+      return gnuradio::get_initial_sptr
+        (new psk31_modulator_bc_impl(samp_per_sym, phase_inc));
+    }
+
+    psk31_modulator_bc_impl::psk31_modulator_bc_impl(
+        int samp_per_sym, double phase_inc)
+      : gr::sync_interpolator("psk31_modulator_bc",
+              gr::io_signature::make(1, 1, sizeof(char)),
+              gr::io_signature::make(1, 1, sizeof(gr_complex)),
+              samp_per_sym),
+        samp_per_sym(samp_per_sym),
+        last_phase(0),
+        phase(0)
+    {
+      if (samp_per_sym < 1) {
+        throw std::invalid_argument(
+          "psk31_modulator_bc: samp_per_sym must be positive");
+      }
+
+      for (int i = 0; i < 3; i++) {
+        waveforms[i].resize(samp_per_sym);
+      }
+      for (int j = 0; j < samp_per_sym; j++) {
+        // The Hann window is (1 - cos) / 2 over two symbols. The first half
+        // shapes the rise of this symbol, and the second half the fall of
+        // the previous one.
+        const float rise = (1 - std::cos(GR_M_PI * j / samp_per_sym)) / 2;
+        const float fall = (1 - std::cos(
+          GR_M_PI * (j + samp_per_sym) / samp_per_sym)) / 2;
+        waveforms[0][j] = rise - fall;
+        waveforms[1][j] = rise;
+        waveforms[2][j] = rise + fall;
+      }
+
+      set_phase_inc(phase_inc);
+    }
+
+    psk31_modulator_bc_impl::~psk31_modulator_bc_impl() {}
+
+    void psk31_modulator_bc_impl::set_phase_inc(double phase_inc)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      carrier = phase_inc;
+      // fxpt represents -pi to pi as the full range of an int32
+      phase_increment = static_cast<uint32_t>(
+        gr::fxpt::float_to_fixed(phase_inc));
+    }
+
+    int psk31_modulator_bc_impl::work(
+        int noutput_items,
+        gr_vector_const_void_star &input_items,
+        gr_vector_void_star &output_items)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+
+      const char *in = (const char *) input_items[0];
+      gr_complex *out = (gr_complex *) output_items[0];
+
+      const int nsyms = noutput_items / samp_per_sym;
+      float s, c;
+
+      for (int i = 0; i < nsyms; i++) {
+        // PSK31 defines 0 as a phase change. Before the first symbol the
+        // phase is taken to be negative, so a first 0 starts positive.
+        int this_phase = last_phase ? last_phase : -1;
+        if ((in[i] & 1) == 0) {
+          this_phase = -this_phase;
+        }
+
+        const float *waveform = &waveforms[last_phase * this_phase + 1][0];
+        const float sign = this_phase;
+        last_phase = this_phase;
+
+        if (phase_increment == 0) {
+          for (int j = 0; j < samp_per_sym; j++) {
+            *out++ = gr_complex(sign * waveform[j], 0);
+          }
+        }
+        else {
+          for (int j = 0; j < samp_per_sym; j++) {
+            gr::fxpt::sincos(static_cast<gr_int32>(phase), &s, &c);
+            phase += phase_increment;
+            *out++ = sign * waveform[j] * gr_complex(c, s);
+          }
+        }
+      }
+
+      return nsyms * samp_per_sym;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
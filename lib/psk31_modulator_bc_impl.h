@@ -0,0 +1,64 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_IMPL_H
+#define INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_IMPL_H
+
+#include <radioteletype/psk31_modulator_bc.h>
+#include <stdint.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    class psk31_modulator_bc_impl : public psk31_modulator_bc
+    {
+     private:
+      int samp_per_sym;
+      double carrier;
+
+      // The envelope of a symbol of positive phase, indexed by the previous
+      // symbol's phase times this one's, plus one: a reversal, the first
+      // symbol, or steady carrier.
+      std::vector<float> waveforms[3];
+
+      // phase of the last symbol: -1, 1, or 0 before the first
+      int last_phase;
+
+      // Phase of the carrier, in units of 2^-32 cycles.
+      uint32_t phase;
+      uint32_t phase_increment;
+
+     public:
+      psk31_modulator_bc_impl(int samp_per_sym, double phase_inc);
+      ~psk31_modulator_bc_impl();
+
+      double phase_inc() const { return carrier; }
+      void set_phase_inc(double phase_inc);
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_PSK31_MODULATOR_BC_IMPL_H */
@@ -0,0 +1,137 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/io_signature.h>
+#include <gnuradio/fxpt.h>
+#include <gnuradio/math.h>
+#include <stdexcept>
+#include "sliding_dft_cf_impl.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    sliding_dft_cf::sptr sliding_dft_cf::make(
+        int decim, double center_freq, double sample_rate, int length)
+    {
+      return gnuradio::get_initial_sptr
+        (new sliding_dft_cf_impl(decim, center_freq, sample_rate, length));
+    }
+
+    sliding_dft_cf_impl::sliding_dft_cf_impl(
+        int decim, double center_freq, double sample_rate, int length)
+      : gr::sync_decimator("sliding_dft_cf",
+              gr::io_signature::make(1, 1, sizeof(gr_complex)),
+              gr::io_signature::make2(1, 2, sizeof(float), sizeof(gr_complex)),
+              decim),
+        frequency(center_freq),
+        samp_rate(sample_rate),
+        position(0),
+        sum(0, 0),
+        partial(0, 0),
+        phase(0)
+    {
+      if (decim < 1) {
+        throw std::invalid_argument(
+          "sliding_dft_cf: decim must be positive");
+      }
+      if (length < 1) {
+        throw std::invalid_argument(
+          "sliding_dft_cf: length must be positive");
+      }
+      window.assign(length, gr_complex(0, 0));
+      compute_phase_increment();
+    }
+
+    sliding_dft_cf_impl::~sliding_dft_cf_impl() {}
+
+    void sliding_dft_cf_impl::compute_phase_increment()
+    {
+      // fxpt represents -pi to pi as the full range of an int32
+      phase_increment = static_cast<uint32_t>(
+        gr::fxpt::float_to_fixed(2 * GR_M_PI * -frequency / samp_rate));
+    }
+
+    void sliding_dft_cf_impl::set_center_freq(double center_freq)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      frequency = center_freq;
+      compute_phase_increment();
+    }
+
+    void sliding_dft_cf_impl::set_sample_rate(double sample_rate)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+      samp_rate = sample_rate;
+      compute_phase_increment();
+    }
+
+    int sliding_dft_cf_impl::work(
+        int noutput_items,
+        gr_vector_const_void_star &input_items,
+        gr_vector_void_star &output_items)
+    {
+      gr::thread::scoped_lock guard(d_setlock);
+
+      const gr_complex *in = (const gr_complex *) input_items[0];
+      float *out = (float *) output_items[0];
+      gr_complex *baseband = NULL;
+      if (output_items.size() > 1) {
+        baseband = (gr_complex *) output_items[1];
+      }
+
+      const int decim = decimation();
+      const int n = window.size();
+      const float scale = 1.0f / n;
+      float s, c;
+
+      for (int i = 0; i < noutput_items; i++) {
+        for (int j = 0; j < decim; j++) {
+          gr::fxpt::sincos(static_cast<gr_int32>(phase), &s, &c);
+          phase += phase_increment;
+          const gr_complex mixed = *in++ * gr_complex(c, s);
+
+          sum += mixed - window[position];
+          partial += mixed;
+          window[position] = mixed;
+
+          if (++position == n) {
+            // partial is now the sum of exactly the samples in the window
+            position = 0;
+            sum = partial;
+            partial = gr_complex(0, 0);
+          }
+        }
+
+        const gr_complex mean = sum * scale;
+        out[i] = std::norm(mean);
+        if (baseband) {
+          baseband[i] = mean;
+        }
+      }
+
+      return noutput_items;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
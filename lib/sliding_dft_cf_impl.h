@@ -0,0 +1,71 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_IMPL_H
+#define INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_IMPL_H
+
+#include <radioteletype/sliding_dft_cf.h>
+#include <stdint.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    class sliding_dft_cf_impl : public sliding_dft_cf
+    {
+     private:
+      double frequency;
+      double samp_rate;
+
+      // The last length mixed samples, oldest at position.
+      std::vector<gr_complex> window;
+      int position;
+      // The sum of the window, and of the samples since position was 0.
+      gr_complex sum;
+      gr_complex partial;
+
+      // Phase of the oscillator, in units of 2^-32 cycles.
+      uint32_t phase;
+      uint32_t phase_increment;
+
+      void compute_phase_increment();
+
+     public:
+      sliding_dft_cf_impl(int decim, double center_freq, double sample_rate,
+                          int length);
+      ~sliding_dft_cf_impl();
+
+      double center_freq() const { return frequency; }
+      void set_center_freq(double center_freq);
+
+      double sample_rate() const { return samp_rate; }
+      void set_sample_rate(double sample_rate);
+
+      int length() const { return window.size(); }
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_SLIDING_DFT_CF_IMPL_H */
@@ -0,0 +1,138 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <algorithm>
+#include <cmath>
+#include "tag_forwarder.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    static const pmt::pmt_t RX_TIME = pmt::mp("rx_time");
+
+    tag_forwarder::tag_forwarder(double item_rate)
+      : next(0),
+        item_rate(item_rate),
+        have_time(false),
+        time_offset(0),
+        time_secs(0),
+        time_frac(0),
+        last(pmt::PMT_NIL)
+    {
+    }
+
+    void tag_forwarder::begin(gr::block *block, uint64_t start, uint64_t end)
+    {
+      window.clear();
+      next = 0;
+      block->get_tags_in_range(window, 0, start, end);
+      std::sort(window.begin(), window.end(), tag_t::offset_compare);
+    }
+
+    void tag_forwarder::absorb(uint64_t end)
+    {
+      for (; next < window.size() && window[next].offset < end; next++)
+      {
+        const tag_t &tag = window[next];
+
+        if (item_rate > 0 && pmt::eqv(tag.key, RX_TIME))
+        {
+          have_time = true;
+          time_offset = tag.offset;
+          time_secs = pmt::to_uint64(pmt::tuple_ref(tag.value, 0));
+          time_frac = pmt::to_double(pmt::tuple_ref(tag.value, 1));
+          continue;
+        }
+
+        bool replaced = false;
+        for (std::vector<tag_t>::iterator i = pending.begin(); i != pending.end(); i++)
+        {
+          if (pmt::eqv(i->key, tag.key))
+          {
+            *i = tag;
+            replaced = true;
+            break;
+          }
+        }
+        if (!replaced)
+        {
+          pending.push_back(tag);
+        }
+      }
+    }
+
+    void tag_forwarder::emit(gr::block *block, uint64_t out_offset,
+        uint64_t through, uint64_t time_offset_in)
+    {
+      absorb(through + 1);
+
+      last = pmt::PMT_NIL;
+      for (std::vector<tag_t>::iterator i = pending.begin(); i != pending.end(); i++)
+      {
+        if (block)
+        {
+          block->add_item_tag(0, out_offset, i->key, i->value, i->srcid);
+        }
+        if (pmt::eqv(i->key, RX_TIME))
+        {
+          last = i->value;
+        }
+      }
+      placed_tags.swap(pending);
+      pending.clear();
+
+      if (item_rate > 0 && have_time)
+      {
+        double frac = time_frac
+          + ((double) time_offset_in - (double) time_offset) / item_rate;
+        double whole = std::floor(frac);
+        last = pmt::make_tuple(
+          pmt::from_uint64(time_secs + (int64_t) whole),
+          pmt::from_double(frac - whole));
+        if (block)
+        {
+          block->add_item_tag(0, out_offset, RX_TIME, last);
+        }
+      }
+    }
+
+    bool tag_forwarder::placed(const pmt::pmt_t &key) const
+    {
+      for (std::vector<tag_t>::const_iterator i = placed_tags.begin(); i != placed_tags.end(); i++)
+      {
+        if (pmt::eqv(i->key, key))
+        {
+          return true;
+        }
+      }
+      return false;
+    }
+
+    void tag_forwarder::finish(uint64_t end)
+    {
+      absorb(end);
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
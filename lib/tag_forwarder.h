@@ -0,0 +1,97 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_TAG_FORWARDER_H
+#define INCLUDED_RADIOTELETYPE_TAG_FORWARDER_H
+
+#include <gnuradio/block.h>
+#include <gnuradio/tags.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*
+     * Moves stream tags from the input of a decoder to the output item
+     * decoded from the tagged input.
+     *
+     * GNU Radio's default tag propagation scales offsets by relative_rate(),
+     * which puts tags on the wrong character when the output rate varies
+     * with the input, as it does in every decoder. Blocks using this set
+     * TPP_DONT, call begin() at the start of general_work(), emit() for
+     * each output item, and finish() with the end of what they consumed.
+     *
+     * Tags are placed on the first output item decoded from input at or
+     * after the tag. When several tags with the same key are waiting for an
+     * output item, only the latest is kept.
+     *
+     * If an item rate is set, an "rx_time" tag is not forwarded but taken as
+     * a reference, and each output item gets an "rx_time" computed for the
+     * input item it started at. An item rate of 0 forwards "rx_time" like
+     * any other tag.
+     */
+    class tag_forwarder
+    {
+      private:
+        std::vector<tag_t> window;
+        std::vector<tag_t>::size_type next;
+        std::vector<tag_t> pending;
+        std::vector<tag_t> placed_tags;
+
+        double item_rate;
+        bool have_time;
+        uint64_t time_offset;
+        uint64_t time_secs;
+        double time_frac;
+        pmt::pmt_t last;
+
+        void absorb(uint64_t end);
+
+      public:
+        tag_forwarder(double item_rate);
+
+        void set_item_rate(double rate) { item_rate = rate; }
+        double get_item_rate() const { return item_rate; }
+
+        // Fetch the tags on input items [start, end) of port 0.
+        void begin(gr::block *block, uint64_t start, uint64_t end);
+
+        // Place tags on input items up to and including through on output
+        // item out_offset. time_offset is the input item the output started
+        // at, for the computed "rx_time". If block is NULL, the tags are
+        // dropped but last_time() is still updated.
+        void emit(gr::block *block, uint64_t out_offset, uint64_t through,
+            uint64_t time_offset);
+
+        // Hold tags on consumed input items before end for the next output.
+        void finish(uint64_t end);
+
+        // The "rx_time" placed by the last emit(), or PMT_NIL if none.
+        pmt::pmt_t last_time() const { return last; }
+
+        // True if the last emit() placed, or would have placed, a tag with
+        // this key.
+        bool placed(const pmt::pmt_t &key) const;
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_TAG_FORWARDER_H */
@@ -0,0 +1,90 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "text_pdu_batcher.h"
+
+namespace gr {
+  namespace radioteletype {
+
+    text_pdu_batcher::text_pdu_batcher(unsigned int max_length, int idle_timeout)
+      : start_offset(0),
+        start_time(pmt::PMT_NIL),
+        last_offset(0),
+        errors(0),
+        max_length(max_length),
+        timeout(idle_timeout),
+        have_freq(false),
+        freq(0)
+    {
+      text.reserve(max_length);
+    }
+
+    void text_pdu_batcher::set_center_freq(double center_freq)
+    {
+      have_freq = true;
+      freq = center_freq;
+    }
+
+    bool text_pdu_batcher::add_char(char c, uint64_t start, uint64_t end,
+                                    const pmt::pmt_t &time)
+    {
+      if (text.empty())
+      {
+        start_offset = start;
+        start_time = time;
+      }
+      last_offset = end;
+      text.push_back(c);
+
+      return c == '\n' || text.size() >= max_length;
+    }
+
+    bool text_pdu_batcher::idle(uint64_t offset) const
+    {
+      return timeout > 0 && !text.empty() && offset - last_offset >= (uint64_t) timeout;
+    }
+
+    pmt::pmt_t text_pdu_batcher::make_pdu()
+    {
+      pmt::pmt_t meta = pmt::make_dict();
+      meta = pmt::dict_add(meta, pmt::mp("offset"), pmt::from_uint64(start_offset));
+      meta = pmt::dict_add(meta, pmt::mp("errors"), pmt::from_long(errors));
+      if (!pmt::is_null(start_time))
+      {
+        meta = pmt::dict_add(meta, pmt::mp("rx_time"), start_time);
+      }
+      if (have_freq)
+      {
+        meta = pmt::dict_add(meta, pmt::mp("freq"), pmt::from_double(freq));
+      }
+
+      pmt::pmt_t pdu = pmt::cons(meta, pmt::init_u8vector(text.size(), text));
+
+      text.clear();
+      errors = 0;
+      return pdu;
+    }
+
+  } /* namespace radioteletype */
+} /* namespace gr */
@@ -0,0 +1,85 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2017 Phil Frost.
+ *
+ * This is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * This software is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this software; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_RADIOTELETYPE_TEXT_PDU_BATCHER_H
+#define INCLUDED_RADIOTELETYPE_TEXT_PDU_BATCHER_H
+
+#include <pmt/pmt.h>
+#include <stdint.h>
+#include <vector>
+
+namespace gr {
+  namespace radioteletype {
+
+    /*
+     * Collects decoded characters into PDUs for a decoder's "pdus" message
+     * port, so receivers of decoded text are woken once per line rather than
+     * once per character.
+     *
+     * A batch is ready at the end of a line, when it reaches max_length, or
+     * when idle_timeout input items have passed since its last character.
+     * Offsets are absolute input item numbers, as from nitems_read().
+     */
+    class text_pdu_batcher
+    {
+      private:
+        std::vector<uint8_t> text;
+        uint64_t start_offset;
+        pmt::pmt_t start_time;
+        uint64_t last_offset;
+        int errors;
+        unsigned int max_length;
+        int timeout;
+        bool have_freq;
+        double freq;
+
+      public:
+        text_pdu_batcher(unsigned int max_length, int idle_timeout);
+
+        void set_idle_timeout(int items) { timeout = items; }
+        int idle_timeout() const { return timeout; }
+
+        void set_center_freq(double center_freq);
+        double center_freq() const { return freq; }
+
+        bool empty() const { return text.empty(); }
+
+        // Add a character decoded from the input items start to end,
+        // inclusive. time is the character's "rx_time" tag, or PMT_NIL.
+        // Returns true if this completes a batch.
+        bool add_char(char c, uint64_t start, uint64_t end,
+                      const pmt::pmt_t &time);
+
+        // Count a decoding error against the current batch.
+        void add_error() { errors += 1; }
+
+        // True if there is text and nothing has been added to it for
+        // idle_timeout items before offset. An idle timeout of 0 disables
+        // this.
+        bool idle(uint64_t offset) const;
+
+        // Return the batched text as a PDU and start a new batch.
+        pmt::pmt_t make_pdu();
+    };
+
+  } // namespace radioteletype
+} // namespace gr
+
+#endif /* INCLUDED_RADIOTELETYPE_TEXT_PDU_BATCHER_H */
@@ -23,64 +23,25 @@
 #endif
 
 #include <gnuradio/io_signature.h>
+#ifdef GR_CTRLPORT
+#include <gnuradio/rpcregisterhelpers.h>
+#endif
 #include "varicode_decode_bb_impl.h"
 
 namespace gr {
   namespace radioteletype {
-    const char varicode_decode_bb_impl::varicodes[512] = {
-      ' ', 'e', 't', 'o', '\xff', 'a', 'i', 'n', '\xff', '\xff', 'r', 's',
-      '\xff', 'l', '\n', '\r', '\xff', '\xff', '\xff', '\xff', '\xff', 'h', 'd',
-      'c', '\xff', '\xff', '-', 'u', '\xff', 'm', 'f', 'p', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '=', '.',
-      '\xff', 'g', 'y', 'b', '\xff', '\xff', '\xff', '\xff', '\xff', 'w', 'T',
-      'S', '\xff', '\xff', ',', 'E', '\xff', 'v', 'A', 'I', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', 'O', 'C', 'R', '\xff', '\xff', 'D', '0', '\xff', 'M', '1', 'k',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', 'P', 'L', '\xff', 'F', 'N', 'x', '\xff', '\xff', '\xff', '\xff',
-      '\xff', 'B', '2', '\t', '\xff', '\xff', ':', ')', '\xff', '(', 'G', '3',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', 'H', 'U', '\xff', '5',
-      'W', '"', '\xff', '\xff', '\xff', '\xff', '\xff', '6', '_', '*', '\xff',
-      '\xff', 'X', '4', '\xff', 'Y', 'K', '\'', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '8', '7',
-      '/', '\xff', '\xff', 'V', '9', '\xff', '|', ';', 'q', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', 'z', '>',
-      '\xff', '$', 'Q', '+', '\xff', '\xff', '\xff', '\xff', '\xff', 'j', '<',
-      '\\', '\xff', '\xff', '#', '[', '\xff', ']', 'J', '!', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\x00', 'Z', '?', '\xff', '\xff', '}', '{', '\xff', '&',
-      '@', '^', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '%', '~', '\xff', '\x01', '\x0c', '`', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\x04', '\x02', '\x06', '\xff', '\xff', '\x11',
-      '\x10', '\xff', '\x1e', '\x07', '\x08', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\x1b', '\x17', '\xff', '\x14', '\x1c', '\x05', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\x15', '\x16', '\x0b', '\xff', '\xff',
-      '\x0e', '\x03', '\xff', '\x18', '\x19', '\x1f', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\x0f', '\x12', '\x13', '\xff', '\xff', '\x7f', '\x1a', '\xff', '\x1d',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff',
-      '\xff', '\xff', '\xff', '\xff', '\xff', '\xff', '\xff'};
+
+    // Longest line published as one PDU.
+    static const unsigned int MAX_PDU_LENGTH = 128;
+
+    // About two seconds at 31.25 baud.
+    static const int DEFAULT_IDLE_TIMEOUT = 64;
+
+    // Output buffer limit in low latency mode, in items. GNU Radio rounds
+    // it up to a whole page.
+    static const long LOW_LATENCY_BUFFER = 256;
+
+    static const double PSK31_BIT_RATE = 31.25;
 
     varicode_decode_bb::sptr
     varicode_decode_bb::make()
@@ -91,21 +52,75 @@ namespace gr {
     varicode_decode_bb_impl::varicode_decode_bb_impl()
       : gr::block("varicode_decode_bb",
 		      gr::io_signature::make(1, 1, sizeof (char)),
-		      gr::io_signature::make(1, 1, sizeof (char)))
+		      gr::io_signature::make(0, 1, sizeof (char))),
+        batcher(MAX_PDU_LENGTH, DEFAULT_IDLE_TIMEOUT),
+        tags(PSK31_BIT_RATE),
+        char_start(0),
+        low_latency_mode(false)
     {
-      reset();
+      reset_counters();
+      set_tag_propagation_policy(TPP_DONT);
+
+      message_port_register_out(pmt::mp("pdus"));
+      message_port_register_in(pmt::mp("flush"));
+      set_msg_handler(pmt::mp("flush"),
+        boost::bind(&varicode_decode_bb_impl::handle_flush, this, _1));
     }
 
     varicode_decode_bb_impl::~varicode_decode_bb_impl()
     {
     }
 
+    void varicode_decode_bb_impl::reset_counters()
+    {
+      chars_decoded_count = 0;
+      invalid_codes_count = 0;
+    }
+
+    void varicode_decode_bb_impl::set_low_latency(bool low_latency)
+    {
+      low_latency_mode = low_latency;
+      if (low_latency)
+      {
+        set_max_noutput_items(1);
+        set_max_output_buffer(LOW_LATENCY_BUFFER);
+      }
+      else
+      {
+        unset_max_noutput_items();
+        // GNU Radio's default, no limit
+        set_max_output_buffer(-1);
+      }
+    }
+
+    void varicode_decode_bb_impl::setup_rpc()
+    {
+#ifdef GR_CTRLPORT
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<varicode_decode_bb, int>(
+          alias(), "chars_decoded",
+          &varicode_decode_bb::chars_decoded,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "chars", "Characters decoded", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<varicode_decode_bb, int>(
+          alias(), "invalid_codes",
+          &varicode_decode_bb::invalid_codes,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "codes", "Invalid varicodes", RPC_PRIVLVL_MIN,
+          DISPTIME | DISPOPTSTRIP)));
+#endif /* GR_CTRLPORT */
+    }
+
     void
     varicode_decode_bb_impl::forecast (int noutput_items, gr_vector_int &ninput_items_required)
     {
       /* This could be bigger, but then GNU Radio will let input accumulate in
        * the previous block's output buffer before calling general_work(). This
-       * doesn't work very well for a real-time chat protocol. */
+       * doesn't work very well for a real-time chat protocol. Low latency
+       * mode further limits noutput_items to 1, so any input will do. */
       ninput_items_required[0] = noutput_items;
     }
 
@@ -116,59 +131,74 @@ namespace gr {
                        gr_vector_void_star &output_items)
     {
       const char *in = (const char *) input_items[0];
-      char *out = (char *) output_items[0];
+      // the output stream is optional when only PDUs are wanted
+      char *out = output_items.empty() ? NULL : (char *) output_items[0];
 
       const char *const in_start = in;
-      const char *const out_start = out;
+      const uint64_t offset = nitems_read(0);
+      const uint64_t out_offset = out ? nitems_written(0) : 0;
+      int produced = 0;
+
+      tags.begin(this, offset, offset + ninput_items[0]);
 
-      char last_char_decoded;
+      int last_char_decoded;
 
-      while( (out - out_start < noutput_items) &&
+      while( (produced < noutput_items) &&
              (in - in_start < ninput_items[0]))
       {
+        const uint64_t bit = offset + (in - in_start);
+        if (decoder.state() == 0 && (*in & 1)) {
+          // first bit of a character
+          char_start = bit;
+        }
+
         last_char_decoded = eat_bit(*in++);
-        if (last_char_decoded != -1) {
-          *out++ = last_char_decoded;
+        if (last_char_decoded >= 0) {
+          tags.emit(out ? this : NULL, out_offset + produced, bit, char_start);
+          if (out) {
+            out[produced++] = last_char_decoded;
+          }
+          chars_decoded_count += 1;
+
+          if (batcher.add_char(last_char_decoded, char_start, bit,
+                               tags.last_time()) ||
+              low_latency_mode) {
+            publish();
+          }
         }
       }
 
+      tags.finish(offset + (in - in_start));
+
+      if (batcher.idle(offset + (in - in_start))) {
+        publish();
+      }
+
       consume_each (in - in_start);
-      return out - out_start;
+      return produced;
     }
 
-    void varicode_decode_bb_impl::reset()
+    void varicode_decode_bb_impl::publish()
     {
-      state = 0;
+      message_port_pub(pmt::mp("pdus"), batcher.make_pdu());
     }
 
-    char
-    varicode_decode_bb_impl::eat_bit(char bit)
+    void varicode_decode_bb_impl::handle_flush(pmt::pmt_t msg)
     {
-      /* shift the bit into state */
-      state <<= 1;
-      state += (bit & 1);
-
-      if (state == 0)
-      {
-        /* can't be done with a character if there are no 1 bits. */
-        return -1;
-      }
-
-      if ((state >> 3) >= sizeof(varicodes) / sizeof(varicodes[0]))
-      {
-        // garbage character -- no valid varicodes this big.
-        reset();
-        return -1;
+      if (!batcher.empty()) {
+        publish();
       }
+    }
 
-      if (state & 3)
+    int
+    varicode_decode_bb_impl::eat_bit(char bit)
+    {
+      const int result = decoder.decode_bit(bit);
+      if (result == varicode_decoder::INVALID)
       {
-        /* can't be done with a character if the last two bits weren't zeros */
-        return -1;
+        invalid_codes_count += 1;
+        batcher.add_error();
       }
-
-      char result = varicodes[state >> 3];
-      reset();
       return result;
     }
 
@@ -22,6 +22,9 @@
 #define INCLUDED_RADIOTELETYPE_VARICODE_DECODE_BB_IMPL_H
 
 #include <radioteletype/varicode_decode_bb.h>
+#include <radioteletype/codecs.h>
+#include "tag_forwarder.h"
+#include "text_pdu_batcher.h"
 
 namespace gr {
   namespace radioteletype {
@@ -29,14 +32,36 @@ namespace gr {
     class varicode_decode_bb_impl : public varicode_decode_bb
     {
     private:
-      unsigned int state;
-      char eat_bit(char bit);
-      void reset();
+      varicode_decoder decoder;
+      int chars_decoded_count;
+      int invalid_codes_count;
+      text_pdu_batcher batcher;
+      tag_forwarder tags;
+      uint64_t char_start;
+      bool low_latency_mode;
+      int eat_bit(char bit);
+      void publish();
+      void handle_flush(pmt::pmt_t msg);
 
     public:
       varicode_decode_bb_impl();
       ~varicode_decode_bb_impl();
 
+      int chars_decoded() const { return chars_decoded_count; }
+      int invalid_codes() const { return invalid_codes_count; }
+      void reset_counters();
+      void setup_rpc();
+
+      void set_center_freq(double freq) { batcher.set_center_freq(freq); }
+      double center_freq() const { return batcher.center_freq(); }
+      void set_idle_timeout(int items) { batcher.set_idle_timeout(items); }
+      int idle_timeout() const { return batcher.idle_timeout(); }
+      void set_bit_rate(double bit_rate) { tags.set_item_rate(bit_rate); }
+      double bit_rate() const { return tags.get_item_rate(); }
+
+      void set_low_latency(bool low_latency);
+      bool low_latency() const { return low_latency_mode; }
+
       void forecast (int noutput_items, gr_vector_int &ninput_items_required);
 
       // Where all the action really happens
@@ -44,11 +69,6 @@ namespace gr {
 		       gr_vector_int &ninput_items,
 		       gr_vector_const_void_star &input_items,
 		       gr_vector_void_star &output_items);
-
-      /*
-       *  all varicode characters end with 1, so this table omits that.
-       */
-      static const char varicodes[512];
     };
 
   } // namespace radioteletype
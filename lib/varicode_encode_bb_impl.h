@@ -22,6 +22,8 @@
 #define INCLUDED_RADIOTELETYPE_VARICODE_ENCODE_BB_IMPL_H
 
 #include <radioteletype/varicode_encode_bb.h>
+#include <radioteletype/codecs.h>
+#include <deque>
 
 namespace gr {
   namespace radioteletype {
@@ -29,17 +31,35 @@ namespace gr {
     class varicode_encode_bb_impl : public varicode_encode_bb
     {
       private:
-        /* Character currently being sent. If 0, no character. */
-        unsigned int current_char;
+        /* Bits of the character currently being sent, from
+         * varicode_encoder, including the two 0 bits which end it. */
+        char bits[varicode_encoder::MAX_BITS];
+        size_t nbits;
+        size_t bits_sent;
 
-        /* Every varicode ends in two 0 bits. We need to send this many until
-         * ready for the next character. */
-        int zeros_to_send;
+        /* Text from the "text" port, not yet sent. */
+        std::deque<char> pending;
+
+        bool idle_fill;
+
+        int chars_encoded_count;
+        int chars_dropped_count;
+
+        void start_char(char c);
+        void handle_text(pmt::pmt_t msg);
 
       public:
-        varicode_encode_bb_impl();
+        varicode_encode_bb_impl(bool idle);
         ~varicode_encode_bb_impl();
 
+        bool idle() const { return idle_fill; }
+        void set_idle(bool idle) { idle_fill = idle; }
+
+        int chars_encoded() const { return chars_encoded_count; }
+        int chars_dropped() const { return chars_dropped_count; }
+        void reset_counters();
+        void setup_rpc();
+
         // Where all the action really happens
         void forecast (int noutput_items, gr_vector_int &ninput_items_required);
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+from cmath import exp
+from math import pi
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype import modulators, simulation
+from radioteletype.afc import fsk_afc_c
+from radioteletype.demodulators import rtty_demod_cb
+
+
+class qa_afc(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def _run_afc(self, mark, space, **kwargs):
+        offsets = []
+        afc = fsk_afc_c(1000, offsets.append, **kwargs)
+        self.tb.connect(blocks.vector_source_c(mark), (afc, 0))
+        self.tb.connect(blocks.vector_source_c(space), (afc, 1))
+        self.tb.run()
+        return afc, offsets
+
+    def test_estimate(self):
+        '''A tone 20 Hz high on one input moves the offset up.'''
+        tone = [exp(2j * pi * 20 * n / 1000) for n in range(250)]
+        afc, offsets = self._run_afc(
+            tone, [0] * 250, time_const=0.5, update_interval=0.25)
+        self.assertEqual(len(offsets), 1)
+        self.assertAlmostEqual(offsets[0], 10, places=3)
+        self.assertAlmostEqual(afc.get_offset(), 10, places=3)
+
+    def test_max_offset(self):
+        tone = [exp(-2j * pi * 200 * n / 1000) for n in range(250)]
+        afc, offsets = self._run_afc(
+            [0] * 250, tone, time_const=0.25, max_offset=50)
+        self.assertEqual(offsets, [-50])
+
+    def test_silence(self):
+        afc, offsets = self._run_afc([0] * 1000, [0] * 1000)
+        self.assertEqual(offsets, [])
+        self.assertEqual(afc.get_offset(), 0)
+
+    def test_rtty_tracks_drift(self):
+        '''rtty_demod_cb(afc=True) follows a signal 20 Hz off frequency.'''
+        samp_rate = 8000
+        baud = 45.45
+        samp_per_bit = 2 * int(round(samp_rate / baud / 2))
+        shift = 170
+        drift = 20
+
+        text = [ord(c) for c in 'RYRYRYRY ']
+        codes = simulation._run_bytes(modulators.baudot_encode_bb(), text)
+        bits = [1] * 40 + simulation.async_frame(codes, items_per_bit=2) * 20
+
+        # the modulator puts mark at 0 Hz and space at -shift
+        demod = rtty_demod_cb(
+            baud=samp_rate / samp_per_bit,
+            mark_freq=0,
+            space_freq=-shift,
+            samp_rate=samp_rate,
+            afc=True,
+            afc_time_const=1.0,
+        )
+        dst = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b(bits),
+            modulators.fm_fsk_mod_bc(samp_per_bit // 2, samp_rate, shift),
+            blocks.rotator_cc(2 * pi * drift / samp_rate),
+            demod,
+            dst,
+        )
+        for port in range(1, 4):
+            self.tb.connect((demod, port), blocks.null_sink(gr.sizeof_float))
+        self.tb.run()
+
+        self.assertLess(abs(demod.get_afc_offset() - drift), 5)
+        self.assertIn('RYRYRYRY', bytearray(dst.data()).decode('ascii'))
+
+    def test_manual_retune(self):
+        demod = rtty_demod_cb(samp_rate=8000, afc=True)
+        demod._afc.set_offset(30)
+        self.assertEqual(demod.get_afc_offset(), 30)
+        demod.set_mark_freq(2300)
+        self.assertEqual(demod.get_afc_offset(), 0)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_afc, "qa_afc.xml")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+import unittest
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype.demodulators import baudot_decode_bb
+from radioteletype.modulators import baudot_encode_bb
+
+try:
+    import asyncio
+    from radioteletype import aio
+except ImportError:
+    aio = None
+
+
+@unittest.skipIf(aio is None, 'asyncio requires Python 3')
+class qa_aio(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.tb = None
+        self.loop.close()
+
+    def _baudot(self, text):
+        sink = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b(list(map(ord, text))),
+            baudot_encode_bb(),
+            sink)
+        self.tb.run()
+        self.tb = gr.top_block()
+        return sink.data()
+
+    def _collect(self, stream):
+        items = []
+        while True:
+            try:
+                items.append(self.loop.run_until_complete(stream.__anext__()))
+            except StopAsyncIteration:
+                return items
+
+    def _decode(self, text, **kwargs):
+        flowgraph = aio.decoder(self.tb, self.loop)
+        decoder = baudot_decode_bb()
+        self.tb.connect(blocks.vector_source_b(self._baudot(text)), decoder)
+        stream = flowgraph.channel(decoder, **kwargs)
+        flowgraph.start()
+        items = self._collect(stream)
+        self.loop.run_until_complete(flowgraph.wait())
+        return items
+
+    def test_lines(self):
+        lines = self._decode('CQ CQ\nDE N0CALL\nK')
+        self.assertEqual(lines, ['CQ CQ\n', 'DE N0CALL\n', 'K'])
+
+    def test_batches(self):
+        batches = self._decode('RYRYRY', lines=False, maxsize=1)
+        self.assertEqual(''.join(batches), 'RYRYRY')
+
+    def test_stop(self):
+        flowgraph = aio.decoder(self.tb, self.loop)
+        decoder = baudot_decode_bb()
+        self.tb.connect(
+            blocks.vector_source_b(self._baudot('RY'), True), decoder)
+        stream = flowgraph.channel(decoder, lines=False, maxsize=1)
+        flowgraph.start()
+        first = self.loop.run_until_complete(stream.__anext__())
+        self.assertTrue(first)
+        # the queue is full and the sink waiting, until stopped
+        self.loop.run_until_complete(flowgraph.stop())
+
+
+if __name__ == "__main__":
+    gr_unittest.run(qa_aio, "qa_aio.xml")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+from __future__ import division
+
+from math import pi
+
+import numpy
+
+from gnuradio import gr, gr_unittest, blocks, filter
+
+from radioteletype import modulators
+
+
+class qa_am_fsk_mod_bc(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+        self.rng = numpy.random.RandomState(0)
+        self.bits = [int(b) for b in self.rng.randint(0, 2, 50)]
+
+    def tearDown(self):
+        self.tb = None
+
+    def _reference(self, samp_per_bit, samp_rate, spacing, taps):
+        '''Two filters and a rotator, as am_fsk_mod_bc once was.'''
+        tb = gr.top_block()
+        source = blocks.vector_source_b(self.bits)
+        to_float = blocks.char_to_float(1, 1)
+        mark_filter = filter.interp_fir_filter_fcc(samp_per_bit, taps)
+        space_filter = filter.interp_fir_filter_fcc(samp_per_bit, taps)
+        add = blocks.add_vcc(1)
+        sink = blocks.vector_sink_c()
+        tb.connect(source, to_float, mark_filter, add, sink)
+        tb.connect(
+            to_float,
+            blocks.multiply_const_vff((-1,)),
+            blocks.add_const_vff((1,)),
+            space_filter,
+            blocks.rotator_cc(2 * pi * -spacing / samp_rate),
+            (add, 1),
+        )
+        tb.run()
+        return sink.data()
+
+    def _modulate(self, modulator):
+        sink = blocks.vector_sink_c()
+        self.tb.connect(blocks.vector_source_b(self.bits), modulator, sink)
+        self.tb.run()
+        return sink.data()
+
+    def test_boxcar(self):
+        result = self._modulate(modulators.am_fsk_mod_bc(8, 1000, 170))
+        expected = self._reference(8, 1000, 170, [1] * 8)
+        self.assertComplexTuplesAlmostEqual(expected, result, 4)
+
+    def test_long_taps(self):
+        '''Taps spanning several bits overlap as they would in a filter.'''
+        taps = list(numpy.hanning(30) * numpy.exp(0.1j * numpy.arange(30)))
+        result = self._modulate(
+            modulators.am_fsk_mod_bc(8, 1000, 170, taps))
+        expected = self._reference(8, 1000, 170, taps)
+        self.assertComplexTuplesAlmostEqual(expected, result, 4)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_am_fsk_mod_bc, "qa_am_fsk_mod_bc.xml")
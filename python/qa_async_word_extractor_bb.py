@@ -21,9 +21,11 @@
 
 from __future__ import division
 
+import pmt
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks
 from radioteletype.demodulators import async_word_extractor_bb
+from radioteletype.modulators import async_framer_bb
 
 
 class qa_async_word_extractor_bb(gr_unittest.TestCase):
@@ -59,6 +61,79 @@ class qa_async_word_extractor_bb(gr_unittest.TestCase):
 
         self.assertEqual(result, (expected,))
 
+    def test_low_latency(self):
+        words = [3, 7, 12, 30]
+        src = blocks.vector_source_b(list(generate(
+            samples_per_bit=8, bits_per_word=5, words=words)))
+        extractor = async_word_extractor_bb(
+            bits_per_word=5,
+            sample_rate=8,
+            bit_rate=1)
+        extractor.set_low_latency(True)
+        self.assertTrue(extractor.low_latency())
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, extractor, dst)
+        self.tb.run()
+
+        self.assertEqual(dst.data(), tuple(words))
+
+    def test_tags(self):
+        idle = [1] * 4
+        first = list(generate(samples_per_bit=8, bits_per_word=5, words=[3]))
+        second = list(generate(samples_per_bit=8, bits_per_word=5, words=[7]))
+        src_data = idle + first + second
+
+        src = blocks.vector_source_b(src_data, False, 1, [
+            make_tag('rx_time', pmt.make_tuple(
+                pmt.from_uint64(10), pmt.from_double(0.5)), 0),
+            make_tag('test', pmt.from_long(1), 20),
+            make_tag('test', pmt.from_long(2), 30),
+        ])
+        extractor = async_word_extractor_bb(
+            bits_per_word=5,
+            sample_rate=8,
+            bit_rate=1)
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, extractor, dst)
+        self.tb.run()
+
+        self.assertEqual(dst.data(), (3, 7))
+        self.assertEqual(len(first), 60)
+        tags = sorted(
+            (tag.offset, pmt.symbol_to_string(tag.key),
+             pmt.to_python(tag.value))
+            for tag in dst.tags())
+        self.assertEqual(tags, [
+            # only the latest of two tags with the same key
+            (0, 'rx_time', (11, 0.0)),
+            (0, 'test', 2),
+            (1, 'rx_time', (18, 0.5)),
+        ])
+
+    def test_framing_error_tag(self):
+        '''A word with a space for its stop bit is tagged.'''
+        # start and data bits of 3, a space, then marks
+        bad = list(generate(samples_per_bit=8, bits_per_word=5, words=[3]))
+        bad = bad[:48] + [0] * 8 + [1] * 12
+        good = list(generate(samples_per_bit=8, bits_per_word=5, words=[7]))
+
+        extractor = async_word_extractor_bb(
+            bits_per_word=5,
+            sample_rate=8,
+            bit_rate=1)
+        dst = blocks.vector_sink_b()
+        self.tb.connect(blocks.vector_source_b(bad + good), extractor, dst)
+        self.tb.run()
+
+        self.assertEqual(len(dst.data()), 2)
+        self.assertEqual(dst.data()[1], 7)
+        self.assertEqual(extractor.framing_errors(), 1)
+        self.assertEqual(
+            [(tag.offset, pmt.to_python(tag.value))
+             for tag in dst.tags()
+             if pmt.symbol_to_string(tag.key) == 'framing_error'],
+            [(0, True)])
+
     def test_bits_in_word(self):
         bits = list(bits_in_word(0b110010, 6))
         self.assertEqual(bits, [0, 1, 0, 0, 1, 1])
@@ -77,6 +152,56 @@ class qa_async_word_extractor_bb(gr_unittest.TestCase):
             1, 1, 1,
         ])
 
+    def test_framer_matches_generate(self):
+        words = [3, 7, 12, 30, 0, 31]
+        for samples_per_bit, stop_bits in ((2, 1.5), (1, 1), (7.5, 2)):
+            self.tb = gr.top_block()
+            dst = blocks.vector_sink_b()
+            self.tb.connect(
+                blocks.vector_source_b(words),
+                async_framer_bb(5, samples_per_bit, 1, stop_bits),
+                dst,
+            )
+            self.tb.run()
+
+            expected = list(generate(
+                samples_per_bit=samples_per_bit,
+                bits_per_word=5,
+                words=words,
+                stop_bits=stop_bits))
+            self.assertEqual(list(dst.data()), expected)
+
+    def test_framer_end_of_stream(self):
+        '''The last word is sent in full, though it spans calls to work.'''
+        words = [3, 7, 12, 30]
+        dst = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b(words),
+            async_framer_bb(5, 10, 1, 1.5),
+            dst,
+        )
+        self.tb.run(16)
+
+        expected = list(generate(
+            samples_per_bit=10,
+            bits_per_word=5,
+            words=words,
+            stop_bits=1.5))
+        self.assertEqual(len(dst.data()), len(expected))
+        self.assertEqual(list(dst.data()), expected)
+
+    def test_framer_round_trip(self):
+        words = list(range(32)) * 4
+        dst = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b(words),
+            async_framer_bb(5, 22050, 45.45),
+            async_word_extractor_bb(5, 22050, 45.45),
+            dst,
+        )
+        self.tb.run()
+        self.assertEqual(list(dst.data()), words)
+
     @staticmethod
     def multiply_bits(bits, copies):
         for bit in bits:
@@ -84,6 +209,14 @@ class qa_async_word_extractor_bb(gr_unittest.TestCase):
                 yield bit
 
 
+def make_tag(key, value, offset):
+    tag = gr.tag_t()
+    tag.key = pmt.intern(key)
+    tag.value = value
+    tag.offset = offset
+    return tag
+
+
 def bits_in_word(word, length):
     '''Yield each bit in the word, LSB first.'''
 
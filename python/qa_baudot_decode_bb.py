@@ -18,6 +18,9 @@
 # the Free Software Foundation, Inc., 51 Franklin Street,
 # Boston, MA 02110-1301, USA.
 
+import time
+
+import pmt
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks
 from radioteletype.modulators import baudot_encode_bb
@@ -142,6 +145,110 @@ class qa_baudot_decode_bb(gr_unittest.TestCase):
         result = self._test(src_data, encoder)
         self.assertEqual(list(result), [])
 
+    def test_encode_idle(self):
+        '''With idle and no text, LETTERS codes are sent.'''
+        dst = blocks.vector_sink_b()
+        self.tb.connect(
+            baudot_encode_bb(idle=True),
+            blocks.head(gr.sizeof_char, 100),
+            dst,
+        )
+        self.tb.run()
+        self.assertEqual(list(dst.data()), [0x1f] * 100)
+
+    def test_encode_text_message(self):
+        '''Each message starts with a shift code, and is followed by idle.'''
+        encoder = baudot_encode_bb(idle=True)
+        for text in ('RY', '73'):
+            encoder.to_basic_block()._post(
+                pmt.intern('text'),
+                pmt.cons(pmt.PMT_NIL,
+                         pmt.init_u8vector(len(text), map(ord, text))))
+
+        dst = blocks.vector_sink_b()
+        self.tb.connect(encoder, blocks.head(gr.sizeof_char, 8), dst)
+        self.tb.run()
+
+        self.assertEqual(list(dst.data()), [
+            0x1f, inverse_letter_map['R'], inverse_letter_map['Y'],
+            0x1b, inverse_figure_map['7'], inverse_figure_map['3'],
+            0x1f, 0x1f,
+        ])
+
+    def _pdus(self, src_data, count, idle_timeout=0, low_latency=False,
+              tags=()):
+        decoder = baudot_decode_bb()
+        decoder.set_idle_timeout(idle_timeout)
+        decoder.set_low_latency(low_latency)
+        src = blocks.vector_source_b(src_data, False, 1, list(tags))
+        debug = blocks.message_debug()
+        self.tb.connect(src, decoder)
+        self.tb.msg_connect(decoder, 'pdus', debug, 'store')
+        self.tb.start()
+        deadline = time.time() + 5
+        while debug.num_messages() < count and time.time() < deadline:
+            time.sleep(0.01)
+        self.tb.stop()
+        self.tb.wait()
+
+        pdus = []
+        for i in range(debug.num_messages()):
+            pdu = debug.get_message(i)
+            pdus.append((
+                pmt.to_python(pmt.car(pdu)),
+                ''.join(map(chr, pmt.u8vector_elements(pmt.cdr(pdu))))))
+        return pdus
+
+    def test_pdu_lines(self):
+        pdus = self._pdus(self._baudot, 1)
+        self.assertEqual(len(pdus), 1)
+        meta, text = pdus[0]
+        self.assertEqual(text, self._ascii)
+        self.assertEqual(meta['offset'], 0)
+        self.assertNotIn('freq', meta)
+        self.assertEqual(meta['errors'], 0)
+
+    def test_pdu_framing_errors(self):
+        '''Characters from words without a stop bit count as errors.'''
+        tags = []
+        # on 'H', and on the figures shift before '0'
+        for offset in (1, 20):
+            tag = gr.tag_t()
+            tag.key = pmt.intern('framing_error')
+            tag.value = pmt.PMT_T
+            tag.offset = offset
+            tags.append(tag)
+        pdus = self._pdus(self._baudot, 1, tags=tags)
+        meta, text = pdus[0]
+        self.assertEqual(text, self._ascii)
+        self.assertEqual(meta['errors'], 2)
+
+    def test_tags_on_shift_codes(self):
+        tag = gr.tag_t()
+        tag.key = pmt.intern('test')
+        tag.value = pmt.from_long(1)
+        # on the figures shift code
+        tag.offset = 1
+        src = blocks.vector_source_b([0x10, 0x1b, 0x10], False, 1, [tag])
+        decoder = baudot_decode_bb()
+        dst = blocks.vector_sink_b()
+        self.tb.connect(src, decoder, dst)
+        self.tb.run()
+
+        self.assertEqual(''.join(map(chr, dst.data())), 'T5')
+        self.assertEqual([tag.offset for tag in dst.tags()], [1])
+
+    def test_pdu_idle(self):
+        src_data = map(inverse_letter_map.__getitem__, 'HI') + [0x1f] * 12
+        pdus = self._pdus(src_data, 1, idle_timeout=12)
+        self.assertEqual([text for meta, text in pdus], ['HI'])
+
+    def test_pdu_low_latency(self):
+        src_data = map(inverse_letter_map.__getitem__, 'HI')
+        pdus = self._pdus(src_data, 2, low_latency=True)
+        self.assertEqual([text for meta, text in pdus], ['H', 'I'])
+        self.assertEqual([meta['offset'] for meta, text in pdus], [0, 1])
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_baudot_decode_bb, "qa_baudot_decode_bb.xml")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+import numpy
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype import bulk
+from radioteletype.modulators import baudot_encode_bb, varicode_encode_bb
+
+
+class qa_bulk(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def _run_block(self, block, data):
+        sink = blocks.vector_sink_b()
+        self.tb.connect(blocks.vector_source_b(data), block, sink)
+        self.tb.run()
+        return list(sink.data())
+
+    def test_baudot_round_trip(self):
+        text = b'CQ CQ DE N0CALL 599 73\nRYRY'
+        codes, state = bulk.baudot_encode(text)
+        self.assertEqual(state, bulk.LETTERS)
+        chars, state = bulk.baudot_decode(codes)
+        self.assertEqual(chars.tobytes(), text)
+        self.assertEqual(state, bulk.LETTERS)
+
+    def test_baudot_matches_block(self):
+        text = b'the quick brown fox, 1234567890! {}\n'
+        codes, _ = bulk.baudot_encode(text)
+        expected = self._run_block(
+            baudot_encode_bb(), list(bytearray(text)))
+        self.assertEqual(list(codes), expected)
+
+    def test_baudot_state(self):
+        codes, state = bulk.baudot_encode(b'12')
+        self.assertEqual(state, bulk.FIGURES)
+        more, state = bulk.baudot_encode(b'3', state)
+        # no shift needed to continue in figures
+        self.assertEqual(len(more), 1)
+
+        chars, state = bulk.baudot_decode(codes)
+        self.assertEqual(state, bulk.FIGURES)
+        chars, state = bulk.baudot_decode(more, state)
+        self.assertEqual(chars.tobytes(), b'3')
+
+    def test_varicode_round_trip(self):
+        text = bytearray(range(128))
+        bits = bulk.varicode_encode(text)
+        chars, state = bulk.varicode_decode(bits)
+        self.assertEqual(bytearray(chars.tobytes()), text)
+        self.assertEqual(state, 0)
+
+    def test_varicode_matches_block(self):
+        text = b'Hello, World!\n'
+        # the encoder block needs more input to finish the last character
+        expected = self._run_block(
+            varicode_encode_bb(), list(bytearray(text + b'\xff')))
+        self.assertEqual(list(bulk.varicode_encode(text)), expected)
+
+    def test_varicode_pieces(self):
+        text = b'Hello, World!\n'
+        bits = bulk.varicode_encode(text)
+        decoded = []
+        state = 0
+        for i in range(0, len(bits), 7):
+            chars, state = bulk.varicode_decode(bits[i:i + 7], state)
+            decoded.append(chars.tobytes())
+        self.assertEqual(b''.join(decoded), text)
+
+    def test_numpy_input(self):
+        codes = numpy.array([0x10, 0x1b, 0x10], numpy.uint8)
+        chars, _ = bulk.baudot_decode(codes)
+        self.assertEqual(chars.tobytes(), b'T5')
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_bulk, "qa_bulk.xml")
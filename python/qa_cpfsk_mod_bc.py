@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+from __future__ import division
+
+import numpy
+
+from gnuradio import gr, gr_unittest, blocks
+
+from radioteletype import modulators
+
+
+class qa_cpfsk_mod_bc(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def _modulate(self, modulator, bits):
+        sink = blocks.vector_sink_c()
+        self.tb.connect(blocks.vector_source_b(bits), modulator, sink)
+        self.tb.run()
+        return numpy.array(sink.data())
+
+    def test_matches_fm_fsk_mod_bc(self):
+        bits = [1, 0, 0, 1, 0, 1, 1, 1, 0, 0, 1, 0]
+        expected = self._modulate(
+            modulators.fm_fsk_mod_bc(8, 1000, 170), bits)
+        self.tb = gr.top_block()
+        result = self._modulate(
+            modulators.cpfsk_mod_bc(8, 1000, 170), bits)
+        self.assertComplexTuplesAlmostEqual(expected, result, 3)
+
+    def test_phase_continuous(self):
+        '''No step in phase is larger than the space tone's.'''
+        result = self._modulate(
+            modulators.cpfsk_mod_bc(16, 8000, 850), [1, 0] * 20)
+        steps = numpy.angle(result[1:] * numpy.conj(result[:-1]))
+        space_step = 2 * numpy.pi * 850 / 8000
+        self.assertLess(numpy.abs(steps).max(), space_step * 1.001)
+        self.assertAlmostEqual(numpy.abs(result).min(), 1.0, 3)
+
+    def test_transition(self):
+        '''The frequency ramps from mark to space over the transition.'''
+        samp_per_bit = 20
+        result = self._modulate(
+            modulators.cpfsk_mod_bc(samp_per_bit, 1000, 100, 0.5), [1, 0, 0])
+        steps = numpy.angle(result[1:] * numpy.conj(result[:-1]))
+        freq = steps * 1000 / (2 * numpy.pi)
+
+        ramp = freq[samp_per_bit - 1:samp_per_bit + 9]
+        self.assertTrue((numpy.diff(ramp) < 0).all())
+        self.assertAlmostEqual(freq[samp_per_bit + 9], -100, 0)
+        self.assertAlmostEqual(freq[samp_per_bit - 2], 0, 3)
+
+    def test_set_spacing(self):
+        modulator = modulators.cpfsk_mod_bc(8, 1000, 170)
+        modulator.set_spacing(85)
+        self.assertEqual(modulator.spacing(), 85)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_cpfsk_mod_bc, "qa_cpfsk_mod_bc.xml")
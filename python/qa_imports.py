@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+import json
+import subprocess
+import sys
+
+from gnuradio import gr_unittest
+
+# GNU Radio components which are slow to load, and only needed once blocks
+# are constructed.
+HEAVY = set([
+    'gnuradio.analog',
+    'gnuradio.blocks',
+    'gnuradio.channels',
+    'gnuradio.digital',
+    'gnuradio.filter',
+])
+
+
+def loaded_after(statement):
+    '''Return the modules loaded by statement, in a fresh interpreter.'''
+    output = subprocess.check_output([sys.executable, '-c', (
+        'import json, sys\n'
+        'before = set(sys.modules)\n'
+        '%s\n'
+        'print(json.dumps(sorted(set(sys.modules) - before)))\n'
+    ) % statement])
+    return set(json.loads(output.decode('utf-8').splitlines()[-1]))
+
+
+class qa_imports(gr_unittest.TestCase):
+    def test_package(self):
+        loaded = loaded_after('import radioteletype')
+        self.assertEqual(
+            [m for m in loaded if m.startswith('radioteletype.')], [])
+
+    def test_numpy_only(self):
+        for module in ('filters', 'offline'):
+            loaded = loaded_after('import radioteletype.' + module)
+            self.assertNotIn('gnuradio', loaded)
+
+    def test_blocks_lazy(self):
+        for module in ('demodulators', 'modulators', 'simulation'):
+            loaded = loaded_after('import radioteletype.' + module)
+            self.assertEqual(loaded & HEAVY, set())
+
+    def test_submodule_attribute(self):
+        if sys.version_info < (3, 7):
+            self.skipTest('module __getattr__ needs Python 3.7')
+        loaded = loaded_after(
+            'import radioteletype\nradioteletype.filters.psk31_matched')
+        self.assertIn('radioteletype.filters', loaded)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_imports, "qa_imports.xml")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+import time
+
+import pmt
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype import latency
+from radioteletype.demodulators import varicode_decode_bb
+from radioteletype.modulators import varicode_encode_bb
+
+
+class qa_latency(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_time_tuple(self):
+        value = latency.time_tuple(12.25)
+        self.assertEqual(pmt.to_python(value), (12, 0.25))
+        self.assertAlmostEqual(latency.tuple_time(value), 12.25)
+
+    def test_percentiles(self):
+        result = latency.percentiles(range(101), (50, 90, 100))
+        self.assertEqual(result, {50: 50, 90: 90, 100: 100})
+        self.assertEqual(latency.percentiles([]), {})
+
+    def test_wallclock_tagger(self):
+        src = blocks.vector_source_c([0j] * 100)
+        tagger = latency.wallclock_tagger()
+        dst = blocks.vector_sink_c()
+        before = time.time()
+        self.tb.connect(src, tagger, dst)
+        self.tb.run()
+
+        tags = dst.tags()
+        self.assertTrue(tags)
+        self.assertEqual(tags[0].offset, 0)
+        for tag in tags:
+            self.assertEqual(pmt.symbol_to_string(tag.key), 'rx_time')
+            self.assertTrue(
+                before <= latency.tuple_time(tag.value) <= time.time())
+
+    def test_instrumented_receiver(self):
+        text = 'hello world\n'
+        encoder = varicode_encode_bb()
+        encoded = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b([ord(c) for c in text] + [0xff]),
+            encoder,
+            encoded)
+        self.tb.run()
+
+        tb = gr.top_block()
+        receiver = latency.instrumented_receiver_cb(
+            blocks.complex_to_real(),
+            blocks.float_to_char(),
+            varicode_decode_bb(),
+        )
+        dst = blocks.vector_sink_b()
+        tb.connect(
+            blocks.vector_source_c([complex(b) for b in encoded.data()]),
+            receiver,
+            dst)
+        tb.run()
+
+        self.assertEqual(''.join(map(chr, dst.data())), text)
+        self.assertEqual(
+            sorted(receiver.latency_percentiles()), [50, 90, 99])
+        receiver.reset_latency()
+        self.assertEqual(receiver.latency_percentiles(), {})
+
+
+if __name__ == "__main__":
+    gr_unittest.run(qa_latency, "qa_latency.xml")
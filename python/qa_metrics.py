@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype import metrics
+from radioteletype.demodulators import (
+    async_word_extractor_bb, baudot_decode_bb, varicode_decode_bb)
+from radioteletype.modulators import varicode_encode_bb
+
+
+class varicode_loopback(gr.hier_block2):
+    def __init__(self):
+        gr.hier_block2.__init__(
+            self, "varicode_loopback",
+            gr.io_signature(1, 1, gr.sizeof_char),
+            gr.io_signature(1, 1, gr.sizeof_char))
+
+        self._encoder = varicode_encode_bb()
+        self._decoder = varicode_decode_bb()
+        self.connect(self, self._encoder, self._decoder, self)
+
+
+class qa_metrics(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def _run(self, src_data, block):
+        # keep the blocks as attributes of the top block so the metrics
+        # functions can find them
+        self.tb.src = blocks.vector_source_b(src_data)
+        self.tb.block = block
+        self.tb.dst = blocks.vector_sink_b()
+        self.tb.connect(self.tb.src, block, self.tb.dst)
+        self.tb.run()
+        return self.tb.dst.data()
+
+    def test_varicode_counters(self):
+        text = 'hello world\n'
+        loopback = varicode_loopback()
+        # the encoder only finishes a character when there is more input, so
+        # follow the text with a character that has no varicode.
+        self._run(list(map(ord, text + '\xff')), loopback)
+
+        self.assertEqual(loopback._encoder.chars_encoded(), len(text))
+        self.assertEqual(loopback._encoder.chars_dropped(), 1)
+        self.assertEqual(loopback._decoder.chars_decoded(), len(text))
+        self.assertEqual(loopback._decoder.invalid_codes(), 0)
+
+        loopback._decoder.reset_counters()
+        self.assertEqual(loopback._decoder.chars_decoded(), 0)
+
+    def test_varicode_invalid_codes(self):
+        decoder = varicode_decode_bb()
+        self._run([1] * 13 + [0, 0], decoder)
+        self.assertEqual(decoder.invalid_codes(), 1)
+        self.assertEqual(decoder.chars_decoded(), 0)
+
+    def test_baudot_counters(self):
+        decoder = baudot_decode_bb()
+        # T, figures, 5, letters
+        self._run([0x10, 0x1b, 0x10, 0x1f], decoder)
+        self.assertEqual(decoder.chars_decoded(), 2)
+
+    def test_framing_errors(self):
+        extractor = async_word_extractor_bb(
+            bits_per_word=5, sample_rate=2, bit_rate=1)
+        bits = [
+            1,                      # idle
+            0, 1, 0, 1, 0, 1, 1,    # start, data, stop
+            0, 1, 1, 0, 0, 1, 0,    # start, data, no stop
+            1, 1,                   # late stop, idle
+        ]
+        self._run([bit for bit in bits for _ in range(2)], extractor)
+        self.assertEqual(extractor.words_extracted(), 2)
+        self.assertEqual(extractor.framing_errors(), 1)
+
+    def test_block_metrics(self):
+        decoder = baudot_decode_bb()
+        self._run([0x10, 0x1b, 0x10, 0x1f], decoder)
+        result = metrics.block_metrics(decoder)
+        self.assertEqual(result['chars_decoded'], 2)
+        self.assertEqual(result['items_read'], [4])
+        self.assertEqual(result['items_written'], [2])
+
+    def test_flowgraph_metrics(self):
+        self._run(list(map(ord, 'hi\xff')), varicode_loopback())
+        result = metrics.flowgraph_metrics(self.tb)
+        self.assertIn('src', result)
+        self.assertIn('dst', result)
+        self.assertEqual(result['block.decoder']['chars_decoded'], 2)
+        self.assertEqual(result['block.encoder']['chars_encoded'], 2)
+
+    def test_prometheus_text(self):
+        self._run(list(map(ord, 'hi\xff')), varicode_loopback())
+        text = metrics.prometheus_text(self.tb)
+        self.assertIn('# TYPE radioteletype_chars_decoded_total counter\n', text)
+        self.assertIn(
+            'radioteletype_chars_decoded_total{block="block.decoder"} 2.0\n',
+            text)
+        self.assertIn(
+            'radioteletype_items_read_total{block="block.decoder",port="0"}',
+            text)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_metrics, "qa_metrics.xml")
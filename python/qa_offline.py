@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+import numpy
+from gnuradio import gr_unittest
+from radioteletype import offline
+
+
+def fsk(codes, samp_rate, baud, mark_freq, space_freq):
+    '''Return codes framed with 1.5 stop bits and FSK modulated.'''
+    bits = [1] * 4
+    for code in codes:
+        bits += [0, 0]
+        for i in range(5):
+            bits += [(code >> i) & 1] * 2
+        bits += [1] * 3
+    bits += [1] * 4
+
+    samp_per_half_bit = samp_rate / baud / 2
+    n = int(len(bits) * samp_per_half_bit)
+    level = numpy.array(bits)[(numpy.arange(n) / samp_per_half_bit).astype(int)]
+    freq = numpy.where(level, mark_freq, space_freq)
+    return numpy.exp(1j * numpy.cumsum(2 * numpy.pi * freq / samp_rate))
+
+
+def psk31(bits, samp_per_sym):
+    '''Return bits as PSK31 at baseband, with a Hann pulse shape.'''
+    symbols = numpy.where(numpy.concatenate([[1], bits]), 1, -1).cumprod()
+    impulses = numpy.zeros(len(symbols) * samp_per_sym)
+    impulses[::samp_per_sym] = symbols
+    pulse = numpy.hanning(2 * samp_per_sym + 1)[:-1]
+    return numpy.convolve(impulses, pulse) * numpy.exp(0.7j)
+
+
+class qa_offline(gr_unittest.TestCase):
+    def setUp(self):
+        self.rng = numpy.random.RandomState(0)
+
+    def _noise(self, n, voltage):
+        return voltage * (self.rng.randn(n) + 1j * self.rng.randn(n))
+
+    def test_baudot(self):
+        text = 'CQ CQ DE N0CALL 599 73\nRYRY'
+        codes = offline.baudot_encode(text.lower())
+        self.assertEqual(list(codes[:3]), [0x0e, 0x17, 0x04])
+        self.assertEqual(offline.baudot_decode(codes), text)
+
+    def test_varicode(self):
+        text = 'Hello, World! 123\n'
+        bits = offline.varicode_encode(text)
+        self.assertEqual(list(bits[:12]), [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1])
+        self.assertEqual(offline.varicode_decode(bits), text)
+        # an unfinished character isn't decoded
+        self.assertEqual(offline.varicode_decode(bits[:-1]), text[:-1])
+
+    def test_threshold(self):
+        self.assertEqual(
+            list(offline.threshold([0, 1, 0, -1, 0, 2])),
+            [0, 1, 1, 0, 0, 1])
+
+    def test_extract_words(self):
+        # two samples per bit, 1.5 stop bits
+        bits = [1, 1] + [0, 0, 1, 1, 0, 0, 1, 1, 1, 1, 1, 1, 1] * 2
+        words, starts = offline.extract_words(bits, 2, 1, bits_per_word=4)
+        self.assertEqual(list(words), [0b1101, 0b1101])
+        self.assertEqual(list(starts), [2, 15])
+
+    def test_fft_filter(self):
+        samples = self.rng.randn(5000)
+        taps = self.rng.randn(300)
+        expected = numpy.convolve(samples, taps)[:len(samples)]
+        result = offline.fft_filter(samples, taps)
+        self.assertFalse(numpy.iscomplexobj(result))
+        self.assertFloatTuplesAlmostEqual(result, expected, 6)
+        self.assertFloatTuplesAlmostEqual(
+            offline.fft_filter(samples, taps, 4), expected[::4], 6)
+
+    def test_rtty(self):
+        text = 'THE QUICK BROWN FOX 123\n'
+        # idle before and after, since the filters delay the signal
+        idle = [offline.LETTERS] * 4
+        codes = idle + list(offline.baudot_encode(text)) + idle
+        samples = fsk(codes, 8000, 45.45, 1000, 830)
+        samples += self._noise(len(samples), 0.3)
+        for decimation in (1, 8):
+            decoded = offline.rtty_decode(
+                samples, 8000, 1000, 830, decimation=decimation)
+            self.assertTrue(decoded.endswith(text), repr(decoded))
+
+    def test_psk31(self):
+        text = 'cq cq de n0call pse k\n'
+        bits = numpy.concatenate([
+            numpy.zeros(32, int),
+            offline.varicode_encode(text),
+            numpy.zeros(32, int),
+        ])
+        samples = psk31(bits, 16)
+        samples += self._noise(len(samples), 0.1)
+        decoded = offline.psk31_decode(samples, 16)
+        self.assertTrue(decoded.endswith(text), repr(decoded))
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_offline, "qa_offline.xml")
@@ -1,8 +1,13 @@
 from __future__ import division
 
-from gnuradio import gr, gr_unittest, blocks
+from math import pi
 
-from radioteletype import modulators, demodulators
+import numpy
+
+import pmt
+from gnuradio import gr, gr_unittest, blocks, digital, filter
+
+from radioteletype import modulators, demodulators, filters, offline, preamble
 
 
 class qa_psk31_modulator_bc(gr_unittest.TestCase):
@@ -12,7 +17,7 @@ class qa_psk31_modulator_bc(gr_unittest.TestCase):
     def tearDown(self):
         self.tb = None
 
-    def _loopback_test(self, modulator, demodulator, decoder):
+    def _loopback_test(self, modulator, demodulator, decoder, channel=()):
         test_string = "the quick brown fox jumps over the lazy dog"
 
         source = blocks.vector_source_b([0]*32 + map(ord, test_string)*2)
@@ -22,6 +27,9 @@ class qa_psk31_modulator_bc(gr_unittest.TestCase):
             source,
             modulators.varicode_encode_bb(),
             modulator,
+        )
+        self.tb.connect(*([modulator] + list(channel) + [demodulator]))
+        self.tb.connect(
             demodulator,
             decoder,
             sink,
@@ -36,6 +44,54 @@ class qa_psk31_modulator_bc(gr_unittest.TestCase):
             "test string not in output %r" % (string_data_out,),
         )
 
+    def _modulate(self, modulator, bits):
+        sink = blocks.vector_sink_c()
+        self.tb.connect(blocks.vector_source_b(bits), modulator, sink)
+        self.tb.run()
+        return numpy.array(sink.data())
+
+    def test_matches_filtered_symbols(self):
+        '''The output is the differentially encoded bits, Hann filtered.'''
+        samp_per_sym = 8
+        bits = [0, 0, 1, 1, 0, 1, 0, 0, 0, 1, 1, 1, 0]
+        taps = filters.psk31_matched(samp_per_sym)
+        taps = [i / max(taps) for i in taps]
+
+        reference = gr.top_block()
+        sink = blocks.vector_sink_f()
+        reference.connect(
+            blocks.vector_source_b(bits),
+            blocks.not_bb(),
+            blocks.and_const_bb(1),
+            digital.diff_encoder_bb(2),
+            blocks.char_to_float(1, 1),
+            blocks.add_const_vff((-0.5, )),
+            blocks.multiply_const_vff((2, )),
+            filter.interp_fir_filter_fff(samp_per_sym, taps),
+            sink,
+        )
+        reference.run()
+
+        result = self._modulate(
+            modulators.psk31_modulator_bc(samp_per_sym), bits)
+        self.assertFloatTuplesAlmostEqual(sink.data(), result.real, 5)
+        self.assertFloatTuplesAlmostEqual([0] * len(result), result.imag, 5)
+
+    def test_carrier(self):
+        '''With a frequency, the baseband output is mixed up to it.'''
+        samp_per_sym = 16
+        bits = [0, 1, 1, 0, 0, 1, 0, 1, 1, 1]
+        baseband = self._modulate(
+            modulators.psk31_modulator_bc(samp_per_sym), bits)
+        self.tb = gr.top_block()
+        result = self._modulate(
+            modulators.psk31_modulator_bc(samp_per_sym, frequency=100), bits)
+
+        n = numpy.arange(len(baseband))
+        expected = baseband * numpy.exp(
+            2j * pi * 100 * n / (31.25 * samp_per_sym))
+        self.assertComplexTuplesAlmostEqual(expected, result, 4)
+
     def test_coherent_loopback(self):
         self._loopback_test(
             modulators.psk31_modulator_bc(),
@@ -46,6 +102,120 @@ class qa_psk31_modulator_bc(gr_unittest.TestCase):
             ),
         )
 
+    def test_coherent_fll_offset(self):
+        '''The FLL finds a signal 40 Hz off frequency.'''
+        samp_per_sym = 16
+        offset = 40
+        demodulator = demodulators.psk31_coherent_demodulator_cc(
+            samp_per_sym, fll_bandwidth=0.02)
+        self._loopback_test(
+            modulators.psk31_modulator_bc(samp_per_sym),
+            demodulator,
+            demodulators.psk31_constellation_decoder_cb(
+                varicode_decode=True,
+                differential_decode=True,
+            ),
+            channel=[blocks.rotator_cc(
+                2 * pi * offset / (samp_per_sym * 31.25))],
+        )
+        self.assertLess(abs(demodulator.get_fll_frequency() - offset), 5)
+
+    def test_coherent_fll_range(self):
+        '''The FLL doesn't follow a signal outside its range.'''
+        samp_per_sym = 16
+        offset = 40
+        demodulator = demodulators.psk31_coherent_demodulator_cc(
+            samp_per_sym, fll_bandwidth=0.02, fll_range=20)
+        bits = [0] * 32 + list(offline.varicode_encode('CQ CQ DE N0CALL'))
+        self.tb.connect(
+            blocks.vector_source_b(bits),
+            modulators.psk31_modulator_bc(samp_per_sym),
+            blocks.rotator_cc(2 * pi * offset / (samp_per_sym * 31.25)),
+            demodulator,
+            blocks.null_sink(gr.sizeof_gr_complex),
+        )
+        self.tb.run()
+        self.assertLessEqual(abs(demodulator.get_fll_frequency()), 20.01)
+
+    def _preamble_bits(self, test_string):
+        return (
+            [1] * 32 +                              # unmodulated carrier
+            [0] * 48 +                              # preamble
+            list(offline.varicode_encode(test_string)) +
+            [0] * 16
+        )
+
+    def test_preamble_tag(self):
+        '''The detector passes the signal through, and tags the preamble
+        with its frequency.'''
+        offset = 2
+        src = blocks.vector_source_b(self._preamble_bits('CQ'))
+        signal = blocks.vector_sink_c()
+        dst = blocks.vector_sink_c()
+        detector = preamble.psk31_preamble_detector_c(4)
+        rotator = blocks.rotator_cc(2 * pi * offset / (4 * 31.25))
+        self.tb.connect(src, modulators.psk31_modulator_bc(), rotator)
+        self.tb.connect(rotator, signal)
+        self.tb.connect(rotator, detector, dst)
+        self.tb.run()
+
+        self.assertComplexTuplesAlmostEqual(signal.data(), dst.data())
+        tags = [tag for tag in dst.tags()
+                if pmt.eqv(tag.key, preamble.PREAMBLE)]
+        self.assertEqual(len(tags), 1)
+        # in the preamble, after a full window
+        self.assertGreaterEqual(tags[0].offset, 4 * (32 + 16) - 1)
+        self.assertLess(tags[0].offset, 4 * (32 + 48))
+        phase, freq = pmt.to_python(tags[0].value)
+        self.assertAlmostEqual(freq, 2 * pi * offset / 31.25, 1)
+
+    def test_costas_seed(self):
+        '''The Costas loop takes the phase and frequency in a preamble tag
+        from the tagged symbol on.'''
+        freq = 0.4
+        symbols = numpy.array([1, -1] * 40) * numpy.exp(
+            1j * (freq * numpy.arange(80) + 1))
+        tag = gr.tag_t()
+        tag.key = preamble.PREAMBLE
+        tag.value = pmt.make_tuple(
+            pmt.from_double(freq * 30 + 1), pmt.from_double(freq))
+        tag.offset = 30
+        loop = preamble.psk31_costas_loop_cc(0.01)
+        dst = blocks.vector_sink_c()
+        self.tb.connect(
+            blocks.vector_source_c(symbols.tolist(), False, 1, [tag]),
+            loop,
+            dst,
+        )
+        self.tb.run()
+
+        result = numpy.array(dst.data())
+        self.assertLess(abs(result[30:].imag).max(), 0.05)
+        self.assertAlmostEqual(loop.get_frequency(), freq, 2)
+
+    def test_coherent_preamble(self):
+        '''With the preamble, the first characters of a transmission 2 Hz
+        off frequency are decoded, though the Costas loop is too narrow to
+        pull it in by itself before the text starts.'''
+        test_string = "the quick brown fox"
+        offset = 2
+        demodulator = demodulators.psk31_coherent_demodulator_cc(
+            costas_bandwidth=0.05, preamble=True)
+        sink = blocks.vector_sink_b()
+        self.tb.connect(
+            blocks.vector_source_b(self._preamble_bits(test_string)),
+            modulators.psk31_modulator_bc(),
+            blocks.rotator_cc(2 * pi * offset / (4 * 31.25)),
+            demodulator,
+            demodulators.psk31_constellation_decoder_cb(),
+            sink,
+        )
+        self.tb.run()
+
+        self.assertEqual(demodulator._preamble_detector.detections, 1)
+        string_data_out = ''.join(chr(c) for c in sink.data())
+        self.assertIn(test_string, string_data_out)
+
     def test_incoherent_loopback(self):
         self._loopback_test(
             modulators.psk31_modulator_bc(),
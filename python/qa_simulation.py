@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+from cmath import exp
+from math import pi
+
+import numpy
+
+import pmt
+from gnuradio import gr, gr_unittest
+from gnuradio import blocks
+from radioteletype import offline, simulation
+
+
+class qa_simulation(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_cer_identical(self):
+        self.assertEqual(simulation.character_error_rate('RYRY', 'RYRY'), 0)
+
+    def test_cer_errors(self):
+        # one substitution, one deletion
+        self.assertAlmostEqual(
+            simulation.character_error_rate('RYRY', 'RXR'), 2/4)
+
+    def test_cer_garbage(self):
+        # insertions count too
+        self.assertAlmostEqual(
+            simulation.character_error_rate('AB', 'xxAB'), 2/2)
+
+    def test_async_frame(self):
+        bits = simulation.async_frame([0b101], bits_per_word=3)
+        self.assertEqual(bits, [
+            0, 0,               # start
+            1, 1, 0, 0, 1, 1,   # data, LSB first
+            1, 1, 1,            # 1.5 stop bits
+        ])
+
+    def test_noise_voltage(self):
+        self.assertAlmostEqual(simulation.noise_voltage(1, 4, 0), 2)
+
+    def test_channel_noiseless(self):
+        src_data = [1+1j, -1+0j, 0-1j] * 10
+        dst = blocks.vector_sink_c()
+        self.tb.connect(
+            blocks.vector_source_c(src_data),
+            simulation.awgn_fading_channel_cc(),
+            dst,
+        )
+        self.tb.run()
+        self.assertComplexTuplesAlmostEqual(dst.data(), src_data, places=5)
+
+    def test_band_synthesizer_placement(self):
+        '''Constant inputs become tones at the requested frequencies.'''
+        samp_rate = 48000
+        interp = 24
+        block_len = 64
+        freqs = [1234.5, -7000.3]
+        gains = [1.0, 0.5]
+        nblocks = 8
+
+        synthesizer = simulation._band_synthesizer(
+            samp_rate, interp, freqs, gains, block_len=block_len)
+        dst = blocks.vector_sink_c()
+        for i in range(len(freqs)):
+            self.tb.connect(
+                blocks.vector_source_c([1] * block_len * nblocks),
+                (synthesizer, i),
+            )
+        self.tb.connect(synthesizer, dst)
+        self.tb.run()
+
+        delay = block_len * interp // 2
+        result = dst.data()
+        expected = [
+            sum(g * exp(2j * pi * f * (n - delay) / samp_rate)
+                for f, g in zip(freqs, gains))
+            for n in range(len(result))
+        ]
+
+        # skip the first block, where the input starts abruptly
+        self.assertComplexTuplesAlmostEqual(
+            result[block_len * interp:],
+            expected[block_len * interp:],
+            places=3)
+
+    def test_band_source_runs(self):
+        signals = simulation.random_signals(4, samp_rate=8000, margin=500)
+        dst = blocks.vector_sink_c()
+        self.tb.connect(
+            simulation.band_source_c(
+                signals,
+                samp_rate=8000,
+                noise_voltage=0.01,
+                doppler_spread=1,
+                qrn_rate=10,
+                qrn_voltage=0.1,
+            ),
+            blocks.head(gr.sizeof_gr_complex, 8000),
+            dst,
+        )
+        self.tb.run()
+        self.assertEqual(len(dst.data()), 8000)
+
+    def test_multicarrier_tx(self):
+        '''Each channel's text is transmitted at its frequency.'''
+        samp_rate = 8000
+        channels = [
+            {'mode': 'psk31', 'freq': 1000},
+            {'mode': 'rtty', 'freq': -2000, 'shift': 170, 'level_db': -6},
+        ]
+        tx = simulation.multicarrier_tx_c(channels, samp_rate=samp_rate)
+        for encoder in tx._encoders:
+            encoder.to_basic_block()._post(
+                pmt.intern('text'), pmt.intern('RYRY ' * 10))
+        dst = blocks.vector_sink_c()
+        self.tb.connect(tx, blocks.head(gr.sizeof_gr_complex, samp_rate), dst)
+        self.tb.run()
+
+        result = numpy.array(dst.data())
+        self.assertEqual(len(result), samp_rate)
+
+        # one second, so each bin is 1 Hz
+        power = numpy.abs(numpy.fft.fft(result)) ** 2
+        freqs = numpy.fft.fftfreq(len(result), 1 / samp_rate)
+        psk31 = power[abs(freqs - 1000) < 50].sum()
+        rtty = power[abs(freqs + 2000) < 150].sum()
+        self.assertGreater(psk31 + rtty, 0.9 * power.sum())
+        self.assertGreater(psk31, rtty)
+
+    def test_multicarrier_tx_quiet_channel(self):
+        '''A channel without text idles, and doesn't stop the others.'''
+        samp_rate = 8000
+        channels = [
+            {'mode': 'psk31', 'freq': 0},
+            {'mode': 'rtty', 'freq': -2000},
+        ]
+        tx = simulation.multicarrier_tx_c(channels, samp_rate=samp_rate)
+        tx._encoders[0].to_basic_block()._post(
+            pmt.intern('text'), pmt.intern('CQ CQ'))
+        dst = blocks.vector_sink_c()
+        self.tb.connect(
+            tx, blocks.head(gr.sizeof_gr_complex, 3 * samp_rate), dst)
+        self.tb.run()
+
+        result = numpy.array(dst.data())
+        self.assertEqual(len(result), 3 * samp_rate)
+        self.assertIn(
+            'CQ CQ', offline.psk31_decode(result, int(samp_rate / 31.25)))
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_simulation, "qa_simulation.xml")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Phil Frost.
+#
+# This is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# This software is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this software; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+
+from __future__ import division
+
+import numpy
+
+from gnuradio import gr, gr_unittest, blocks
+
+from radioteletype.demodulators import sliding_dft_cf
+
+
+class qa_sliding_dft_cf(gr_unittest.TestCase):
+    def setUp(self):
+        self.tb = gr.top_block()
+        rng = numpy.random.RandomState(0)
+        self.data = rng.randn(2000) + 1j * rng.randn(2000)
+
+    def tearDown(self):
+        self.tb = None
+
+    def _reference(self, decim, center_freq, sample_rate, length):
+        '''The mean of each window, mixed down, by brute force.'''
+        n = numpy.arange(len(self.data))
+        mixed = self.data * numpy.exp(-2j * numpy.pi * center_freq * n /
+                                      sample_rate)
+        means = []
+        for end in range(decim, len(self.data) + 1, decim):
+            means.append(mixed[max(0, end - length):end].sum() / length)
+        return numpy.array(means)
+
+    def _run(self, block):
+        power = blocks.vector_sink_f()
+        baseband = blocks.vector_sink_c()
+        self.tb.connect(blocks.vector_source_c(self.data), block, power)
+        self.tb.connect((block, 1), baseband)
+        self.tb.run()
+        return power.data(), baseband.data()
+
+    def test_matches_dft(self):
+        power, baseband = self._run(sliding_dft_cf(4, 1200, 8000, 37))
+        expected = self._reference(4, 1200, 8000, 37)
+        self.assertEqual(len(baseband), 500)
+        self.assertComplexTuplesAlmostEqual(expected, baseband, 4)
+        self.assertFloatTuplesAlmostEqual(abs(expected) ** 2, power, 4)
+
+    def test_long_run(self):
+        '''Restarting the sum keeps rounding errors from accumulating.'''
+        self.data = numpy.tile(self.data, 100)
+        power, _ = self._run(sliding_dft_cf(1000, -300, 8000, 176))
+        expected = self._reference(1000, -300, 8000, 176)
+        self.assertFloatTuplesAlmostEqual(abs(expected) ** 2, power, 4)
+
+    def test_power_only(self):
+        '''The baseband output is optional.'''
+        block = sliding_dft_cf(4, 1200, 8000, 37)
+        power = blocks.vector_sink_f()
+        self.tb.connect(blocks.vector_source_c(self.data), block, power)
+        self.tb.run()
+        expected = self._reference(4, 1200, 8000, 37)
+        self.assertFloatTuplesAlmostEqual(abs(expected) ** 2, power.data(), 4)
+
+    def test_set_center_freq(self):
+        block = sliding_dft_cf(4, 1200, 8000, 37)
+        block.set_center_freq(-500)
+        self.assertEqual(block.center_freq(), -500)
+        self.assertEqual(block.length(), 37)
+        _, baseband = self._run(block)
+        expected = self._reference(4, -500, 8000, 37)
+        self.assertComplexTuplesAlmostEqual(expected, baseband, 4)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_sliding_dft_cf, "qa_sliding_dft_cf.xml")
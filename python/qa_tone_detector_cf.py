@@ -20,9 +20,14 @@
 
 from __future__ import division
 
+import cmath
+
+import numpy
+
 from gnuradio import gr, gr_unittest
-from gnuradio import blocks
-from radioteletype.demodulators import tone_detector_cf
+from gnuradio import analog, blocks
+from radioteletype import modulators, simulation
+from radioteletype.demodulators import rtty_demod_cb, tone_detector_cf
 
 
 class qa_async_word_extractor_bb(gr_unittest.TestCase):
@@ -43,6 +48,170 @@ class qa_async_word_extractor_bb(gr_unittest.TestCase):
         self.tb.run()
         dst.data()
 
+    def detect(self, freq, **kwargs):
+        '''Return the settled output for one second of a tone at freq.'''
+        src = blocks.vector_source_c(tone(freq, 48000, 48000))
+        tone_detector = tone_detector_cf(10, 2125, 48000, 45.45, **kwargs)
+        dst = blocks.vector_sink_f()
+        self.tb.connect(src, tone_detector, dst)
+        return tone_detector, dst
+
+    def test_boxcar(self):
+        on_detector, on = self.detect(2125, tone_filter='boxcar')
+        _, off = self.detect(2295, tone_filter='boxcar')
+        self.tb.run()
+
+        self.assertEqual(len(on.data()), 4800)
+        for power in on.data()[-1000:]:
+            self.assertAlmostEqual(power, 1.0, 3)
+        for power in off.data()[-1000:]:
+            self.assertLess(power, 1e-3)
+
+    def test_boxcar_matches_raised_cos(self):
+        _, boxcar = self.detect(2125, tone_filter='boxcar')
+        _, raised_cos = self.detect(2125)
+        self.tb.run()
+
+        for a, b in zip(boxcar.data()[-1000:], raised_cos.data()[-1000:]):
+            self.assertAlmostEqual(a, b, 2)
+
+    def test_boxcar_set_order(self):
+        tone_detector, off = self.detect(2295, tone_filter='boxcar')
+        tone_detector.set_order(1)
+        self.tb.run()
+
+        # a single moving average lets much more of the other tone through
+        self.assertGreater(max(off.data()[-1000:]), 1e-3)
+
+    def test_boxcar_center_freq(self):
+        tone_detector, on = self.detect(2295, tone_filter='boxcar')
+        tone_detector.set_center_freq(2295)
+        self.tb.run()
+
+        for power in on.data()[-1000:]:
+            self.assertAlmostEqual(power, 1.0, 3)
+
+    def test_sliding_dft_matches_boxcar(self):
+        _, boxcar = self.detect(2200, tone_filter='boxcar', order=1)
+        _, sliding_dft = self.detect(2200, tone_filter='sliding_dft')
+        self.tb.run()
+
+        self.assertFloatTuplesAlmostEqual(
+            boxcar.data(), sliding_dft.data(), 3)
+
+    def test_sliding_dft_matches_raised_cos(self):
+        _, sliding_dft = self.detect(2125, tone_filter='sliding_dft')
+        _, raised_cos = self.detect(2125)
+        _, sliding_dft_off = self.detect(2295, tone_filter='sliding_dft')
+        _, raised_cos_off = self.detect(2295)
+        self.tb.run()
+
+        for a, b in zip(
+                sliding_dft.data()[-1000:], raised_cos.data()[-1000:]):
+            self.assertAlmostEqual(a, b, 2)
+
+        # the other tone leaks through the sinc response of the sliding DFT
+        # more than through the raised cosine, but not enough to matter
+        for a, b in zip(
+                sliding_dft_off.data()[-1000:], raised_cos_off.data()[-1000:]):
+            self.assertLess(a, 0.01)
+            self.assertLess(b, 1e-4)
+
+    def test_sliding_dft_center_freq(self):
+        tone_detector, on = self.detect(2295, tone_filter='sliding_dft')
+        tone_detector.set_center_freq(2295)
+        self.tb.run()
+
+        for power in on.data()[-1000:]:
+            self.assertAlmostEqual(power, 1.0, 3)
+
+    def test_multistage_matches_single_stage(self):
+        '''Decimating before the raised cosine filter doesn't change its
+        response, only its delay.'''
+        rng = numpy.random.RandomState(0)
+        bits = [int(b) for b in rng.randint(0, 2, 60)]
+
+        # mark at 0 Hz, space at -170 Hz
+        src = blocks.vector_source_b(bits)
+        modulator = modulators.fm_fsk_mod_bc(176, 8000, 170)
+        multistage = tone_detector_cf(
+            1, 0, 8000, 8000 / 176, multistage=True)
+        single_stage = tone_detector_cf(1, 0, 8000, 8000 / 176)
+        multistage_dst = blocks.vector_sink_f()
+        single_stage_dst = blocks.vector_sink_f()
+        self.tb.connect(src, modulator, multistage, multistage_dst)
+        self.tb.connect(modulator, single_stage, single_stage_dst)
+        self.tb.run()
+
+        expected = numpy.array(single_stage_dst.data())
+        result = numpy.array(multistage_dst.data())
+        settled = expected[2000:-400]
+        errors = [
+            abs(settled - result[2000 + lag:len(expected) - 400 + lag]).max()
+            for lag in range(200)
+        ]
+        self.assertLess(min(errors), 0.05)
+
+    def test_multistage_set_order(self):
+        '''A wider filter needs a higher rate, so the stages change.'''
+        tone_detector, on = self.detect(2125, multistage=True)
+        tone_detector.set_order(4)
+        self.tb.run()
+
+        for power in on.data()[-1000:]:
+            self.assertAlmostEqual(power, 1.0, 2)
+
+    def test_multistage_nthreads(self):
+        '''Only the FFT filter runs in more than one thread.'''
+        tone_detector, _ = self.detect(2125)
+        tone_detector.set_nthreads(2)
+        tone_detector, _ = self.detect(2125, multistage=True)
+        self.assertRaises(ValueError, tone_detector.set_nthreads, 2)
+
+    def decode(self, tone_filter):
+        '''Demodulate a noisy RTTY signal with rtty_demod_cb.'''
+        tb = gr.top_block()
+        samp_rate = 8000
+        samp_per_bit = 2 * int(round(samp_rate / 45.45 / 2))
+
+        text = [ord(c) for c in 'RYRY THE QUICK BROWN FOX ']
+        codes = simulation._run_bytes(modulators.baudot_encode_bb(), text)
+        bits = [1] * 40 + simulation.async_frame(codes, items_per_bit=2) * 3
+
+        # the modulator puts mark at 0 Hz and space at -170
+        demod = rtty_demod_cb(
+            baud=samp_rate / samp_per_bit,
+            mark_freq=0,
+            space_freq=-170,
+            samp_rate=samp_rate,
+            tone_filter=tone_filter,
+        )
+        add = blocks.add_cc()
+        dst = blocks.vector_sink_b()
+        tb.connect(
+            blocks.vector_source_b(bits),
+            modulators.fm_fsk_mod_bc(samp_per_bit // 2, samp_rate, 170),
+            add,
+            demod,
+            dst,
+        )
+        tb.connect(
+            analog.noise_source_c(analog.GR_GAUSSIAN, 0.5, 1),
+            (add, 1))
+        for port in range(1, 4):
+            tb.connect((demod, port), blocks.null_sink(gr.sizeof_float))
+        tb.run()
+        return bytearray(dst.data()).decode('ascii')
+
+    def test_decode(self):
+        '''Every tone filter decodes a noisy signal.'''
+        for tone_filter in ('raised_cos', 'boxcar', 'sliding_dft'):
+            self.assertIn('THE QUICK BROWN FOX', self.decode(tone_filter))
+
+
+def tone(freq, sample_rate, length):
+    return [cmath.exp(2j*cmath.pi*freq*n/sample_rate) for n in range(length)]
+
 
 def bits_in_word(word, length):
     '''Yield each bit in the word, LSB first.'''
@@ -19,7 +19,9 @@
 #
 
 import random
+import time
 
+import pmt
 from gnuradio import gr, blocks, gr_unittest
 from radioteletype.demodulators import varicode_decode_bb
 
@@ -100,6 +102,13 @@ def string_to_bytes(s):
     return map(int, s)
 
 
+def pdu_to_python(pdu):
+    '''Return the metadata and text of a PDU.'''
+    meta = pmt.to_python(pmt.car(pdu))
+    text = ''.join(map(chr, pmt.u8vector_elements(pmt.cdr(pdu))))
+    return meta, text
+
+
 class qa_varicode_decode_bb(gr_unittest.TestCase):
 
     def setUp(self):
@@ -127,6 +136,28 @@ class qa_varicode_decode_bb(gr_unittest.TestCase):
 
         return ''.join(map(chr, sink.data()))
 
+    def decode_pdus(self, src_data, count, idle_timeout=0):
+        '''Decode with only the "pdus" port connected. Wait for `count` PDUs
+        and return them as (metadata, text) pairs.'''
+        source = blocks.vector_source_b(src_data)
+        decoder = varicode_decode_bb()
+        decoder.set_idle_timeout(idle_timeout)
+        decoder.set_center_freq(1000)
+        debug = blocks.message_debug()
+
+        self.tb.connect(source, decoder)
+        self.tb.msg_connect(decoder, 'pdus', debug, 'store')
+        self.tb.start()
+        deadline = time.time() + 5
+        while debug.num_messages() < count and time.time() < deadline:
+            time.sleep(0.01)
+        self.tb.stop()
+        self.tb.wait()
+
+        return [
+            pdu_to_python(debug.get_message(i))
+            for i in range(debug.num_messages())]
+
     def test_010_characters(self):
         '''test decoding a few individual characters'''
         for c in 'test':
@@ -156,6 +187,52 @@ class qa_varicode_decode_bb(gr_unittest.TestCase):
         received = self.decode(src_data)
         self.assertEqual(received[-len(test_message):], test_message)
 
+    def test_050_pdu_lines(self):
+        '''Each line is published as one PDU'''
+        src_data = self.encode('hi\nthere\n')
+        pdus = self.decode_pdus(src_data, 2)
+
+        self.assertEqual([text for meta, text in pdus], ['hi\n', 'there\n'])
+        first, second = [meta for meta, text in pdus]
+        # the first bit of 'h', and of 't'
+        self.assertEqual(first['offset'], 0)
+        self.assertEqual(second['offset'], len(self.encode('hi\n')))
+        self.assertEqual(first['freq'], 1000)
+        self.assertEqual(first['errors'], 0)
+
+    def test_060_pdu_idle(self):
+        '''A partial line is published after the idle timeout'''
+        src_data = self.encode('abc') + [0] * 64
+        pdus = self.decode_pdus(src_data, 1, idle_timeout=32)
+        self.assertEqual([text for meta, text in pdus], ['abc'])
+
+    def test_070_pdu_errors(self):
+        '''Invalid varicodes are counted in the PDU metadata'''
+        src_data = [1] * 13 + [0, 0] + self.encode('ok\n')
+        pdus = self.decode_pdus(src_data, 1)
+        self.assertEqual(pdus[0][1], 'ok\n')
+        self.assertEqual(pdus[0][0]['errors'], 1)
+
+    def test_080_tags(self):
+        '''Each character gets an rx_time for its first bit'''
+        tag = gr.tag_t()
+        tag.key = pmt.intern('rx_time')
+        tag.value = pmt.make_tuple(pmt.from_uint64(5), pmt.from_double(0.0))
+        tag.offset = 0
+        source = blocks.vector_source_b(self.encode('ab'), False, 1, [tag])
+        decoder = varicode_decode_bb()
+        sink = blocks.vector_sink_b()
+        self.tb.connect(source, decoder, sink)
+        self.tb.run()
+
+        times = sorted(
+            (tag.offset, pmt.to_python(tag.value)) for tag in sink.tags()
+            if pmt.symbol_to_string(tag.key) == 'rx_time')
+        self.assertEqual(times, [
+            (0, (5, 0.0)),
+            (1, (5, len(self.encode('a')) / 31.25)),
+        ])
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_varicode_decode_bb, "qa_varicode_decode_bb.xml")
@@ -21,6 +21,7 @@
 
 import random
 
+import pmt
 from gnuradio import gr, gr_unittest
 from gnuradio import blocks
 from radioteletype.modulators import varicode_encode_bb
@@ -105,6 +106,36 @@ class qa_varicode_encode_bb(gr_unittest.TestCase):
         self.tb.run()
         self.assertEqual(sink.data(), ())
 
+    def test_005_idle(self):
+        '''With idle and no text, zeros are sent continuously.'''
+        sink = blocks.vector_sink_b()
+        self.tb.connect(
+            varicode_encode_bb(idle=True),
+            blocks.head(gr.sizeof_char, 1000),
+            sink,
+        )
+        self.tb.run()
+        self.assertEqual(list(sink.data()), [0] * 1000)
+
+    def test_006_text_message(self):
+        '''Text from the message port is sent between idles.'''
+        encoder = varicode_encode_bb(idle=True)
+        text = 'CQ CQ DE N0CALL'
+        encoder.to_basic_block()._post(
+            pmt.intern('text'),
+            pmt.cons(pmt.PMT_NIL, pmt.init_u8vector(len(text), map(ord, text))))
+        encoder.to_basic_block()._post(pmt.intern('text'), pmt.intern(' K'))
+
+        sink = blocks.vector_sink_b()
+        self.tb.connect(
+            encoder,
+            blocks.head(gr.sizeof_char, 1000),
+            varicode_decode_bb(),
+            sink,
+        )
+        self.tb.run()
+        self.assertEqual(''.join(map(chr, sink.data())), text + ' K')
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_varicode_encode_bb, "qa_varicode_encode_bb.xml")
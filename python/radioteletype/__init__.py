@@ -18,4 +18,38 @@
 
 These blocks can be used to implement a variety of radioteletype (RTTY)
 demodulators.
+
+Nothing is imported with the package itself. Submodules, and the GNU Radio
+components they use, are loaded when first used, so a process which only
+needs radioteletype.filters or radioteletype.offline doesn't pay to load
+the rest of GNU Radio.
 '''
+
+import importlib
+
+_submodules = (
+    'afc',
+    'aio',
+    'bulk',
+    'demodulators',
+    'filters',
+    'latency',
+    'metrics',
+    'modulators',
+    'offline',
+    'preamble',
+    'simulation',
+)
+
+
+def __getattr__(name):
+    # Python 3.7 and later call this for attributes not found on the module,
+    # so radioteletype.demodulators works without importing it first.
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        'module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules))
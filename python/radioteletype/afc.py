@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+'''Automatic frequency control for FSK receivers.
+
+Transmitters drift, sometimes by tens of hertz over a long transmission.
+fsk_afc_c watches the mark and space tone filters of a receiver and retunes
+them to follow the signal. rtty_demod_cb(afc=True) uses it.
+'''
+
+from __future__ import division
+
+from math import pi
+
+import numpy
+from gnuradio import gr
+
+
+class fsk_afc_c(gr.sync_block):
+    '''Estimate and correct the frequency error of an FSK signal.
+
+    The inputs are the mark and space tone filter outputs, each mixed down so
+    its tone should be at 0 Hz, at `samp_rate` samples per second. While a
+    tone is present its phase advances by the frequency error every sample,
+    so the error is the angle of the sum of each sample times the conjugate
+    of the previous one. Weighting by amplitude this way means whichever tone
+    is keyed dominates the estimate, and noise and keying transitions count
+    for little.
+
+    Every `update_interval` seconds, the offset moves `update_interval /
+    time_const` of the way toward the error measured since the last update,
+    scaled by how consistent the measurements were, and is passed to
+    `retune(offset)`. The offset is limited to plus or minus `max_offset` Hz.
+    retune is called from the flowgraph's thread, and should add the offset
+    to the nominal mark and space frequencies of the tone filters.
+    '''
+    def __init__(
+        self,
+        samp_rate,
+        retune,
+        time_const=5.0,
+        max_offset=100.0,
+        update_interval=0.25,
+    ):
+        gr.sync_block.__init__(
+            self,
+            name='fsk_afc_c',
+            in_sig=[numpy.complex64, numpy.complex64],
+            out_sig=None,
+        )
+        self.samp_rate = samp_rate
+        self.retune = retune
+        self.time_const = time_const
+        self.max_offset = max_offset
+        self.update_interval = update_interval
+
+        self._offset = 0.0
+        self._previous = [0j, 0j]
+        self._clear()
+
+    def _clear(self):
+        self._sum = 0j
+        self._magnitude = 0.0
+        self._count = 0
+
+    def get_offset(self):
+        return self._offset
+
+    def set_offset(self, offset):
+        '''Retune to offset now, and discard the error measured so far.'''
+        self._offset = max(-self.max_offset, min(self.max_offset, offset))
+        self._clear()
+        self.retune(self._offset)
+
+    def reset(self):
+        self.set_offset(0.0)
+
+    def get_time_const(self):
+        return self.time_const
+
+    def set_time_const(self, time_const):
+        self.time_const = time_const
+
+    def get_max_offset(self):
+        return self.max_offset
+
+    def set_max_offset(self, max_offset):
+        self.max_offset = max_offset
+
+    def _update(self):
+        if self._magnitude > 0:
+            error = numpy.angle(self._sum) * self.samp_rate / (2 * pi)
+            consistency = abs(self._sum) / self._magnitude
+            gain = min(1.0, self.update_interval / self.time_const)
+            offset = self._offset + gain * consistency * error
+            offset = max(-self.max_offset, min(self.max_offset, offset))
+            if offset != self._offset:
+                self._offset = offset
+                self.retune(offset)
+        self._clear()
+
+    def work(self, input_items, output_items):
+        n = len(input_items[0])
+        for port, x in enumerate(input_items):
+            products = x[1:] * numpy.conj(x[:-1])
+            first = x[0] * numpy.conj(self._previous[port])
+            self._sum += complex(products.sum() + first)
+            self._magnitude += float(
+                numpy.abs(products).sum() + abs(first))
+            self._previous[port] = x[-1]
+
+        self._count += n
+        if self._count >= self.update_interval * self.samp_rate:
+            self._update()
+        return n
+
+
+__all__ = [
+    'fsk_afc_c',
+]
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+'''Stream decoded text into asyncio.
+
+A flowgraph is run by the GNU Radio scheduler in its own threads. This
+module connects it to an asyncio event loop without polling: each channel's
+decoded characters go to a text_sink_b, which hands everything it receives
+in one call to work to the event loop as a single batch, so the loop wakes
+once per batch rather than once per character. The batches are queued in a
+text_stream, read with `async for`:
+
+    flowgraph = decoder(tb)
+    stream = flowgraph.channel(rtty_demod)
+    flowgraph.start()
+    async for line in stream:
+        dispatch(line)
+    await flowgraph.stop()
+
+The queue is bounded. When the consumer falls behind and it fills, the sink
+stops taking input until there is room, and the flowgraph's buffers fill
+behind it, so a slow consumer slows the receiver rather than being buried.
+
+Requires Python 3.
+'''
+
+from __future__ import division
+
+import asyncio
+import concurrent.futures
+import sys
+
+import numpy
+from gnuradio import gr
+
+
+class text_sink_b(gr.sync_block):
+    '''Send decoded characters to a text_stream, one batch per call to work.
+
+    While the stream's queue is full, work waits, so backpressure reaches the
+    rest of the flowgraph.
+    '''
+
+    # how often a waiting sink checks whether it should give up
+    POLL_SECONDS = 0.1
+
+    def __init__(self, stream):
+        gr.sync_block.__init__(
+            self,
+            name='text_sink_b',
+            in_sig=[numpy.uint8],
+            out_sig=None,
+        )
+        self.stream = stream
+        self.abandoned = False
+
+    def work(self, input_items, output_items):
+        batch = input_items[0].tobytes().decode('latin-1')
+        if batch and not self._put(batch):
+            return -1
+        return len(input_items[0])
+
+    def stop(self):
+        # end of input, or the flowgraph was stopped
+        self.stream.close_threadsafe()
+        return True
+
+    def abandon(self):
+        '''Stop waiting for room in the queue, so the flowgraph can stop.'''
+        self.abandoned = True
+
+    def _put(self, batch):
+        future = self.stream.put_threadsafe(batch)
+        while True:
+            try:
+                future.result(self.POLL_SECONDS)
+                return True
+            except concurrent.futures.TimeoutError:
+                if self.abandoned:
+                    future.cancel()
+                    return False
+
+
+class text_stream(object):
+    '''An async iterator of decoded text.
+
+    With lines=True, each item is one line, including its newline, and a
+    partial line is returned when the stream ends. Otherwise items are the
+    batches of characters as they arrive. At most maxsize batches are held
+    before the sink feeding the stream waits.
+    '''
+
+    def __init__(self, lines=True, maxsize=16, loop=None):
+        self.lines = lines
+        self._loop = loop or asyncio.get_event_loop()
+        self._queue = self._make_queue(maxsize)
+        self._pending = ''
+        self._closed = False
+
+    def _make_queue(self, maxsize):
+        # The queue is only used from tasks on self._loop. Since Python 3.10
+        # it binds to the loop it is first used on; before that it binds to
+        # the default loop when it is made, unless given one.
+        if sys.version_info < (3, 10):
+            return asyncio.Queue(maxsize, loop=self._loop)
+        return asyncio.Queue(maxsize)
+
+    def put_threadsafe(self, batch):
+        '''Queue a batch from another thread. Returns a concurrent future.'''
+        return asyncio.run_coroutine_threadsafe(
+            self._queue.put(batch), self._loop)
+
+    def close_threadsafe(self):
+        '''End the stream, after any batches already queued.'''
+        asyncio.run_coroutine_threadsafe(self._queue.put(None), self._loop)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = self._loop.create_future()
+        self._next(future)
+        return future
+
+    def _pop(self):
+        if not self.lines:
+            text, self._pending = self._pending, ''
+            return text or None
+        end = self._pending.find('\n')
+        if end >= 0:
+            line, self._pending = (
+                self._pending[:end + 1], self._pending[end + 1:])
+            return line
+        if self._closed and self._pending:
+            line, self._pending = self._pending, ''
+            return line
+        return None
+
+    def _next(self, future):
+        item = self._pop()
+        if item is not None:
+            future.set_result(item)
+        elif self._closed:
+            future.set_exception(StopAsyncIteration())
+        else:
+            get = self._loop.create_task(self._queue.get())
+            get.add_done_callback(lambda get: self._got(get, future))
+
+    def _got(self, get, future):
+        if get.cancelled():
+            if not future.done():
+                future.cancel()
+            return
+        # kept for the next reader if this one has gone away
+        self._unget(get.result())
+        if not future.cancelled():
+            self._next(future)
+
+    def _unget(self, batch):
+        if batch is None:
+            self._closed = True
+        else:
+            self._pending += batch
+
+
+class decoder(object):
+    '''Run a flowgraph, streaming decoded text from its channels.
+
+    channel() connects an output of a block in the flowgraph to a new
+    text_stream, and must be called before start().
+    '''
+
+    def __init__(self, flowgraph, loop=None):
+        self.flowgraph = flowgraph
+        self._loop = loop or asyncio.get_event_loop()
+        self._sinks = []
+
+    def channel(self, block, port=0, lines=True, maxsize=16):
+        stream = text_stream(lines, maxsize, self._loop)
+        sink = text_sink_b(stream)
+        self.flowgraph.connect((block, port), sink)
+        self._sinks.append(sink)
+        return stream
+
+    def start(self):
+        self.flowgraph.start()
+
+    def stop(self):
+        '''Stop the flowgraph. Returns a future, done once it has stopped.'''
+        for sink in self._sinks:
+            sink.abandon()
+        return self._loop.run_in_executor(None, self._stop)
+
+    def wait(self):
+        '''Return a future, done when the flowgraph finishes on its own.'''
+        return self._loop.run_in_executor(None, self.flowgraph.wait)
+
+    def _stop(self):
+        self.flowgraph.stop()
+        self.flowgraph.wait()
+
+
+__all__ = [
+    'text_sink_b',
+    'text_stream',
+    'decoder',
+]
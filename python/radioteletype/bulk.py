@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+'''Encode and decode Baudot and varicode in bulk, without a flowgraph.
+
+These functions use the same C++ codecs as the encoder and decoder blocks.
+Input may be bytes, a bytearray or a NumPy array, and the result is a NumPy
+array of uint8. The codecs read the input and write the result in place, so
+nothing is copied on the way in or out.
+
+Each function also returns the codec's state. Passing it to the next call
+continues where the previous one left off, so a long stream can be processed
+in pieces:
+
+    text, state = varicode_decode(bits[:1000])
+    more, state = varicode_decode(bits[1000:], state)
+'''
+
+import numpy
+
+from radioteletype_swig import (
+    baudot_decoder,
+    baudot_encoder,
+    varicode_decoder,
+    varicode_encoder,
+)
+
+LETTERS = baudot_decoder.LETTERS
+FIGURES = baudot_decoder.FIGURES
+
+
+def _input(data):
+    if isinstance(data, type(u'')):
+        return data.encode('latin-1')
+    if isinstance(data, numpy.ndarray):
+        # only copies if the array isn't already contiguous bytes
+        return numpy.ascontiguousarray(data, numpy.uint8)
+    return data
+
+
+def _run(method, data, size):
+    out = numpy.empty(size, numpy.uint8)
+    return out[:method(data, out)]
+
+
+def baudot_decode(codes, state=LETTERS):
+    '''Decode Baudot codes to ASCII. Returns (chars, state).'''
+    codes = _input(codes)
+    decoder = baudot_decoder()
+    decoder.set_state(state)
+    chars = _run(decoder.decode, codes, len(codes))
+    return chars, decoder.state()
+
+
+def baudot_encode(text, state=LETTERS):
+    '''Encode ASCII as Baudot codes. Returns (codes, state).
+
+    Characters with no Baudot code are dropped.
+    '''
+    text = _input(text)
+    encoder = baudot_encoder()
+    encoder.set_state(state)
+    codes = _run(encoder.encode, text, 2 * len(text))
+    return codes, encoder.state()
+
+
+def varicode_decode(bits, state=0):
+    '''Decode varicode bits, one per byte, to ASCII. Returns (chars, state).
+
+    Invalid codes are dropped.
+    '''
+    bits = _input(bits)
+    decoder = varicode_decoder()
+    decoder.set_state(state)
+    chars = _run(decoder.decode, bits, len(bits) // 3 + 1)
+    return chars, decoder.state()
+
+
+def varicode_encode(text):
+    '''Encode ASCII as varicode bits, one per byte.
+
+    Each character is followed by two 0 bits, so there is no state to carry
+    between calls.
+    '''
+    text = _input(text)
+    return _run(
+        varicode_encoder.encode, text, varicode_encoder.MAX_BITS * len(text))
+
+
+__all__ = [
+    'LETTERS',
+    'FIGURES',
+    'baudot_decode',
+    'baudot_encode',
+    'varicode_decode',
+    'varicode_encode',
+]
@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from math import exp
+from math import exp, pi
 
-from gnuradio import blocks, digital
 from gnuradio import gr
-from gnuradio.filter import freq_xlating_fft_filter_ccc
 from radioteletype import filters
 from radioteletype_swig import (
     async_word_extractor_bb,
     baudot_decode_bb,
+    sliding_dft_cf,
     varicode_decode_bb,
 )
 
@@ -32,6 +31,8 @@ class rms_agc_cc(gr.hier_block2):
     where t is the time constant, in number of samples.
     '''
     def __init__(self, alpha=0.01):
+        from gnuradio import blocks
+
         gr.hier_block2.__init__(
             self,
             "RMS AGC",
@@ -70,6 +71,28 @@ class rtty_demod_cb(gr.hier_block2):
         - demodulating the bits
         - finding the characters between the start and stop bits
         - decoding Baudot to ASCII
+
+    Decoded text is also published a line at a time on the "pdus" message
+    port, with the midpoint of the mark and space frequencies as "freq" in
+    the metadata. See baudot_decode_bb for details. A message to the "flush"
+    port publishes a partial line immediately.
+
+    low_latency=True puts the word extractor and Baudot decoder in low
+    latency mode, so each character is output as soon as its stop bit is
+    received, at the cost of more scheduler overhead.
+
+    instrument=True tags the input with the wall clock time and measures how
+    long after its first bit each character is decoded. latency_percentiles()
+    reports the latency of recent characters while the flowgraph runs. See
+    radioteletype.latency. Don't use it with a source which sets rx_time.
+
+    afc=True retunes the mark and space filters to follow a drifting signal,
+    by up to afc_max_offset Hz either way. afc_time_const is the time
+    constant of the correction in seconds. get_afc_offset() returns the
+    current correction. See radioteletype.afc.
+
+    tone_filter and multistage select the mark and space filters. See
+    tone_detector_cf.
     '''
 
     def __init__(
@@ -80,7 +103,17 @@ class rtty_demod_cb(gr.hier_block2):
         mark_freq=2295,
         samp_rate=48000,
         space_freq=2125,
+        order=2,
+        low_latency=False,
+        instrument=False,
+        afc=False,
+        afc_time_const=5.0,
+        afc_max_offset=100.0,
+        tone_filter='raised_cos',
+        multistage=False,
     ):
+        from gnuradio import blocks
+
         gr.hier_block2.__init__(
             self, "RTTY Demod",
             gr.io_signature(1, 1, gr.sizeof_gr_complex),
@@ -96,6 +129,15 @@ class rtty_demod_cb(gr.hier_block2):
         self.mark_freq = mark_freq
         self.samp_rate = samp_rate
         self.space_freq = space_freq
+        self.order = order
+        self.low_latency = low_latency
+        self.instrument = instrument
+        self.afc = afc
+        self.afc_time_const = afc_time_const
+        self.afc_max_offset = afc_max_offset
+        self.afc_offset = 0.0
+        self.tone_filter = tone_filter
+        self.multistage = multistage
 
         ##################################################
         # Blocks
@@ -105,25 +147,51 @@ class rtty_demod_cb(gr.hier_block2):
         self._float_to_char = blocks.float_to_char(1, 1)
 
         self._space_tone_detector = tone_detector_cf(
-            decimation, space_freq, samp_rate, baud, 0.35
+            decimation, space_freq, samp_rate, baud, alpha, order,
+            baseband=afc, tone_filter=tone_filter, multistage=multistage,
         )
 
         self._mark_tone_detector = tone_detector_cf(
-            decimation, mark_freq, samp_rate, baud, 0.35
+            decimation, mark_freq, samp_rate, baud, alpha, order,
+            baseband=afc, tone_filter=tone_filter, multistage=multistage,
         )
 
         self._baudot_decode = baudot_decode_bb()
+        self._baudot_decode.set_center_freq((mark_freq + space_freq) / 2.0)
 
         self._word_extractor = async_word_extractor_bb(
             5, samp_rate/decimation, baud)
 
+        self.set_low_latency(low_latency)
+
         ##################################################
         # Connections
         ##################################################
         self.connect(self._word_extractor, self._baudot_decode, self)
 
-        self.connect(self, self._mark_tone_detector, self._subtract)
-        self.connect(self, self._space_tone_detector, (self._subtract, 1))
+        if instrument:
+            from radioteletype import latency
+            self._tagger = latency.wallclock_tagger(samp_rate=samp_rate)
+            self._latency_probe = latency.latency_probe_b(window=10000)
+            self.connect(self, self._tagger)
+            self.connect(self._baudot_decode, self._latency_probe)
+            source = self._tagger
+        else:
+            source = self
+
+        self.connect(source, self._mark_tone_detector, self._subtract)
+        self.connect(source, self._space_tone_detector, (self._subtract, 1))
+
+        if afc:
+            from radioteletype.afc import fsk_afc_c
+            self._afc = fsk_afc_c(
+                samp_rate / decimation,
+                self._retune,
+                time_const=afc_time_const,
+                max_offset=afc_max_offset,
+            )
+            self.connect((self._mark_tone_detector, 1), (self._afc, 0))
+            self.connect((self._space_tone_detector, 1), (self._afc, 1))
 
         self.connect(
             self._subtract,
@@ -136,11 +204,78 @@ class rtty_demod_cb(gr.hier_block2):
         self.connect(self._mark_tone_detector, (self, 2))
         self.connect(self._space_tone_detector, (self, 3))
 
+        self.message_port_register_hier_in('flush')
+        self.message_port_register_hier_out('pdus')
+        self.msg_connect(self, 'flush', self._baudot_decode, 'flush')
+        self.msg_connect(self._baudot_decode, 'pdus', self, 'pdus')
+
     def get_alpha(self):
         return self.alpha
 
     def set_alpha(self, alpha):
         self.alpha = alpha
+        self._mark_tone_detector.set_alpha(alpha)
+        self._space_tone_detector.set_alpha(alpha)
+
+    def get_order(self):
+        return self.order
+
+    def set_order(self, order):
+        self.order = order
+        self._mark_tone_detector.set_order(order)
+        self._space_tone_detector.set_order(order)
+
+    def get_low_latency(self):
+        return self.low_latency
+
+    def set_low_latency(self, low_latency):
+        self.low_latency = low_latency
+        self._word_extractor.set_low_latency(low_latency)
+        self._baudot_decode.set_low_latency(low_latency)
+
+    def latency_percentiles(self, ps=None):
+        '''Return recent character latencies in seconds, by percentile.
+
+        Only available with instrument=True. ps defaults to
+        latency.DEFAULT_PERCENTILES.
+        '''
+        if ps is None:
+            return self._latency_probe.percentiles()
+        return self._latency_probe.percentiles(ps)
+
+    def get_afc_offset(self):
+        return self.afc_offset
+
+    def get_afc_time_const(self):
+        return self.afc_time_const
+
+    def set_afc_time_const(self, afc_time_const):
+        self.afc_time_const = afc_time_const
+        if self.afc:
+            self._afc.set_time_const(afc_time_const)
+
+    def get_afc_max_offset(self):
+        return self.afc_max_offset
+
+    def set_afc_max_offset(self, afc_max_offset):
+        self.afc_max_offset = afc_max_offset
+        if self.afc:
+            self._afc.set_max_offset(afc_max_offset)
+
+    def _retune(self, afc_offset):
+        self.afc_offset = afc_offset
+        self._mark_tone_detector.set_center_freq(self.mark_freq + afc_offset)
+        self._space_tone_detector.set_center_freq(
+            self.space_freq + afc_offset)
+        self._baudot_decode.set_center_freq(
+            (self.mark_freq + self.space_freq) / 2.0 + afc_offset)
+
+    def _retune_manual(self):
+        # An operator retuning starts the AFC over from the new frequencies.
+        if self.afc:
+            self._afc.reset()
+        else:
+            self._retune(0.0)
 
     def get_baud(self):
         return self.baud
@@ -161,6 +296,7 @@ class rtty_demod_cb(gr.hier_block2):
 
     def set_mark_freq(self, mark_freq):
         self.mark_freq = mark_freq
+        self._retune_manual()
 
     def get_samp_rate(self):
         return self.samp_rate
@@ -174,77 +310,311 @@ class rtty_demod_cb(gr.hier_block2):
 
     def set_space_freq(self, space_freq):
         self.space_freq = space_freq
+        self._retune_manual()
 
 
 class tone_detector_cf(gr.hier_block2):
-    """Detector for a single tone of an FSK signal."""
-    def __init__(self, decim, center_freq, sample_rate, baud_rate, alpha=0.35):
+    """Detector for a single tone of an FSK signal.
+
+    `tone_filter` selects the shaping filter:
+
+        - 'raised_cos', the default, is an `filters.extended_raised_cos`
+          filter selected by `alpha` and `order`, applied at the input rate
+          with the FFT. The shaping filter only needs a few samples per
+          symbol, so multistage=True, when there are many more, first
+          decimates the input by a short lowpass filter, runs the shaping
+          filter at the lower rate, and interpolates its output back up to
+          the output rate if need be. That's much cheaper, but the lowpass
+          filters add to the delay, and set_nthreads() can't be used.
+        - 'boxcar' mixes the tone down to 0 Hz and takes a moving average
+          one symbol long, which costs a few operations per sample however
+          long the symbol. `order` moving averages are cascaded: 1 is the
+          matched filter for RTTY, and each one more narrows the frequency
+          response. `alpha` is ignored.
+        - 'sliding_dft' is the same matched filter as a 'boxcar' of order
+          1, computed in a single native block, `sliding_dft_cf`, which
+          only takes the power of the samples it outputs. It's the cheapest
+          when there are many tones to detect.
+          `alpha` and `order` are ignored.
+
+    With baseband=True, the filtered signal, mixed down so the tone is at
+    0 Hz, is also output on a second port.
+    """
+    _tone_filters = ('raised_cos', 'boxcar', 'sliding_dft')
+
+    # The raised cosine shaping filter runs at no fewer samples per symbol
+    # than this.
+    _shaping_samples_per_sym = 8
+
+    def __init__(
+        self,
+        decim,
+        center_freq,
+        sample_rate,
+        baud_rate,
+        alpha=0.35,
+        order=2,
+        baseband=False,
+        tone_filter='raised_cos',
+        multistage=False,
+    ):
+        from gnuradio import blocks
+
+        if tone_filter not in self._tone_filters:
+            raise ValueError('unknown tone_filter %r' % (tone_filter,))
+
+        if baseband:
+            output_signature = gr.io_signature2(
+                2, 2, gr.sizeof_float, gr.sizeof_gr_complex)
+        else:
+            output_signature = gr.io_signature(1, 1, gr.sizeof_float)
+
         gr.hier_block2.__init__(
             self,
             "tone_detector_cf",
             gr.io_signature(1, 1, gr.sizeof_gr_complex),
-            gr.io_signature(1, 1, gr.sizeof_float),
+            output_signature,
         )
 
+        self.decim = int(decim)
         self.center_freq = center_freq
         self.sample_rate = sample_rate
         self.baud_rate = baud_rate
         self.alpha = alpha
+        self.order = order
+        self.baseband = baseband
+        self.tone_filter = tone_filter
+        self.multistage = multistage
+        self._decimator = None
+        self._interpolator = None
+
+        if tone_filter == 'sliding_dft':
+            self._filter = sliding_dft_cf(
+                self.decim,
+                float(center_freq),
+                float(sample_rate),
+                self._symbol_length())
+            self.connect(self, self._filter, self)
+            if baseband:
+                self.connect((self._filter, 1), (self, 1))
+            return
 
-        self._filter = freq_xlating_fft_filter_ccc(
-            int(decim),
-            self._taps(),
-            float(center_freq),
-            float(sample_rate))
         self._mag = blocks.complex_to_mag_squared()
 
-        self.connect(self, self._filter, self._mag, self)
+        if tone_filter == 'boxcar':
+            self._rotator = blocks.rotator_cc(self._phase_inc())
+            self._keep = blocks.keep_one_in_n(
+                gr.sizeof_gr_complex, self.decim)
+            self._averages = []
+            self._connect_boxcar()
+        else:
+            self._connect_raised_cos()
+
+    def _bandwidth(self):
+        # Each order of extended raised cosine is twice as wide as the last.
+        return (self.baud_rate * (1 + self.alpha) / 2 *
+                2 ** max(0, int(self.order) - 1))
+
+    def _stages(self):
+        '''Return the decimation before the shaping filter, the decimation
+        of the shaping filter, and the interpolation after it.'''
+        shaping_rate = max(
+            self.baud_rate * self._shaping_samples_per_sym,
+            4 * self._bandwidth())
+        limit = int(self.sample_rate // shaping_rate)
+        if not self.multistage or limit < 2:
+            return 1, self.decim, 1
+        if limit >= self.decim:
+            interp = limit // self.decim
+            return self.decim * interp, 1, interp
+        first = max(d for d in range(1, limit + 1) if self.decim % d == 0)
+        return first, self.decim // first, 1
+
+    def _decimator_taps(self):
+        first, _, _ = self._stage_plan
+        return filters.resampling_lowpass(
+            1.0, self.sample_rate, self.sample_rate / first,
+            self._bandwidth())
+
+    def _interpolator_taps(self):
+        first, _, interp = self._stage_plan
+        return filters.resampling_lowpass(
+            interp, self.sample_rate / self.decim, self.sample_rate / first,
+            self._bandwidth())
+
+    def _connect_raised_cos(self):
+        from gnuradio.filter import (
+            fir_filter_ccf,
+            freq_xlating_fft_filter_ccc,
+            freq_xlating_fir_filter_ccf,
+            interp_fir_filter_ccf,
+        )
+
+        self._stage_plan = self._stages()
+        first, decim, interp = self._stage_plan
+
+        if first == 1:
+            self._decimator = None
+            self._filter = freq_xlating_fft_filter_ccc(
+                decim,
+                self._taps(),
+                float(self.center_freq),
+                float(self.sample_rate))
+            our_blocks = [self._filter]
+        else:
+            self._decimator = freq_xlating_fir_filter_ccf(
+                first,
+                self._decimator_taps(),
+                float(self.center_freq),
+                float(self.sample_rate))
+            self._filter = fir_filter_ccf(decim, self._taps())
+            our_blocks = [self._decimator, self._filter]
+
+        if interp > 1:
+            self._interpolator = interp_fir_filter_ccf(
+                interp, self._interpolator_taps())
+            our_blocks.append(self._interpolator)
+        else:
+            self._interpolator = None
+
+        self.connect(self, *(our_blocks + [self._mag, self]))
+        if self.baseband:
+            self.connect(our_blocks[-1], (self, 1))
 
     def _taps(self):
-        samples_per_sym = self.sample_rate / self.baud_rate
+        sampling_freq = self.sample_rate / self._stage_plan[0]
+        samples_per_sym = sampling_freq / self.baud_rate
         taps = filters.extended_raised_cos(
             gain=1.0,
-            sampling_freq=self.sample_rate,
+            sampling_freq=sampling_freq,
             symbol_rate=self.baud_rate,
             alpha=self.alpha,
             ntaps=int(samples_per_sym)*11,
-            order=2)
+            order=self.order)
         return taps
 
+    def _symbol_length(self):
+        return max(1, int(round(self.sample_rate / self.baud_rate)))
+
+    def _phase_inc(self):
+        return -2 * pi * self.center_freq / self.sample_rate
+
+    def _connect_boxcar(self):
+        from gnuradio import blocks
+
+        # The scale gives each moving average unity gain at DC, like the
+        # raised cosine taps.
+        length = self._symbol_length()
+        self._averages = [
+            blocks.moving_average_cc(length, 1.0 / length, 4000)
+            for _ in range(max(1, int(self.order)))
+        ]
+        self.connect(self, self._rotator, *(
+            self._averages + [self._keep, self._mag, self]))
+        if self.baseband:
+            self.connect(self._keep, (self, 1))
+
     def _refresh(self):
+        if self.tone_filter == 'boxcar':
+            if len(self._averages) != max(1, int(self.order)):
+                self.lock()
+                self.disconnect_all()
+                self._connect_boxcar()
+                self.unlock()
+            return
+        if self.tone_filter == 'sliding_dft':
+            # nothing depends on alpha or order
+            return
+        if self._stages() != self._stage_plan:
+            self.lock()
+            self.disconnect_all()
+            self._connect_raised_cos()
+            self.unlock()
+            return
         self._filter.set_taps(self._taps())
-        self._filter.set_decim(self.decim)
-        self._filter.set_center_freq(self.center_freq)
+        if self._decimator is None:
+            self._filter.set_decim(self.decim)
+            self._filter.set_center_freq(self.center_freq)
+            return
+        self._decimator.set_taps(self._decimator_taps())
+        if self._interpolator is not None:
+            self._interpolator.set_taps(self._interpolator_taps())
 
     def set_center_freq(self, center_freq):
+        # the taps don't depend on the center frequency
         self.center_freq = center_freq
-        self._refresh()
+        if self.tone_filter == 'boxcar':
+            self._rotator.set_phase_inc(self._phase_inc())
+        elif self._decimator is not None:
+            self._decimator.set_center_freq(center_freq)
+        else:
+            self._filter.set_center_freq(center_freq)
 
     def set_alpha(self, alpha):
         self.alpha = alpha
         self._refresh()
 
+    def set_order(self, order):
+        self.order = order
+        self._refresh()
+
+    def _blocks(self):
+        if self.tone_filter == 'boxcar':
+            return [self._rotator] + self._averages + [self._keep, self._mag]
+        if self.tone_filter == 'sliding_dft':
+            return [self._filter]
+        return [
+            block
+            for block in (self._decimator, self._filter, self._interpolator)
+            if block is not None
+        ] + [self._mag]
+
     def set_nthreads(self, nthreads):
+        if self.tone_filter != 'raised_cos' or self._decimator is not None:
+            raise ValueError(
+                'only the single stage raised_cos filter runs in threads')
         self._filter.set_nthreads(nthreads)
         self._mag.set_nthreads(nthreads)
 
     def declare_sample_delay(self, samp_delay):
-        self._filter.declare_sample_delay(samp_delay)
-        self._mag.declare_sample_delay(samp_delay)
+        for block in self._blocks():
+            block.declare_sample_delay(samp_delay)
 
 
 class _psk31_sync_base(gr.hier_block2):
+    # PSK31 symbols per second
+    baud = 31.25
+
+    # Receive filters to choose from for the polyphase clock sync
+    _sync_filters = {
+        'compromise': filters.psk31_compromise,
+        'matched': filters.psk31_matched,
+        'pskcore': filters.pskcore,
+    }
+
     def __init__(
         self,
         samp_per_sym=4,
         sync_bandwidth=.6,
         agc_time_const=8,
         sync_phases=32,
+        sync_filter='compromise',
+        fll_bandwidth=0,
+        fll_range=50,
+        preamble=False,
+        preamble_sync_bandwidth=1.0,
     ):
+        from gnuradio import digital
+
         self.agc_time_const = agc_time_const
         self.samp_per_sym = samp_per_sym
         self.sync_bandwidth = sync_bandwidth
         self.sync_phases = sync_phases
+        self.sync_filter = sync_filter
+        self.fll_bandwidth = fll_bandwidth
+        self.fll_range = fll_range
+        self.preamble = preamble
+        self.preamble_sync_bandwidth = preamble_sync_bandwidth
 
         self._clock_sync = digital.pfb_clock_sync_ccf(
             sps=samp_per_sym,
@@ -259,12 +629,25 @@ class _psk31_sync_base(gr.hier_block2):
         self._pre_sync_agc = rms_agc_cc(self._alpha() / samp_per_sym)
         self._post_sync_agc = rms_agc_cc(self._alpha())
 
-        self.connect(
-            self,
-            self._pre_sync_agc,
-            self._clock_sync,
-            self._post_sync_agc,
-        )
+        our_blocks = [self, self._pre_sync_agc]
+
+        if fll_bandwidth:
+            # PSK31's cosine envelope has a rolloff of 1.
+            self._fll = digital.fll_band_edge_cc(
+                samp_per_sym, 1.0, 4 * samp_per_sym + 1, fll_bandwidth)
+            self._set_fll_range()
+            our_blocks.append(self._fll)
+        else:
+            self._fll = None
+
+        if preamble:
+            from radioteletype.preamble import psk31_preamble_detector_c
+            self._preamble_detector = psk31_preamble_detector_c(
+                samp_per_sym, self._preamble_start, self._preamble_end)
+            our_blocks.append(self._preamble_detector)
+
+        our_blocks.extend([self._clock_sync, self._post_sync_agc])
+        self.connect(*our_blocks)
 
     def _reset(self):
         self._pre_sync_agc.set_alpha(self._alpha() / self.samp_per_sym)
@@ -274,6 +657,15 @@ class _psk31_sync_base(gr.hier_block2):
         taps = self._clock_sync_taps(self.samp_per_sym, self.sync_phases)
         self._clock_sync.update_taps(taps)
 
+        if self._fll is not None:
+            self._fll.set_loop_bandwidth(self.fll_bandwidth)
+            self._set_fll_range()
+
+    def _set_fll_range(self):
+        max_freq = self._hz_to_radians(self.fll_range)
+        self._fll.set_max_freq(max_freq)
+        self._fll.set_min_freq(-max_freq)
+
     def get_agc_time_const(self):
         return self.agc_time_const
 
@@ -288,12 +680,58 @@ class _psk31_sync_base(gr.hier_block2):
         self.sync_bandwidth = sync_bandwidth
         self._reset()
 
+    def get_sync_filter(self):
+        return self.sync_filter
+
+    def set_sync_filter(self, sync_filter):
+        self.sync_filter = sync_filter
+        self._reset()
+
+    def get_fll_bandwidth(self):
+        return self.fll_bandwidth
+
+    def set_fll_bandwidth(self, fll_bandwidth):
+        self.fll_bandwidth = fll_bandwidth
+        self._reset()
+
+    def get_fll_range(self):
+        return self.fll_range
+
+    def set_fll_range(self, fll_range):
+        self.fll_range = fll_range
+        self._reset()
+
+    def get_preamble_sync_bandwidth(self):
+        return self.preamble_sync_bandwidth
+
+    def set_preamble_sync_bandwidth(self, preamble_sync_bandwidth):
+        self.preamble_sync_bandwidth = preamble_sync_bandwidth
+
+    def _preamble_start(self, phase, freq):
+        # Every symbol of the preamble is a transition, so the clock sync
+        # can afford a wide loop until the data starts. This happens about
+        # when the preamble reaches the clock sync, which is near enough for
+        # a loop bandwidth.
+        self._clock_sync.set_loop_bandwidth(self.preamble_sync_bandwidth)
+
+    def _preamble_end(self):
+        self._clock_sync.set_loop_bandwidth(self.sync_bandwidth)
+
+    def get_fll_frequency(self):
+        '''Return the offset found by the FLL, in Hz.'''
+        if self._fll is None:
+            return 0.0
+        return self._fll.get_frequency() / self._hz_to_radians(1)
+
+    def _hz_to_radians(self, freq):
+        # radians per sample at the input
+        return 2 * pi * freq / (self.samp_per_sym * self.baud)
+
     def _alpha(self):
         return 1.0-exp(-1.0/self.agc_time_const)
 
-    @staticmethod
-    def _clock_sync_taps(samp_per_sym, phases):
-        return filters.psk31_compromise(samp_per_sym, phases)
+    def _clock_sync_taps(self, samp_per_sym, phases):
+        return self._sync_filters[self.sync_filter](samp_per_sym, phases)
 
 
 class psk31_coherent_demodulator_cc(_psk31_sync_base):
@@ -302,6 +740,30 @@ class psk31_coherent_demodulator_cc(_psk31_sync_base):
     The output is sampled at 1 sample per symbol. If the output is going to the
     differential decoder the bits will need to be reversed, because in PSK31
     coding a phase reversal is 0.
+
+    `sync_filter` selects the receive filter used by the clock sync:
+    'compromise' (see `filters.psk31_compromise`), 'matched' or 'pskcore'.
+
+    The Costas loop only pulls in signals within a few hertz. A nonzero
+    `fll_bandwidth` adds a band edge frequency locked loop ahead of the clock
+    sync, which quickly finds signals up to `fll_range` Hz off frequency and
+    leaves the Costas loop only the residual phase error. Something around
+    0.01 to 0.05 is reasonable. The input must be sampled fast enough to pass
+    the signal when it is off frequency: at 4 samples per symbol, nothing
+    beyond 62.5 Hz from the center survives. get_fll_frequency() returns the
+    offset found. The FLL is only built if fll_bandwidth is nonzero when the
+    block is made.
+
+    preamble=True watches for the phase reversals sent at the start of each
+    transmission. When they are found, the Costas loop is set to the carrier
+    phase and frequency measured from them, and the clock sync's loop
+    bandwidth is raised to `preamble_sync_bandwidth` until the data starts,
+    so the first characters aren't lost while the loops settle. The
+    estimate is tagged on the sample it was made at, and the Costas loop, a
+    psk31_costas_loop_cc in this case, applies it when that sample arrives.
+    The frequency is only measured within about 3.9 Hz of the carrier, as it
+    reaches the detector after the FLL if there is one. Further off, only
+    the phase is set. See radioteletype.preamble.
     '''
     def __init__(
         self,
@@ -310,7 +772,14 @@ class psk31_coherent_demodulator_cc(_psk31_sync_base):
         costas_bandwidth=0.15,
         agc_time_const=8,
         sync_phases=32,
+        sync_filter='compromise',
+        fll_bandwidth=0,
+        fll_range=50,
+        preamble=False,
+        preamble_sync_bandwidth=1.0,
     ):
+        from gnuradio import digital
+
         gr.hier_block2.__init__(
             self, "PSK31 Coherent Demodulator",
             gr.io_signature(1, 1, gr.sizeof_gr_complex),
@@ -323,10 +792,20 @@ class psk31_coherent_demodulator_cc(_psk31_sync_base):
             sync_bandwidth,
             agc_time_const,
             sync_phases,
+            sync_filter,
+            fll_bandwidth,
+            fll_range,
+            preamble,
+            preamble_sync_bandwidth,
         )
 
         self.costas_bandwidth = costas_bandwidth
-        self._costas_loop = digital.costas_loop_cc(costas_bandwidth, 2, True)
+        if preamble:
+            from radioteletype.preamble import psk31_costas_loop_cc
+            self._costas_loop = psk31_costas_loop_cc(costas_bandwidth)
+        else:
+            self._costas_loop = digital.costas_loop_cc(
+                costas_bandwidth, 2, True)
 
         self._reset()
 
@@ -349,6 +828,14 @@ class psk31_coherent_demodulator_cc(_psk31_sync_base):
 
 
 class psk31_incoherent_demodulator_cc(_psk31_sync_base):
+    '''Demodulate PSK31 by comparing the phase of each symbol to the last.
+
+    The parameters are as for psk31_coherent_demodulator_cc, but there is no
+    Costas loop, so costas_bandwidth is ignored, and preamble=True only speeds
+    up the clock sync. Differential detection tolerates small frequency
+    errors, and `fll_bandwidth` extends that to offsets of up to `fll_range`
+    Hz.
+    '''
     def __init__(
         self,
         samp_per_sym=4,
@@ -356,7 +843,14 @@ class psk31_incoherent_demodulator_cc(_psk31_sync_base):
         costas_bandwidth=0.15,
         agc_time_const=8,
         sync_phases=32,
+        sync_filter='compromise',
+        fll_bandwidth=0,
+        fll_range=50,
+        preamble=False,
+        preamble_sync_bandwidth=1.0,
     ):
+        from gnuradio import blocks
+
         gr.hier_block2.__init__(
             self, "PSK31 Incoherent Demodulator",
             gr.io_signature(1, 1, gr.sizeof_gr_complex),
@@ -369,6 +863,11 @@ class psk31_incoherent_demodulator_cc(_psk31_sync_base):
             sync_bandwidth,
             agc_time_const,
             sync_phases,
+            sync_filter,
+            fll_bandwidth,
+            fll_range,
+            preamble,
+            preamble_sync_bandwidth,
         )
 
         self._multiply = blocks.multiply_conjugate_cc(1)
@@ -403,8 +902,15 @@ class psk31_constellation_decoder_cb(gr.hier_block2):
     appropriate for a coherent detector like psk31_coherent_demodulator_cc.
     differential_decode=False omits the differential decoder, appropriate for
     incoherent demodulators (to be implemented...)
+
+    With varicode_decode=True, decoded text is also published a line at a
+    time on the "pdus" message port. See varicode_decode_bb for details.
+    low_latency=True puts the varicode decoder in low latency mode.
     '''
-    def __init__(self, varicode_decode=True, differential_decode=True):
+    def __init__(self, varicode_decode=True, differential_decode=True,
+                 low_latency=False):
+        from gnuradio import blocks, digital
+
         gr.hier_block2.__init__(
             self, "Coherent PSK31 Demodulator",
             gr.io_signature(1, 1, gr.sizeof_gr_complex*1),
@@ -426,11 +932,19 @@ class psk31_constellation_decoder_cb(gr.hier_block2):
             ])
 
         if varicode_decode:
-            our_blocks.append(varicode_decode_bb())
+            self._varicode_decode = varicode_decode_bb()
+            self._varicode_decode.set_low_latency(low_latency)
+            our_blocks.append(self._varicode_decode)
 
         our_blocks.append(self)
         self.connect(*our_blocks)
 
+        if varicode_decode:
+            self.message_port_register_hier_in('flush')
+            self.message_port_register_hier_out('pdus')
+            self.msg_connect(self, 'flush', self._varicode_decode, 'flush')
+            self.msg_connect(self._varicode_decode, 'pdus', self, 'pdus')
+
 
 __all__ = [
     'async_word_extractor_bb',
@@ -438,6 +952,7 @@ __all__ = [
     'psk31_constellation_decoder_cb',
     'psk31_coherent_demodulator_cc',
     'rtty_demod_cb',
+    'sliding_dft_cf',
     'tone_detector_cf',
     'varicode_decode_bb',
     'rms_agc_cc',
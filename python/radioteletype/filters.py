@@ -2,8 +2,6 @@ from __future__ import division
 
 from math import sin, cos, pi
 
-from gnuradio.filter import firdes
-
 
 def normalized_sinc(x):
     x *= pi
@@ -102,6 +100,32 @@ pskcore_filter_taps = (
     4.3453566e-005)
 
 
+def pskcore(samp_per_sym, phases=1):
+    '''Return `pskcore_filter_taps` resampled to `samp_per_sym`.
+
+    `phases` interpolates the filter for polyphase clock sync, as with
+    `psk31_compromise`. The original taps are sampled at 16 samples per
+    symbol; other rates are obtained by linear interpolation, which is
+    adequate since the impulse response is smooth at that rate.
+    '''
+    original_rate = 16
+    rate = samp_per_sym * phases
+    half_width = (len(pskcore_filter_taps) - 1) // 2
+    half_ntaps = int(half_width * rate / original_rate)
+
+    taps = []
+    for i in range(-half_ntaps, half_ntaps + 1):
+        position = i * original_rate / rate + half_width
+        index = int(position)
+        fraction = position - index
+        tap = pskcore_filter_taps[index]
+        if fraction:
+            tap += fraction * (pskcore_filter_taps[index + 1] - tap)
+        taps.append(tap)
+
+    return _normalize_gain(taps, phases)
+
+
 def psk31_compromise(samp_per_sym, phases=1):
     '''Return a receive filter designed to minimize ISI.
 
@@ -136,6 +160,9 @@ def psk31_compromise(samp_per_sym, phases=1):
     The captured signal energy is 0.23 dB below the matched filter case. A
     cursory estimation puts ISI on par with `pskcore_filter_taps`.
     '''
+    # imported here so the rest of this module works without GNU Radio
+    from gnuradio.filter import firdes
+
     return firdes.low_pass(
         # Polyphase clock sync splits these taps into `phases` phases,
         # so the gain must be `phases` for each to have unity gain.
@@ -158,6 +185,25 @@ def psk31_compromise(samp_per_sym, phases=1):
     )
 
 
+def resampling_lowpass(gain, sampling_freq, low_rate, passband):
+    '''Return lowpass taps for decimating to, or interpolating from,
+    `low_rate`.
+
+    Frequencies up to `passband` are passed, and everything which would alias
+    into the passband at `low_rate` is stopped. The taps are at
+    `sampling_freq`, the higher of the two rates.
+    '''
+    from gnuradio.filter import firdes
+
+    stopband = low_rate - passband
+    return firdes.low_pass(
+        gain=gain,
+        sampling_freq=sampling_freq,
+        cutoff_freq=low_rate / 2,
+        transition_width=stopband - passband,
+    )
+
+
 def psk31_matched(samp_per_sym, phases=1):
     '''Return matched filter taps for PSK31
 
@@ -165,6 +211,8 @@ def psk31_matched(samp_per_sym, phases=1):
     greater than 1 interpolates the filter for use with polyphase clock sync,
     etc.
     '''
+    from gnuradio.filter import firdes
+
     window_size = 2 * samp_per_sym * phases + 1
     taps = firdes.window(firdes.WIN_HANN, window_size, 0)[:-1]
     return _normalize_gain(taps, phases)
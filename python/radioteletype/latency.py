@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+'''Measure how long decoded characters take to leave a receiver.
+
+wallclock_tagger tags the stream going into a receiver with rx_time, set to
+the wall clock time when the samples were handed to the receiver. The
+radioteletype decoders carry rx_time through to each decoded character,
+computed for the character's first bit, so latency_probe_b can tell how long
+after its first bit was available each character came out.
+
+instrumented_receiver_cb puts both around any receiver chain, and
+rtty_demod_cb(instrument=True) does the same inside the RTTY demodulator.
+Either reports latency percentiles while the flowgraph runs.
+'''
+
+from __future__ import division
+
+import collections
+import threading
+import time
+
+import numpy
+import pmt
+from gnuradio import gr
+
+
+RX_TIME = pmt.intern('rx_time')
+
+
+def time_tuple(seconds):
+    '''Return seconds as a UHD style (full seconds, fractional seconds) tuple.'''
+    full = int(seconds)
+    return pmt.make_tuple(
+        pmt.from_uint64(full), pmt.from_double(seconds - full))
+
+
+def tuple_time(value):
+    '''Return the seconds in a UHD style time tuple.'''
+    return (pmt.to_uint64(pmt.tuple_ref(value, 0)) +
+            pmt.to_double(pmt.tuple_ref(value, 1)))
+
+
+class wallclock_tagger(gr.sync_block):
+    '''Pass samples through, tagging them with the current time as rx_time.
+
+    The first sample of each call to work is tagged. When samp_rate is
+    given, the samples are taken to have arrived at that rate, the newest
+    just now, so the tag is backdated by the time the rest took to arrive.
+    Put a throttle, or real hardware, upstream or the times are meaningless.
+    '''
+
+    def __init__(self, dtype=numpy.complex64, samp_rate=0):
+        gr.sync_block.__init__(
+            self,
+            name='wallclock_tagger',
+            in_sig=[dtype],
+            out_sig=[dtype],
+        )
+        self.samp_rate = samp_rate
+
+    def work(self, input_items, output_items):
+        now = time.time()
+        n = len(input_items[0])
+        output_items[0][:] = input_items[0]
+        if self.samp_rate > 0:
+            now -= (n - 1) / self.samp_rate
+        self.add_item_tag(0, self.nitems_written(0), RX_TIME, time_tuple(now))
+        return n
+
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def percentiles(latencies, ps=DEFAULT_PERCENTILES):
+    '''Return a dict mapping each percentile in ps to a latency in seconds.
+
+    The dict is empty if there are no latencies.
+    '''
+    latencies = list(latencies)
+    if not latencies:
+        return {}
+    return dict(zip(ps, numpy.percentile(latencies, ps)))
+
+
+class latency_probe_b(gr.sync_block):
+    '''Record the latency of each decoded character.
+
+    For every character carrying an rx_time tag, the seconds between that time
+    and when the character reached this block are appended to latencies. With
+    a window, only the latest `window` latencies are kept, so the probe can
+    be left in a long running flowgraph.
+    '''
+
+    def __init__(self, window=None):
+        gr.sync_block.__init__(
+            self,
+            name='latency_probe_b',
+            in_sig=[numpy.uint8],
+            out_sig=None,
+        )
+        self.latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def work(self, input_items, output_items):
+        now = time.time()
+        n = len(input_items[0])
+        start = self.nitems_read(0)
+        tags = self.get_tags_in_range(0, start, start + n, RX_TIME)
+        with self._lock:
+            for tag in tags:
+                self.latencies.append(now - tuple_time(tag.value))
+        return n
+
+    def percentiles(self, ps=DEFAULT_PERCENTILES):
+        '''Return percentiles() of the recorded latencies.'''
+        with self._lock:
+            latencies = list(self.latencies)
+        return percentiles(latencies, ps)
+
+    def reset(self):
+        with self._lock:
+            self.latencies.clear()
+
+
+class instrumented_receiver_cb(gr.hier_block2):
+    '''Measure the latency of a receiver chain.
+
+    The blocks given are connected in series, between a wallclock_tagger at
+    the input and the output, which also goes to a latency_probe_b. The
+    first block must take complex samples and the last output characters
+    with rx_time tags, such as one of the radioteletype decoders:
+
+        rx = instrumented_receiver_cb(
+            psk31_coherent_demodulator_cc(),
+            psk31_constellation_decoder_cb(),
+            samp_rate=samp_rate,
+        )
+
+    samp_rate is passed to the wallclock_tagger.
+
+    The source shouldn't set rx_time itself, since its tags would be mixed
+    with the wall clock ones.
+    '''
+
+    def __init__(self, *receiver, **kwargs):
+        samp_rate = kwargs.pop('samp_rate', 0)
+        window = kwargs.pop('window', 10000)
+        if kwargs:
+            raise TypeError('unexpected keyword arguments: %s' % (
+                ', '.join(sorted(kwargs))))
+
+        gr.hier_block2.__init__(
+            self, 'Instrumented Receiver',
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+            gr.io_signature(1, 1, gr.sizeof_char),
+        )
+
+        self._receiver = receiver
+        self._tagger = wallclock_tagger(samp_rate=samp_rate)
+        self._probe = latency_probe_b(window)
+
+        self.connect(*((self, self._tagger) + receiver + (self,)))
+        self.connect(receiver[-1], self._probe)
+
+    def latency_percentiles(self, ps=DEFAULT_PERCENTILES):
+        '''Return the probe's latency percentiles, in seconds.'''
+        return self._probe.percentiles(ps)
+
+    def reset_latency(self):
+        self._probe.reset()
+
+
+__all__ = [
+    'time_tuple',
+    'tuple_time',
+    'percentiles',
+    'wallclock_tagger',
+    'latency_probe_b',
+    'instrumented_receiver_cb',
+]
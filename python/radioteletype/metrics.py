@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+'''Runtime counters for radioteletype flowgraphs.
+
+block_metrics() collects the counters for one block: items read and written
+on each port, GNU Radio's performance counters, and the character and
+framing counters the radioteletype C++ blocks keep. flowgraph_metrics()
+walks a top block or hierarchical block and does the same for every block
+it finds. prometheus_exporter serves those counters over HTTP in the
+Prometheus text format, so hot channels can be found without attaching a
+profiler.
+
+GNU Radio only updates its performance counters when they are enabled in the
+runtime configuration:
+
+    [PerfCounters]
+    on = True
+'''
+
+from __future__ import division
+
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+from gnuradio import gr
+
+
+# Counters provided by the radioteletype C++ blocks, and their help text.
+_block_counters = (
+    ('words_extracted', 'Words extracted by an asynchronous word extractor'),
+    ('framing_errors', 'Words received without a stop bit'),
+    ('chars_decoded', 'Characters decoded'),
+    ('invalid_codes', 'Invalid codes discarded by a decoder'),
+    ('chars_encoded', 'Characters encoded'),
+    ('chars_dropped', 'Characters with no encoding'),
+)
+
+# Counters kept for every block by the GNU Radio runtime.
+_runtime_counters = (
+    ('items_read', 'counter', 'Items consumed on each input port'),
+    ('items_written', 'counter', 'Items produced on each output port'),
+    ('work_seconds', 'counter', 'Seconds spent in work()'),
+    ('nproduced', 'gauge', 'Average items produced per call to work()'),
+    ('input_buffers_full', 'gauge', 'Average input buffer fullness'),
+    ('output_buffers_full', 'gauge', 'Average output buffer fullness'),
+)
+
+
+def _is_block(obj):
+    return hasattr(obj, 'to_basic_block') and hasattr(obj, 'nitems_written')
+
+
+def _is_hier(obj):
+    return isinstance(obj, (gr.hier_block2, gr.top_block))
+
+
+def _ports(counter):
+    try:
+        return list(counter())
+    except (RuntimeError, TypeError):
+        return []
+
+
+def _items(block, method, nports):
+    items = []
+    for port in range(nports):
+        try:
+            items.append(method(port))
+        except RuntimeError:
+            # not yet connected in a running flowgraph
+            return []
+    return items
+
+
+def block_metrics(block):
+    '''Return a dict of the counters for one block.
+
+    Per-port counters (items_read, items_written, input_buffers_full,
+    output_buffers_full) are lists indexed by port. Counters the block does
+    not provide are omitted.
+    '''
+    metrics = {}
+
+    for name, _ in _block_counters:
+        getter = getattr(block, name, None)
+        if getter is not None:
+            metrics[name] = getter()
+
+    input_full = _ports(getattr(block, 'pc_input_buffers_full', list))
+    output_full = _ports(getattr(block, 'pc_output_buffers_full', list))
+    if input_full:
+        metrics['input_buffers_full'] = input_full
+    if output_full:
+        metrics['output_buffers_full'] = output_full
+
+    ninputs = block.input_signature().max_streams()
+    noutputs = block.output_signature().max_streams()
+    if ninputs < 0:
+        ninputs = len(input_full)
+    if noutputs < 0:
+        noutputs = len(output_full)
+    items_read = _items(block, block.nitems_read, ninputs)
+    items_written = _items(block, block.nitems_written, noutputs)
+    if items_read:
+        metrics['items_read'] = items_read
+    if items_written:
+        metrics['items_written'] = items_written
+
+    try:
+        metrics['nproduced'] = block.pc_nproduced()
+        work_time = block.pc_work_time_total()
+    except (AttributeError, RuntimeError):
+        pass
+    else:
+        tps = getattr(gr, 'high_res_timer_tps', None)
+        if tps is not None:
+            metrics['work_seconds'] = work_time / tps()
+
+    return metrics
+
+
+def _walk(obj, path, seen):
+    for name, value in sorted(vars(obj).items()):
+        if id(value) in seen:
+            continue
+        name = name.lstrip('_')
+        if _is_block(value):
+            seen.add(id(value))
+            yield path + name, value
+        elif _is_hier(value):
+            seen.add(id(value))
+            for item in _walk(value, path + name + '.', seen):
+                yield item
+
+
+def flowgraph_blocks(flowgraph):
+    '''Yield (path, block) for every block reachable from flowgraph.
+
+    Blocks are found through the attributes of flowgraph and, recursively,
+    of any hierarchical blocks it holds. The path is the dotted attribute
+    path with leading underscores removed, such as
+    "rtty.mark_tone_detector.filter".
+    '''
+    return _walk(flowgraph, '', set([id(flowgraph)]))
+
+
+def flowgraph_metrics(flowgraph):
+    '''Return a dict mapping each block's path to its block_metrics().'''
+    return dict(
+        (path, block_metrics(block))
+        for path, block in flowgraph_blocks(flowgraph))
+
+
+def _help():
+    result = dict((name, ('counter', text)) for name, text in _block_counters)
+    result.update(
+        (name, (kind, text)) for name, kind, text in _runtime_counters)
+    return result
+
+
+def prometheus_text(flowgraph, prefix='radioteletype'):
+    '''Format flowgraph_metrics() in the Prometheus text exposition format.'''
+    help_text = _help()
+    samples = {}
+    for path, metrics in flowgraph_metrics(flowgraph).items():
+        for name, value in metrics.items():
+            if isinstance(value, list):
+                for port, port_value in enumerate(value):
+                    labels = 'block="%s",port="%d"' % (path, port)
+                    samples.setdefault(name, []).append((labels, port_value))
+            else:
+                labels = 'block="%s"' % path
+                samples.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(samples):
+        kind, text = help_text.get(name, ('untyped', name))
+        metric = '%s_%s' % (prefix, name)
+        if kind == 'counter':
+            metric += '_total'
+        lines.append('# HELP %s %s' % (metric, text))
+        lines.append('# TYPE %s %s' % (metric, kind))
+        for labels, value in sorted(samples[name]):
+            lines.append('%s{%s} %r' % (metric, labels, float(value)))
+    return '\n'.join(lines) + '\n'
+
+
+class prometheus_exporter(object):
+    '''Serve prometheus_text() for a flowgraph over HTTP.
+
+    The server runs in a daemon thread and answers every GET request with the
+    current counters. It listens on the loopback interface by default, so
+    the counters are only visible to a scraper on the same host.
+    '''
+
+    def __init__(self, flowgraph, port=9464, address='127.0.0.1',
+                 prefix='radioteletype'):
+        self.flowgraph = flowgraph
+        self.prefix = prefix
+        self.server = HTTPServer((address, port), self._handler())
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def _handler(self):
+        exporter = self
+
+        class handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = prometheus_text(
+                    exporter.flowgraph, exporter.prefix).encode('utf-8')
+                self.send_response(200)
+                self.send_header(
+                    'Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+__all__ = [
+    'block_metrics',
+    'flowgraph_blocks',
+    'flowgraph_metrics',
+    'prometheus_text',
+    'prometheus_exporter',
+]
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
-from gnuradio import blocks, gr, digital
-from gnuradio.filter import interp_fir_filter_fcc, interp_fir_filter_fff
-from gnuradio.analog import frequency_modulator_fc
+from gnuradio import gr
 from math import pi
 
-from radioteletype_swig import baudot_encode_bb, varicode_encode_bb
-from radioteletype.filters import psk31_matched
+import radioteletype_swig
+from radioteletype_swig import (
+    async_framer_bb,
+    baudot_encode_bb,
+    cpfsk_mod_bc,
+    varicode_encode_bb,
+)
 
 
 class am_fsk_mod_bc(gr.hier_block2):
@@ -19,6 +22,10 @@ class am_fsk_mod_bc(gr.hier_block2):
 
     However, the output of this modulator will not be constant modulus, and
     thus has more stringent requirements on amplifier linearity.
+
+    The envelopes are shaped and the tones mixed by a single native block,
+    which filters only the mark envelope and derives the space envelope
+    from it.
     """
     def __init__(
         self,
@@ -44,52 +51,21 @@ class am_fsk_mod_bc(gr.hier_block2):
         ##################################################
         # Blocks
         ##################################################
-        self._mark_filter = interp_fir_filter_fcc(samp_per_bit, (self._taps()))
-        self._mark_filter.declare_sample_delay(0)
-
-        self._space_filter = interp_fir_filter_fcc(
-            samp_per_bit, (self._taps())
-        )
-        self._space_filter.declare_sample_delay(0)
-
-        self._space_rotator = blocks.rotator_cc(2*pi*-spacing/samp_rate)
-        self._char_to_float = blocks.char_to_float(1, 1)
-        self._sum_mark_and_space = blocks.add_vcc(1)
+        self._modulator = radioteletype_swig.am_fsk_mod_bc(
+            samp_per_bit, samp_rate, spacing, self._taps())
 
         ##################################################
         # Connections
         ##################################################
-        self.connect((self, 0), (self._char_to_float, 0))
-
-        # mark
-        self.connect(
-            self._char_to_float,
-            self._mark_filter,
-            self._sum_mark_and_space,
-        )
-
-        # space
-        self.connect(
-            self._char_to_float,
-            blocks.multiply_const_vff((-1,)),
-            blocks.add_const_vff((1,)),
-            self._space_filter,
-            self._space_rotator,
-            (self._sum_mark_and_space, 1),
-        )
-
-        self.connect(
-            self._sum_mark_and_space,
-            self,
-        )
+        self.connect(self, self._modulator, self)
 
     def _taps(self):
         return self.taps or [1] * self.samp_per_bit
 
     def _reset(self):
-        self._mark_filter.set_taps((self._taps()))
-        self._space_filter.set_taps((self._taps()))
-        self._space_rotator.set_phase_inc(2*pi*-self.spacing/self.samp_rate)
+        self._modulator.set_taps(self._taps())
+        self._modulator.set_samp_rate(self.samp_rate)
+        self._modulator.set_spacing(self.spacing)
 
     def get_samp_per_bit(self):
         return self.samp_per_bit
@@ -135,8 +111,16 @@ class fm_fsk_mod_bc(gr.hier_block2):
     Further reading:
 
     http://www.w7ay.net/site/Technical/RTTY%20Sidebands/sidebands.html
+
+    cpfsk_mod_bc generates the same signal in one native block, with raised
+    cosine transitions in place of arbitrary taps, at a fraction of the CPU
+    and memory. Prefer it when generating many signals at once.
     """
     def __init__(self, samp_per_bit, samp_rate, spacing, taps=None):
+        from gnuradio import blocks
+        from gnuradio.analog import frequency_modulator_fc
+        from gnuradio.filter import interp_fir_filter_fff
+
         gr.hier_block2.__init__(
             self, "FM FSK Modulator",
             gr.io_signature(1, 1, gr.sizeof_char*1),
@@ -214,7 +198,16 @@ class fm_fsk_mod_bc(gr.hier_block2):
 
 
 class psk31_modulator_bc(gr.hier_block2):
-    def __init__(self, samp_per_sym=4):
+    """Generate PSK31 from varicoded bits.
+
+    Each symbol's raised cosine envelope depends only on the previous phase
+    and this one, so the native modulator copies precomputed waveforms to
+    the output rather than differentially encoding and filtering the bits.
+    With a nonzero `frequency`, in Hz, the output is mixed up to it.
+    """
+    baud = 31.25
+
+    def __init__(self, samp_per_sym=4, frequency=0):
         gr.hier_block2.__init__(
             self, "PSK31 Modulator",
             gr.io_signature(1, 1, gr.sizeof_char*1),
@@ -222,32 +215,28 @@ class psk31_modulator_bc(gr.hier_block2):
         )
 
         self.samp_per_sym = samp_per_sym
+        self.frequency = frequency
 
-        self.connect(
-            self,
+        self._modulator = radioteletype_swig.psk31_modulator_bc(
+            samp_per_sym, self._phase_inc())
+        self.connect(self, self._modulator, self)
 
-            # PSK31 defines 0 as a phase change, opposite the usual
-            # differential encoding which is: out = (next - prev) % 2
-            blocks.not_bb(),
-            blocks.and_const_bb(1),
-
-            digital.diff_encoder_bb(2),
-            blocks.char_to_float(1, 1),
-            blocks.add_const_vff((-0.5, )),
-            blocks.multiply_const_vff((2, )),
-            interp_fir_filter_fff(samp_per_sym, self._envelope_taps()),
-            blocks.float_to_complex(1),
-            self,
-        )
+    def _phase_inc(self):
+        return 2*pi*self.frequency/(self.baud*self.samp_per_sym)
+
+    def get_frequency(self):
+        return self.frequency
 
-    def _envelope_taps(self):
-        taps = psk31_matched(self.samp_per_sym)
-        return [i / max(taps) for i in taps]
+    def set_frequency(self, frequency):
+        self.frequency = frequency
+        self._modulator.set_phase_inc(self._phase_inc())
 
 
 __all__ = [
     'am_fsk_mod_bc',
+    'async_framer_bb',
     'baudot_encode_bb',
+    'cpfsk_mod_bc',
     'fm_fsk_mod_bc',
     'psk31_modulator_bc',
     'varicode_encode_bb',
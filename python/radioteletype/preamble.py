@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+'''Detect the preamble at the start of a PSK31 transmission.
+
+PSK31 transmitters send a run of phase reversals, the idle pattern, before
+the first character. psk31_preamble_detector_c finds it and estimates the
+carrier phase and frequency from it, so a demodulator can have its loops
+acquire during the preamble rather than during the first characters. The
+PSK31 demodulators use it when made with preamble=True.
+
+The estimate travels with the samples, as a tag on the sample where the
+preamble was detected, so it takes effect at that sample however far apart
+the blocks are in the flowgraph. psk31_costas_loop_cc is a carrier loop
+which takes its phase and frequency from these tags.
+'''
+
+from __future__ import division
+
+from math import cos, pi, sin, sqrt
+
+import numpy
+import pmt
+from gnuradio import gr
+
+
+# Tags the sample where a preamble was detected. The value is a tuple of the
+# carrier phase, in radians, and frequency, in radians per symbol, or None
+# if the frequency couldn't be measured.
+PREAMBLE = pmt.intern('psk31_preamble')
+
+
+class psk31_preamble_detector_c(gr.sync_block):
+    '''Detect a train of PSK31 phase reversals.
+
+    The input is PSK31 at `samp_per_sym` samples per symbol, before clock
+    recovery, and is passed through unchanged. A reversal train has an
+    envelope of |cos|, so its power has a strong component at the symbol
+    rate. Over each `window` symbols, the detector compares that component
+    with the total power. The ratio is 1 for a clean reversal train, and
+    much lower for data, a steady carrier or noise.
+
+    When the ratio rises above `threshold`, the carrier phase and frequency
+    are estimated from the squared signal, and the last sample of the
+    symbol is tagged with them as PREAMBLE. The phase is ambiguous by pi,
+    as it is for any BPSK signal. If given, `start(phase, freq)` is also
+    called, with the frequency in radians per sample. When the ratio falls
+    below `release`, `end()` is called, if given. Both are called from the
+    flowgraph's thread, so they only happen near the time of the samples
+    they describe: anything which must happen at a particular sample should
+    use the tag.
+
+    The frequency is measured from how far the squared signal turns in one
+    symbol, so it is only unambiguous within a quarter of the symbol rate of
+    the carrier, about 7.8 Hz: a signal 10 Hz high looks 5.6 Hz low. Near
+    that limit the sign can't be trusted, so freq is None when the estimate
+    is more than `max_freq` radians per sample, an eighth of the symbol rate.
+    A larger offset must be taken out first, by tuning or an FLL.
+    '''
+    def __init__(
+        self,
+        samp_per_sym,
+        start=None,
+        end=None,
+        window=16,
+        threshold=0.6,
+        release=0.4,
+    ):
+        gr.sync_block.__init__(
+            self,
+            name='psk31_preamble_detector_c',
+            in_sig=[numpy.complex64],
+            out_sig=[numpy.complex64],
+        )
+        self.samp_per_sym = int(samp_per_sym)
+        self.start_callback = start
+        self.end_callback = end
+        self.window = window
+        self.threshold = threshold
+        self.release = release
+        self.max_freq = pi / (4 * self.samp_per_sym)
+
+        self.detections = 0
+        self.detected = False
+        self._symbols_seen = 0
+
+        self._reference = numpy.exp(
+            -2j * pi * numpy.arange(self.samp_per_sym) / self.samp_per_sym)
+        self._leftover = numpy.zeros(0, numpy.complex64)
+
+        # per symbol sums for the last window - 1 symbols
+        self._power = numpy.zeros(window - 1)
+        self._timing = numpy.zeros(window - 1, complex)
+        self._squared = numpy.zeros(window - 1, complex)
+        self._rotation = numpy.zeros(window - 1, complex)
+        self._previous = 0j
+
+    def _window_sums(self, history, new):
+        '''Return the new history, and the sum over the window ending at
+        each new symbol.'''
+        both = numpy.concatenate((history, new))
+        total = numpy.cumsum(both)
+        total[self.window:] -= total[:-self.window].copy()
+        return both[len(both) - len(history):], total[self.window - 1:]
+
+    def _symbols(self, samples):
+        sps = self.samp_per_sym
+        nsym = len(samples) // sps
+        symbols = samples[:nsym * sps].reshape(nsym, sps)
+
+        power = symbols.real ** 2 + symbols.imag ** 2
+        squared = (symbols * symbols).sum(1)
+        previous = numpy.concatenate(([self._previous], squared[:-1]))
+        self._previous = squared[-1]
+
+        self._power, total_power = self._window_sums(
+            self._power, power.sum(1))
+        self._timing, timing = self._window_sums(
+            self._timing, (power * self._reference).sum(1))
+        self._rotation, rotation = self._window_sums(
+            self._rotation, squared * numpy.conj(previous))
+        self._squared, squared = self._window_sums(self._squared, squared)
+        return total_power, timing, squared, rotation
+
+    def work(self, input_items, output_items):
+        n = len(input_items[0])
+        output_items[0][:] = input_items[0]
+        # the absolute number of the first sample in samples
+        first = self.nitems_read(0) - len(self._leftover)
+        samples = numpy.concatenate((self._leftover, input_items[0]))
+        nsym = len(samples) // self.samp_per_sym
+        self._leftover = samples[nsym * self.samp_per_sym:]
+        if nsym == 0:
+            return n
+
+        power, timing, squared, rotation = self._symbols(samples)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ratio = numpy.where(power > 0, 2 * abs(timing) / power, 0)
+
+        # until there's a full window, a single symbol's envelope can look
+        # like a reversal train
+        skip = max(0, self.window - self._symbols_seen)
+        ratio[:skip] = 0
+        self._symbols_seen += nsym
+
+        for i, r in enumerate(ratio):
+            if not self.detected and r > self.threshold:
+                self.detected = True
+                self.detections += 1
+                phase = numpy.angle(squared[i]) / 2
+                freq = numpy.angle(rotation[i]) / (2 * self.samp_per_sym)
+                if abs(freq) > self.max_freq:
+                    freq = None
+                else:
+                    # The phase is the average over the window. Carry it on
+                    # to the end of the last symbol.
+                    phase += freq * self.samp_per_sym * self.window / 2
+                self._tag(first + (i + 1) * self.samp_per_sym - 1, phase, freq)
+                if self.start_callback is not None:
+                    self.start_callback(phase, freq)
+            elif self.detected and r < self.release:
+                self.detected = False
+                if self.end_callback is not None:
+                    self.end_callback()
+        return n
+
+    def _tag(self, offset, phase, freq):
+        if freq is None:
+            freq = pmt.PMT_NIL
+        else:
+            freq = pmt.from_double(freq * self.samp_per_sym)
+        self.add_item_tag(
+            0, offset, PREAMBLE, pmt.make_tuple(pmt.from_double(phase), freq))
+
+
+class psk31_costas_loop_cc(gr.sync_block):
+    '''A BPSK Costas loop, seeded by psk31_preamble_detector_c.
+
+    The loop is that of digital.costas_loop_cc with an order of 2, and runs
+    at one sample per symbol. When a sample tagged PREAMBLE reaches it, the
+    loop takes its phase, and its frequency if there is one, from the tag
+    before correcting that sample. `max_freq` limits the frequency, in
+    radians per symbol.
+
+    It's written in Python, which is only fast enough because PSK31 has so
+    few symbols per second.
+    '''
+    def __init__(self, loop_bw, max_freq=1.0):
+        gr.sync_block.__init__(
+            self,
+            name='psk31_costas_loop_cc',
+            in_sig=[numpy.complex64],
+            out_sig=[numpy.complex64],
+        )
+        self.max_freq = max_freq
+        self.phase = 0.0
+        self.freq = 0.0
+        self.set_loop_bandwidth(loop_bw)
+
+    def set_loop_bandwidth(self, loop_bw):
+        # the gains of gr::blocks::control_loop, critically damped
+        self.loop_bw = loop_bw
+        damping = sqrt(2) / 2
+        denom = 1 + 2 * damping * loop_bw + loop_bw * loop_bw
+        self._alpha = 4 * damping * loop_bw / denom
+        self._beta = 4 * loop_bw * loop_bw / denom
+
+    def get_loop_bandwidth(self):
+        return self.loop_bw
+
+    def set_phase(self, phase):
+        self.phase = phase
+
+    def get_phase(self):
+        return self.phase
+
+    def set_frequency(self, freq):
+        self.freq = freq
+
+    def get_frequency(self):
+        return self.freq
+
+    def _seeds(self, n):
+        '''Return the preamble tags on the next n samples, by position.'''
+        start = self.nitems_read(0)
+        seeds = {}
+        for tag in self.get_tags_in_range(0, start, start + n, PREAMBLE):
+            seeds[tag.offset - start] = pmt.to_python(tag.value)
+        return seeds
+
+    def work(self, input_items, output_items):
+        samples = input_items[0]
+        out = output_items[0]
+        seeds = self._seeds(len(samples))
+        phase, freq = self.phase, self.freq
+        for i, sample in enumerate(samples):
+            if i in seeds:
+                phase, seed_freq = seeds[i]
+                if seed_freq is not None:
+                    freq = seed_freq
+            corrected = complex(sample) * complex(cos(phase), -sin(phase))
+            out[i] = corrected
+            error = max(-1.0, min(1.0, corrected.real * corrected.imag))
+            freq = max(-self.max_freq, min(self.max_freq,
+                                           freq + self._beta * error))
+            phase = (phase + freq + self._alpha * error + pi) % (2 * pi) - pi
+        self.phase, self.freq = phase, freq
+        return len(samples)
+
+
+__all__ = [
+    'PREAMBLE',
+    'psk31_preamble_detector_c',
+    'psk31_costas_loop_cc',
+]
@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+
+'''Simulated channels, bands and scoring, for evaluating receivers.'''
+
+from __future__ import division
+
+import random
+from math import pi, sqrt
+
+import numpy
+
+from gnuradio import gr
+
+from radioteletype import modulators
+
+
+def noise_voltage(signal_power, samples_per_bit, ebn0_db):
+    '''Return the noise amplitude giving an Eb/N0 of `ebn0_db`.
+
+    The energy per bit is `signal_power * samples_per_bit`. The result is the
+    RMS amplitude of complex noise (real and imaginary parts together) as
+    expected by `channels.channel_model`.
+    '''
+    ebn0 = 10 ** (ebn0_db / 10)
+    return sqrt(signal_power * samples_per_bit / ebn0)
+
+
+def async_frame(words, bits_per_word=5, stop_bits=1.5, items_per_bit=2):
+    '''Return `words` as bits framed with start and stop bits.
+
+    Each bit is repeated `items_per_bit` times, which must be large enough to
+    represent `stop_bits` exactly (2 is enough for 1.5 stop bits). The result
+    is suitable for the FSK modulators with `samp_per_bit` set to the samples
+    per bit divided by `items_per_bit`. The framing is done by
+    `modulators.async_framer_bb`, so test vectors match what a transmitter
+    sends.
+    '''
+    return _run_bytes(
+        modulators.async_framer_bb(
+            bits_per_word, items_per_bit, 1, stop_bits),
+        list(words),
+    )
+
+
+def character_error_rate(sent, received):
+    '''Return the edit distance from `sent` to `received` over len(`sent`).
+
+    Insertions, deletions and substitutions all count as one error, so
+    garbage decoded from noise is penalized as well as lost characters.
+    '''
+    if not sent:
+        return float(len(received) > 0)
+
+    previous = list(range(len(received) + 1))
+    for i, s in enumerate(sent):
+        current = [i + 1]
+        for j, r in enumerate(received):
+            current.append(min(
+                previous[j + 1] + 1,        # deletion
+                current[j] + 1,             # insertion
+                previous[j] + (s != r),     # substitution
+            ))
+        previous = current
+
+    return previous[-1] / len(sent)
+
+
+class awgn_fading_channel_cc(gr.hier_block2):
+    '''Flat Rayleigh or Rician fading followed by white Gaussian noise.
+
+    `doppler_freq` is the maximum Doppler spread in Hz, at `samp_rate`. Zero
+    disables fading entirely. `k_factor` is the Rician K factor; zero gives
+    Rayleigh fading. `noise_voltage` is the RMS amplitude of the added noise.
+    '''
+    def __init__(
+        self,
+        noise_voltage=0.0,
+        doppler_freq=0.0,
+        samp_rate=48000,
+        k_factor=0.0,
+        seed=0,
+    ):
+        from gnuradio import channels
+
+        gr.hier_block2.__init__(
+            self, "AWGN Fading Channel",
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+        )
+
+        self.noise_voltage = noise_voltage
+        self.doppler_freq = doppler_freq
+        self.samp_rate = samp_rate
+        self.k_factor = k_factor
+
+        self._noise = channels.channel_model(
+            noise_voltage=noise_voltage,
+            noise_seed=seed,
+            block_tags=True,
+        )
+
+        our_blocks = [self]
+        if doppler_freq:
+            self._fading = channels.fading_model(
+                8,
+                doppler_freq / samp_rate,
+                k_factor > 0,
+                k_factor,
+                seed + 1,
+            )
+            our_blocks.append(self._fading)
+        our_blocks.extend([self._noise, self])
+
+        self.connect(*our_blocks)
+
+    def get_noise_voltage(self):
+        return self.noise_voltage
+
+    def set_noise_voltage(self, noise_voltage):
+        self.noise_voltage = noise_voltage
+        self._noise.set_noise_voltage(noise_voltage)
+
+
+def _run_bytes(block, data):
+    '''Run `data` through a byte to byte block and return the output.'''
+    from gnuradio import blocks
+
+    tb = gr.top_block()
+    sink = blocks.vector_sink_b()
+    tb.connect(blocks.vector_source_b(data), block, sink)
+    tb.run()
+    return list(sink.data())
+
+
+def _callsign(rng):
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    return '%s%s%d%s' % (
+        rng.choice('AKNW'),
+        rng.choice(letters),
+        rng.randint(0, 9),
+        ''.join(rng.choice(letters) for _ in range(rng.randint(1, 3))),
+    )
+
+
+def random_signals(
+    nsignals,
+    samp_rate=48000,
+    seed=0,
+    modes=('rtty', 'psk31'),
+    rtty_bauds=(45.45, 50, 75),
+    rtty_shifts=(170, 425, 850),
+    min_level_db=-40,
+    max_level_db=-10,
+    margin=1000,
+):
+    '''Return descriptions of `nsignals` random signals for `band_source_c`.
+
+    Frequencies are uniformly distributed over the band, leaving `margin` Hz
+    at each edge. Levels are in dB relative to full scale. Each signal sends a
+    random CQ call, preceded by a random amount of idle.
+    '''
+    rng = random.Random(seed)
+    signals = []
+    for _ in range(nsignals):
+        mode = rng.choice(modes)
+        call = _callsign(rng)
+        signal = {
+            'mode': mode,
+            'freq': rng.uniform(
+                -samp_rate / 2 + margin, samp_rate / 2 - margin),
+            'level_db': rng.uniform(min_level_db, max_level_db),
+            'text': 'CQ CQ CQ DE %s %s %s K\r\n' % (call, call, call),
+            'idle': rng.uniform(0, 10),
+        }
+        if mode == 'rtty':
+            signal['baud'] = rng.choice(rtty_bauds)
+            signal['shift'] = rng.choice(rtty_shifts)
+        else:
+            signal['baud'] = 31.25
+        signals.append(signal)
+    return signals
+
+
+class _band_synthesizer(gr.interp_block):
+    '''Sum many narrowband signals into one wideband signal via the FFT.
+
+    Each input is a complex baseband signal at `samp_rate / interp`, which
+    must fit in the middle 80% of that bandwidth. Input k is shifted to
+    `freqs[k]` Hz and scaled by `gains[k]`.
+
+    Inputs are processed in blocks of `block_len` samples. Each block is zero
+    padded and transformed, placed in a wideband spectrum at the bin nearest
+    its frequency (the remainder having been corrected by a rotation at the
+    low rate), and the sum of all signals is transformed back with one
+    inverse FFT. Consecutive blocks are overlap-added. The cost per signal is
+    thus a small FFT at the low rate, independent of the output rate.
+
+    Optionally white noise of RMS amplitude `noise_voltage`, and impulsive
+    QRN with an average of `qrn_rate` crashes per second of peak amplitude
+    around `qrn_voltage`, are added. The output is delayed by half a block.
+    '''
+    def __init__(
+        self,
+        samp_rate,
+        interp,
+        freqs,
+        gains,
+        block_len=256,
+        noise_voltage=0.0,
+        qrn_rate=0.0,
+        qrn_voltage=0.0,
+        seed=0,
+    ):
+        gr.interp_block.__init__(
+            self,
+            name="band_synthesizer",
+            in_sig=[numpy.complex64] * len(freqs),
+            out_sig=[numpy.complex64],
+            interp=interp,
+        )
+
+        self.samp_rate = samp_rate
+        self.interp = interp
+        self.block_len = block_len
+        self.noise_voltage = noise_voltage
+        self.qrn_rate = qrn_rate
+        self.qrn_voltage = qrn_voltage
+        self._random = numpy.random.RandomState(seed)
+
+        wide_len = 2 * block_len * interp
+        low_rate = samp_rate / interp
+        bin_width = samp_rate / wide_len
+
+        bins = numpy.round(numpy.asarray(freqs) / bin_width).astype(int)
+        residual = numpy.asarray(freqs) - bins * bin_width
+
+        # Spectrum indices for each signal's 2*block_len bins
+        self._indices = [
+            (b + numpy.arange(-block_len, block_len)) % wide_len for b in bins]
+        self._bins = bins
+
+        # Rotation per low rate sample to correct the residual
+        self._residual_step = numpy.exp(2j * pi * residual / low_rate)
+        self._residual_phase = numpy.ones(len(freqs), dtype=complex)
+
+        # The inverse FFT scales by 1/wide_len, the forward by 1; restore
+        # the amplitude lost to interpolation.
+        self._gains = numpy.asarray(gains) * interp
+
+        # Raised cosine taper on the outer 20% of the low rate bandwidth. It
+        # keeps the interpolation kernel short enough to fit the padding.
+        f = numpy.abs(numpy.arange(-block_len, block_len) / (2 * block_len))
+        self._taper = numpy.where(
+            f < 0.4, 1.0, 0.5 + 0.5 * numpy.cos(pi * (f - 0.4) / 0.1))
+
+        self._wide_len = wide_len
+        self._tail = numpy.zeros(block_len * interp, dtype=numpy.complex64)
+        self._block = 0
+
+        self.set_output_multiple(block_len * interp)
+
+    def _synthesize_block(self, inputs, start):
+        block_len = self.block_len
+        padded = numpy.zeros(2 * block_len, dtype=complex)
+        spectrum = numpy.zeros(self._wide_len, dtype=complex)
+
+        # The wideband frame starts half a block before this block. This is
+        # the phase of each signal's center bin at the start of the frame.
+        frame_phase = numpy.exp(
+            2j * pi * self._bins * (self._block / 2.0 - 0.25))
+
+        n = numpy.arange(block_len)
+        for k, x in enumerate(inputs):
+            rotation = self._residual_phase[k] * self._residual_step[k] ** n
+            self._residual_phase[k] *= self._residual_step[k] ** block_len
+            self._residual_phase[k] /= abs(self._residual_phase[k])
+
+            padded[block_len // 2:block_len // 2 + block_len] = \
+                x[start:start + block_len] * rotation
+            low_spectrum = numpy.fft.fftshift(numpy.fft.fft(padded))
+            spectrum[self._indices[k]] += (
+                low_spectrum * self._taper * self._gains[k] * frame_phase[k])
+
+        self._block += 1
+        return numpy.fft.ifft(spectrum)
+
+    def _qrn(self, n):
+        '''Return `n` samples of impulsive noise.'''
+        out = numpy.zeros(n, dtype=complex)
+        crashes = self._random.poisson(self.qrn_rate * n / self.samp_rate)
+        for _ in range(crashes):
+            position = self._random.randint(0, n)
+            # Each crash decays with a time constant of about 1 ms
+            length = min(n - position, int(self.samp_rate * 0.005) + 1)
+            envelope = numpy.exp(
+                -numpy.arange(length) / (self.samp_rate * 0.001))
+            amplitude = self.qrn_voltage * self._random.lognormal(0, 0.5)
+            out[position:position + length] += amplitude * envelope * (
+                self._random.randn(length) +
+                1j * self._random.randn(length)) / sqrt(2)
+        return out
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        block_len = self.block_len
+        wide_block = block_len * self.interp
+        nblocks = len(out) // wide_block
+
+        for i in range(nblocks):
+            frame = self._synthesize_block(input_items, i * block_len)
+            out[i * wide_block:(i + 1) * wide_block] = \
+                self._tail + frame[:wide_block]
+            self._tail[:] = frame[wide_block:]
+
+        produced = nblocks * wide_block
+        if self.noise_voltage:
+            out[:produced] += self.noise_voltage * (
+                self._random.randn(produced) +
+                1j * self._random.randn(produced)) / sqrt(2)
+        if self.qrn_rate:
+            out[:produced] += self._qrn(produced)
+
+        return produced
+
+
+class band_source_c(gr.hier_block2):
+    """Many RTTY and PSK31 signals in one complex baseband stream.
+
+    `signals` is a list of dicts as returned by `random_signals`: each has a
+    `mode` of 'rtty' or 'psk31', a center `freq` in Hz, a `baud` rate, a
+    `level_db` relative to full scale, the `text` to send repeatedly, and
+    optionally seconds of `idle` to send first. RTTY signals also have a
+    `shift` in Hz.
+
+    Each signal is modulated at a low `channel_rate`, which must divide
+    `samp_rate`, and the signals are summed by `_band_synthesizer`. Baud
+    rates are rounded to an integer number of samples per half bit at the
+    channel rate.
+
+    `doppler_spread` and `path_delay` (seconds) apply two path Watterson style
+    fading independently to each signal, as with the CCIR "moderate" channel
+    (1 Hz, 1 ms). Zero disables fading. `noise_voltage` adds white noise,
+    `qrn_rate` and `qrn_voltage` impulsive atmospheric noise. Everything is
+    deterministic for a given `seed`.
+    """
+    def __init__(
+        self,
+        signals,
+        samp_rate=48000,
+        channel_rate=2000,
+        noise_voltage=0.0,
+        doppler_spread=0.0,
+        path_delay=0.001,
+        qrn_rate=0.0,
+        qrn_voltage=0.0,
+        seed=0,
+    ):
+        from gnuradio import channels
+
+        gr.hier_block2.__init__(
+            self, "Band Source",
+            gr.io_signature(0, 0, 0),
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+        )
+
+        if samp_rate % channel_rate:
+            raise ValueError('channel_rate must divide samp_rate')
+
+        self.signals = signals
+        self.samp_rate = samp_rate
+        self.channel_rate = channel_rate
+
+        freqs = []
+        gains = []
+        chains = []
+
+        for i, signal in enumerate(signals):
+            if signal['mode'] == 'rtty':
+                chain, freq = self._rtty(signal)
+            elif signal['mode'] == 'psk31':
+                chain, freq = self._psk31(signal)
+            else:
+                raise ValueError('unknown mode %r' % (signal['mode'],))
+
+            if doppler_spread:
+                chain.append(channels.selective_fading_model(
+                    8,
+                    doppler_spread / channel_rate,
+                    False,
+                    0,
+                    seed + i,
+                    [0.0, path_delay * channel_rate],
+                    [sqrt(0.5), sqrt(0.5)],
+                    int(path_delay * channel_rate) + 8,
+                ))
+
+            chains.append(chain)
+            freqs.append(freq)
+            gains.append(10 ** (signal['level_db'] / 20))
+
+        self._synthesizer = _band_synthesizer(
+            samp_rate,
+            samp_rate // channel_rate,
+            freqs,
+            gains,
+            noise_voltage=noise_voltage,
+            qrn_rate=qrn_rate,
+            qrn_voltage=qrn_voltage,
+            seed=seed,
+        )
+
+        for i, chain in enumerate(chains):
+            self.connect(*(chain + [(self._synthesizer, i)]))
+        self.connect(self._synthesizer, self)
+
+    def _idle_bits(self, signal, bits_per_second, idle_bit):
+        return [idle_bit] * int(signal.get('idle', 0) * bits_per_second)
+
+    def _rtty(self, signal):
+        from gnuradio import blocks
+
+        samp_per_item = max(1, int(round(
+            self.channel_rate / signal['baud'] / 2)))
+        codes = _run_bytes(
+            modulators.baudot_encode_bb(),
+            [ord(c) for c in signal['text']])
+
+        # idle as steady mark; two items per bit
+        bits = self._idle_bits(signal, signal['baud'] * 2, 1)
+        bits += async_frame(codes, items_per_bit=2)
+
+        # The modulator puts mark at 0 Hz and space at -shift. Center it,
+        # since the synthesizer only passes the middle of the channel.
+        chain = [
+            blocks.vector_source_b(bits, True),
+            modulators.cpfsk_mod_bc(
+                samp_per_item, self.channel_rate, signal['shift']),
+            blocks.rotator_cc(pi * signal['shift'] / self.channel_rate),
+        ]
+        return chain, signal['freq']
+
+    def _psk31(self, signal):
+        from gnuradio import blocks
+
+        samp_per_sym = max(1, int(round(self.channel_rate / signal['baud'])))
+        text_bits = _run_bytes(
+            modulators.varicode_encode_bb(),
+            [ord(c) for c in signal['text']] + [0])
+
+        # idle as phase reversals
+        bits = self._idle_bits(signal, signal['baud'], 0) + text_bits
+
+        chain = [
+            blocks.vector_source_b(bits, True),
+            modulators.psk31_modulator_bc(samp_per_sym),
+        ]
+        return chain, signal['freq']
+
+
+class multicarrier_tx_c(gr.hier_block2):
+    """Transmit many RTTY and PSK31 signals in one complex baseband stream.
+
+    `channels` is a list of dicts, each with a `mode` of 'rtty' or 'psk31'
+    and a center `freq` in Hz, and optionally a `level_db` relative to full
+    scale (default 0). RTTY channels may also have a `baud` (default 45.45)
+    and `shift` in Hz (default 170).
+
+    Text for channel k arrives on the message port "text<k>", in any of the
+    forms the encoders accept. A channel with no text idles, so the others
+    keep transmitting. Each channel is encoded and modulated at a low
+    `channel_rate`, which must divide `samp_rate`, and all are mixed to their
+    frequencies and summed by one FFT synthesizer, as in `band_source_c`.
+    Generating a full band thus costs little more than modulating each
+    signal at the channel rate.
+    """
+    def __init__(self, channels, samp_rate=48000, channel_rate=2000):
+        gr.hier_block2.__init__(
+            self, "Multicarrier Transmitter",
+            gr.io_signature(0, 0, 0),
+            gr.io_signature(1, 1, gr.sizeof_gr_complex),
+        )
+
+        if samp_rate % channel_rate:
+            raise ValueError('channel_rate must divide samp_rate')
+
+        self.channels = channels
+        self.samp_rate = samp_rate
+        self.channel_rate = channel_rate
+
+        chains = []
+        for channel in channels:
+            if channel['mode'] == 'rtty':
+                chains.append(self._rtty(channel))
+            elif channel['mode'] == 'psk31':
+                chains.append(self._psk31(channel))
+            else:
+                raise ValueError('unknown mode %r' % (channel['mode'],))
+
+        self._synthesizer = _band_synthesizer(
+            samp_rate,
+            samp_rate // channel_rate,
+            [channel['freq'] for channel in channels],
+            [10 ** (channel.get('level_db', 0) / 20) for channel in channels],
+        )
+
+        # the encoder is first in each chain
+        self._encoders = [chain[0] for chain in chains]
+        for i, chain in enumerate(chains):
+            port = 'text%d' % i
+            self.message_port_register_hier_in(port)
+            self.msg_connect(self, port, chain[0], 'text')
+            self.connect(*(chain + [(self._synthesizer, i)]))
+        self.connect(self._synthesizer, self)
+
+    def _rtty(self, channel):
+        from gnuradio import blocks
+
+        baud = channel.get('baud', 45.45)
+        shift = channel.get('shift', 170)
+        samp_per_item = max(1, int(round(self.channel_rate / baud / 2)))
+
+        # Centered, as in band_source_c
+        return [
+            modulators.baudot_encode_bb(idle=True),
+            modulators.async_framer_bb(5, 2, 1, 1.5),
+            modulators.cpfsk_mod_bc(samp_per_item, self.channel_rate, shift),
+            blocks.rotator_cc(pi * shift / self.channel_rate),
+        ]
+
+    def _psk31(self, channel):
+        samp_per_sym = max(1, int(round(self.channel_rate / 31.25)))
+        return [
+            modulators.varicode_encode_bb(idle=True),
+            modulators.psk31_modulator_bc(samp_per_sym),
+        ]
+
+
+def write_band(filename, seconds, signals, samp_rate=48000, **kwargs):
+    '''Write `seconds` of `band_source_c` output to `filename`.
+
+    The file contains raw complex64 samples, as written by `file_sink`.
+    Additional keyword arguments are passed to `band_source_c`.
+    '''
+    from gnuradio import blocks
+
+    tb = gr.top_block()
+    tb.connect(
+        band_source_c(signals, samp_rate=samp_rate, **kwargs),
+        blocks.head(gr.sizeof_gr_complex, int(seconds * samp_rate)),
+        blocks.file_sink(gr.sizeof_gr_complex, filename),
+    )
+    tb.run()
+
+
+__all__ = [
+    'async_frame',
+    'awgn_fading_channel_cc',
+    'band_source_c',
+    'character_error_rate',
+    'multicarrier_tx_c',
+    'noise_voltage',
+    'random_signals',
+    'write_band',
+]
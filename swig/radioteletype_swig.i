@@ -3,26 +3,49 @@
 #define RADIOTELETYPE_API
 
 %include "gnuradio.i"                   // the common stuff
+%include "pybuffer.i"
 
 //load generated python docstrings
 %include "radioteletype_swig_doc.i"
 
 %{
+#include "radioteletype/am_fsk_mod_bc.h"
+#include "radioteletype/async_framer_bb.h"
 #include "radioteletype/async_word_extractor_bb.h"
 #include "radioteletype/baudot_decode_bb.h"
 #include "radioteletype/baudot_encode_bb.h"
+#include "radioteletype/codecs.h"
+#include "radioteletype/cpfsk_mod_bc.h"
+#include "radioteletype/psk31_modulator_bc.h"
+#include "radioteletype/sliding_dft_cf.h"
 #include "radioteletype/varicode_decode_bb.h"
 #include "radioteletype/varicode_encode_bb.h"
 %}
 
 
+%include "radioteletype/am_fsk_mod_bc.h"
+GR_SWIG_BLOCK_MAGIC2(radioteletype, am_fsk_mod_bc);
+%include "radioteletype/async_framer_bb.h"
+GR_SWIG_BLOCK_MAGIC2(radioteletype, async_framer_bb);
 %include "radioteletype/async_word_extractor_bb.h"
 GR_SWIG_BLOCK_MAGIC2(radioteletype, async_word_extractor_bb);
 %include "radioteletype/baudot_decode_bb.h"
 GR_SWIG_BLOCK_MAGIC2(radioteletype, baudot_decode_bb);
 %include "radioteletype/baudot_encode_bb.h"
 GR_SWIG_BLOCK_MAGIC2(radioteletype, baudot_encode_bb);
+%include "radioteletype/cpfsk_mod_bc.h"
+GR_SWIG_BLOCK_MAGIC2(radioteletype, cpfsk_mod_bc);
+%include "radioteletype/psk31_modulator_bc.h"
+GR_SWIG_BLOCK_MAGIC2(radioteletype, psk31_modulator_bc);
+%include "radioteletype/sliding_dft_cf.h"
+GR_SWIG_BLOCK_MAGIC2(radioteletype, sliding_dft_cf);
 %include "radioteletype/varicode_decode_bb.h"
 GR_SWIG_BLOCK_MAGIC2(radioteletype, varicode_decode_bb);
 %include "radioteletype/varicode_encode_bb.h"
 GR_SWIG_BLOCK_MAGIC2(radioteletype, varicode_encode_bb);
+
+// The codecs read from and write to any object supporting the buffer
+// protocol, such as bytes, bytearray or a NumPy array, without copying.
+%pybuffer_binary(const char *in, size_t in_len);
+%pybuffer_mutable_binary(char *out, size_t out_len);
+%include "radioteletype/codecs.h"